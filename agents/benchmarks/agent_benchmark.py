@@ -0,0 +1,71 @@
+"""
+Measure per-agent memory and construction time when a process holds many
+agents, e.g. one per user session.
+
+Agents are built both with Agent(...) and with Agent.spawn() from a
+template. No API calls are made.
+
+    python benchmarks/agent_benchmark.py --agents 10000
+"""
+import os
+import gc
+import time
+import argparse
+import tracemalloc
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from praisonaiagents import Agent
+
+
+def search_web(query: str) -> str:
+    """Search the web for a query."""
+    return query
+
+
+def summarize(text: str, max_words: int = 100) -> str:
+    """Summarize a piece of text."""
+    return text
+
+
+def make_agent(i):
+    return Agent(
+        name=f"Assistant {i}",
+        role="Support assistant",
+        goal="Answer the user's questions",
+        backstory="A helpful assistant for one user session",
+        tools=[search_web, summarize],
+        verbose=False
+    )
+
+
+def measure(label, count, build):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    agents = [build(i) for i in range(count)]
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print(f"{label:<10} {used / count / 1024:8.2f} KiB/agent  {elapsed / count * 1e6:8.1f} us/agent  ({count} agents, {used / 2**20:.1f} MiB)")
+    return agents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", type=int, default=10000)
+    args = parser.parse_args()
+
+    # Warm up imports and tool schema generation outside the measurement
+    template = make_agent(0)
+    template.chat_history.clear()
+
+    measure("Agent()", args.agents, make_agent)
+    if hasattr(Agent, "spawn"):
+        measure("spawn()", args.agents, lambda i: template.spawn(name=f"Assistant {i}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Measure the CPU spent on terminal rendering per chat turn, with and without
+headless mode.
+
+No API calls are made: the OpenAI client is replaced with one that replays a
+streamed response of the chosen size, so only the agent's own work is timed.
+
+    python benchmarks/headless_benchmark.py --turns 20 --chars 20000
+"""
+import os
+import time
+import argparse
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from openai.types.chat import ChatCompletionChunk
+from praisonaiagents import Agent, client_manager
+
+
+class ReplayCompletions:
+    def __init__(self, text, chunk_size):
+        self.text = text
+        self.chunk_size = chunk_size
+
+    def create(self, stream=False, **kwargs):
+        def chunks():
+            for i in range(0, len(self.text), self.chunk_size):
+                yield ChatCompletionChunk.construct(
+                    id="bench", object="chat.completion.chunk", created=0, model=kwargs["model"],
+                    choices=[{"index": 0, "delta": {"content": self.text[i:i + self.chunk_size]}, "finish_reason": None}]
+                )
+            yield ChatCompletionChunk.construct(
+                id="bench", object="chat.completion.chunk", created=0, model=kwargs["model"],
+                choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}]
+            )
+        return chunks()
+
+
+class ReplayClient:
+    def __init__(self, text, chunk_size):
+        self.chat = type("Chat", (), {"completions": ReplayCompletions(text, chunk_size)})()
+
+
+def run(headless, turns, text, chunk_size):
+    client = ReplayClient(text, chunk_size)
+    client_manager.get_client = lambda *args, **kwargs: client
+    agent = Agent(
+        name="Bench",
+        instructions="Benchmark agent",
+        verbose=False,
+        cache=False,
+        respect_context_window=False,
+        headless=headless
+    )
+    if not headless:
+        # Render to a null device so terminal speed doesn't skew the numbers
+        from rich.console import Console
+        agent.console = Console(file=open(os.devnull, "w"), force_terminal=True, width=120)
+
+    start = time.process_time()
+    for turn in range(turns):
+        agent.chat(f"Turn {turn}")
+        agent.clear_history()
+    return (time.process_time() - start) / turns
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--chars", type=int, default=20000, help="response length in characters")
+    parser.add_argument("--chunk-size", type=int, default=16, help="characters per streamed chunk")
+    args = parser.parse_args()
+
+    paragraph = "The agent reports **progress** on the task, with `code` and a [link](https://example.com).\n"
+    text = (paragraph * (args.chars // len(paragraph) + 1))[:args.chars]
+
+    rendered = run(False, args.turns, text, args.chunk_size)
+    headless = run(True, args.turns, text, args.chunk_size)
+
+    print(f"Response size: {args.chars} chars in {args.chars // args.chunk_size} chunks")
+    print(f"Rendered: {rendered * 1000:8.1f} ms CPU per turn")
+    print(f"Headless: {headless * 1000:8.1f} ms CPU per turn")
+    print(f"Saved:    {(rendered - headless) * 1000:8.1f} ms CPU per turn ({rendered / headless:.0f}x less)")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,14 +3,20 @@ Praison AI Agents - A package for hierarchical AI agent task execution
 """
 
 from .agent.agent import Agent
+from .agent.session import Session
 from .agents.agents import PraisonAIAgents
 from .task.task import Task
 from .tools.tools import Tools
 from .agents.autoagents import AutoAgents
+from .agents.run_store import RunStore
 from .memory.memory import Memory
+from .knowledge.knowledge import Knowledge
 from .main import (
     TaskOutput,
     ReflectionOutput,
+    StreamEvent,
+    BatchResult,
+    TaskEvent,
     display_interaction,
     display_self_reflection,
     display_instruction,
@@ -22,6 +28,8 @@ from .main import (
     register_display_callback,
     sync_display_callbacks,
     async_display_callbacks,
+    ClientManager,
+    client_manager,
 )
 
 # Add Agents as an alias for PraisonAIAgents
@@ -29,14 +37,20 @@ Agents = PraisonAIAgents
 
 __all__ = [
     'Agent',
+    'Session',
     'PraisonAIAgents',
     'Agents',
     'Tools',
     'Task',
     'TaskOutput',
     'ReflectionOutput',
+    'StreamEvent',
+    'BatchResult',
+    'TaskEvent',
     'AutoAgents',
+    'RunStore',
     'Memory',
+    'Knowledge',
     'display_interaction',
     'display_self_reflection',
     'display_instruction',
@@ -48,4 +62,6 @@ __all__ = [
     'register_display_callback',
     'sync_display_callbacks',
     'async_display_callbacks',
+    'ClientManager',
+    'client_manager',
 ] 
\ No newline at end of file
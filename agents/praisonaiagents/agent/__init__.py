@@ -1,4 +1,5 @@
 """Agent module for AI agents"""
 from .agent import Agent
+from .session import Session
 
-__all__ = ['Agent'] 
\ No newline at end of file
+__all__ = ['Agent', 'Session'] 
\ No newline at end of file
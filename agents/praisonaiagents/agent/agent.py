@@ -1,12 +1,21 @@
 import os
+import re
 import time
 import json
+import hashlib
 import logging
 import asyncio
-from typing import List, Optional, Any, Dict, Union, Literal, TYPE_CHECKING
+import threading
+from types import MappingProxyType
+from functools import lru_cache
+from operator import attrgetter
+from contextlib import aclosing
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import List, Optional, Any, Dict, Union, Literal, AsyncIterator, Iterator, TYPE_CHECKING
 from rich.console import Console
 from rich.live import Live
-from openai import AsyncOpenAI
+from openai import APITimeoutError
+from openai.types.chat import ChatCompletion, ChatCompletionMessageToolCall
 from ..main import (
     display_error,
     display_tool_call,
@@ -14,19 +23,91 @@ from ..main import (
     display_interaction,
     display_generating,
     display_self_reflection,
+    adisplay_instruction,
+    dispatch_display_event,
+    is_headless,
+    sync_display_callbacks,
+    async_display_callbacks,
     ReflectionOutput,
-    client,
+    StreamEvent,
+    BatchResult,
+    client_manager,
     error_logs
 )
+from ..llm.cache import response_cache
+from ..llm.rate_limiter import get_rate_limiter, estimate_tokens
+from ..llm.context import ContextManager
+from ..llm.singleflight import request_coalescer
+from ..llm.concurrency import get_concurrency_limiter
+from ..llm.policy import ModelRoute, RequestPolicy, prefetch_stream, aprefetch_stream
+from ..llm.json_stream import StreamingJSONParser, StructuredOutputError, parse_json_output
+from .tool_registry import ToolRegistry
+from .budget import ExecutionBudget, BudgetExceeded, map_with_deadline
+from .batch import Checkpoint, Reorder, run_batch_api
+from .session import Session, current_session
+from ..knowledge.knowledge import Knowledge
 import inspect
 
+_DISPLAY_FUNCTIONS = {
+    "interaction": display_interaction,
+    "self_reflection": display_self_reflection,
+    "instruction": display_instruction,
+    "tool_call": display_tool_call,
+    "error": display_error,
+}
+
 if TYPE_CHECKING:
     from ..task.task import Task
 
+# Shared by every agent without per-tool concurrency limits
+_NO_LIMITS = MappingProxyType({})
+
+# Guards the lazily built default session and tool registry, so threads making
+# their first call on a shared agent at once all get the same objects
+_LAZY_INIT_LOCK = threading.Lock()
+
+
+def _fallback_allowed(error):
+    return not isinstance(error, BudgetExceeded)
+
+
+# Errors that come from one caller's own budget or deadline rather than from a
+# request; a coalesced request hitting one is retried by its waiters, not failed
+_CALLER_ERRORS = (BudgetExceeded, TimeoutError, asyncio.TimeoutError, APITimeoutError)
+
+
+@lru_cache(maxsize=None)
+def _slot_names(cls):
+    """Every instance slot of an Agent class (including subclass slots), a getter for all of them and their setters."""
+    names = tuple(
+        slot for klass in cls.__mro__ for slot in getattr(klass, '__slots__', ())
+        if slot != '__weakref__'
+    )
+    return names, attrgetter(*names), tuple(getattr(cls, name).__set__ for name in names)
+
+
 class Agent:
-    def _generate_tool_definition(self, function_name):
+    # A process may hold thousands of agents (e.g. one per user session), so
+    # instances carry no __dict__ and per-conversation state (console, default
+    # session, tool dispatch table, stats) is created on first use
+    __slots__ = (
+        'name', 'role', 'goal', 'backstory', 'instructions', 'self_reflect', 'llm', 'tools',
+        'function_calling_llm', 'max_iter', 'max_rpm', 'max_tpm', 'coalesce_requests',
+        'fallback_llms', 'request_policy', 'max_execution_time', 'memory',
+        'verbose', 'allow_delegation', 'step_callback', 'cache', 'system_template',
+        'prompt_template', 'response_template', 'allow_code_execution', 'max_retry_limit',
+        'respect_context_window', 'summarize_history', 'code_execution_mode', 'embedder_config', 'knowledge_sources', 'knowledge',
+        'use_system_prompt', 'markdown', 'max_reflect', 'min_reflect',
+        'reflect_llm', 'base_url', 'api_key', 'headless', 'parallel_tool_calls',
+        'max_tool_concurrency', 'tool_concurrency',
+        '_console', '_system_prompt', '_session', '_registry', '_tool_semaphores',
+        '_llm_stats', '_llm_stats_lock', '_rate_limiters', '__weakref__'
+    )
+
+    def _generate_tool_definition(self, function_name, func=None):
         """
         Generate a tool definition from a function name by inspecting the function.
+        When func is given it is used as is instead of being looked up by name.
         """
         logging.debug(f"Attempting to generate tool definition for: {function_name}")
         
@@ -45,13 +126,12 @@ class Agent:
             return tool_def
 
         # Try to find the function in the agent's tools list first
-        func = None
-        for tool in self.tools:
-            if callable(tool) and getattr(tool, '__name__', '') == function_name:
-                func = tool
-                break
-        
-        logging.debug(f"Looking for {function_name} in agent tools: {func is not None}")
+        if func is None:
+            for tool in self.tools:
+                if callable(tool) and getattr(tool, '__name__', '') == function_name:
+                    func = tool
+                    break
+            logging.debug(f"Looking for {function_name} in agent tools: {func is not None}")
         
         # If not found in tools, try globals and main
         if not func:
@@ -166,7 +246,7 @@ class Agent:
         verbose: bool = True,
         allow_delegation: bool = False,
         step_callback: Optional[Any] = None,
-        cache: bool = True,
+        cache: bool = False,
         system_template: Optional[str] = None,
         prompt_template: Optional[str] = None,
         response_template: Optional[str] = None,
@@ -181,7 +261,20 @@ class Agent:
         self_reflect: bool = False,
         max_reflect: int = 3,
         min_reflect: int = 1,
-        reflect_llm: Optional[str] = None
+        reflect_llm: Optional[str] = None,
+        parallel_tool_calls: bool = False,
+        max_tool_concurrency: int = 4,
+        tool_concurrency: Optional[Dict[str, int]] = None,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        max_tpm: Optional[int] = None,
+        headless: Optional[bool] = None,
+        coalesce_requests: bool = False,
+        fallback_llms: Optional[List[Union[str, Dict[str, Any]]]] = None,
+        hedge_requests: bool = False,
+        hedge_percentile: float = 95.0,
+        hedge_delay: Optional[float] = None,
+        summarize_history: bool = False
     ):
         # Handle backward compatibility for required fields
         if all(x is None for x in [name, role, goal, backstory, instructions]):
@@ -209,13 +302,33 @@ class Agent:
         self.llm = llm or os.getenv('OPENAI_MODEL_NAME', 'gpt-4o')
         self.tools = tools if tools else []  # Store original tools
         self.function_calling_llm = function_calling_llm
+        # Requests, latency and token usage per model role ('main', 'function_calling')
+        self._llm_stats = None
+        self._llm_stats_lock = threading.Lock()
         self.max_iter = max_iter
         self.max_rpm = max_rpm
+        self.max_tpm = max_tpm
+        # Limiters are shared per (model, api_key) across all agents
+        self._rate_limiters = None
+        # Opt-in: identical requests in flight at the same time (from any agent) share one call
+        self.coalesce_requests = coalesce_requests
+        # Ordered backup models ("groq/llama-3.1-8b-instant", {"model": ..., "base_url": ...});
+        # with hedging, a slow first token also starts a duplicate on the first backup
+        self.fallback_llms = fallback_llms
+        self.request_policy = RequestPolicy(
+            fallback_llms,
+            hedge=hedge_requests,
+            hedge_percentile=hedge_percentile,
+            hedge_delay=hedge_delay,
+            should_fallback=_fallback_allowed
+        ) if fallback_llms else None
         self.max_execution_time = max_execution_time
         self.memory = memory
         self.verbose = verbose
         self.allow_delegation = allow_delegation
         self.step_callback = step_callback
+        # Opt-in: replay identical requests from llm.response_cache (memory only unless
+        # response_cache.configure(path=...) enables the disk tier)
         self.cache = cache
         self.system_template = system_template
         self.prompt_template = prompt_template
@@ -223,24 +336,206 @@ class Agent:
         self.allow_code_execution = allow_code_execution
         self.max_retry_limit = max_retry_limit
         self.respect_context_window = respect_context_window
+        # Opt-in: fold turns that no longer fit into an LLM summary instead of dropping them
+        self.summarize_history = summarize_history
         self.code_execution_mode = code_execution_mode
         self.embedder_config = embedder_config
         self.knowledge_sources = knowledge_sources
         self.use_system_prompt = use_system_prompt
-        self.chat_history = []
+        # Conversation used when chat() is called without a session; it holds
+        # chat_history, last_run_status and context_manager
+        self._session = None
         self.markdown = markdown
         self.max_reflect = max_reflect
         self.min_reflect = min_reflect
         # Use the same model selection logic for reflect_llm
         self.reflect_llm = reflect_llm or os.getenv('OPENAI_MODEL_NAME', 'gpt-4o')
-        self.console = Console()  # Create a single console instance for the agent
-        
-        # Initialize system prompt
-        self.system_prompt = f"""{self.backstory}\n
+        # Endpoint used to borrow pooled clients from client_manager
+        self.base_url = base_url
+        self.api_key = api_key
+        # Retrieval index over knowledge_sources; sources are ingested on the
+        # first chat that searches it
+        self.knowledge = self._build_knowledge()
+        # None follows the global setting (set_headless / PRAISONAI_HEADLESS)
+        self.headless = headless
+        self._console = None
+        # Tool calls from one assistant turn may run concurrently when enabled;
+        # tool_concurrency caps individual tools (e.g. {"scrape_page": 2})
+        self.parallel_tool_calls = parallel_tool_calls
+        self.max_tool_concurrency = max(1, max_tool_concurrency)
+        self._set_tool_concurrency(tool_concurrency)
+        # Tool schemas are generated once per tool list instead of on every request
+        self._registry = None
+        # None derives the system prompt from backstory, role and goal
+        self._system_prompt = None
+
+    def _set_tool_concurrency(self, tool_concurrency):
+        self.tool_concurrency = tool_concurrency or _NO_LIMITS
+        self._tool_semaphores = {
+            name: threading.BoundedSemaphore(limit) for name, limit in self.tool_concurrency.items()
+        } if self.tool_concurrency else _NO_LIMITS
+
+    @property
+    def system_prompt(self):
+        if self._system_prompt is not None:
+            return self._system_prompt
+        return f"""{self.backstory}\n
 Your Role: {self.role}\n
 Your Goal: {self.goal}
         """
 
+    @system_prompt.setter
+    def system_prompt(self, value):
+        self._system_prompt = value
+
+    @property
+    def default_session(self) -> Session:
+        """The session used when chat()/achat()/astream() get no session argument."""
+        session = self._session
+        if session is None:
+            with _LAZY_INIT_LOCK:
+                session = self._session
+                if session is None:
+                    session = self._session = Session(session_id=f"{self.name}-default", memory=self.memory)
+        return session
+
+    def new_session(self, session_id: Optional[str] = None, user_id: Optional[str] = None, chat_history: Optional[List[Dict[str, Any]]] = None) -> Session:
+        """
+        Start a conversation that can run concurrently with any other session
+        of this agent. Pass it as session= to chat(), achat(), astream() or stream().
+        """
+        return Session(session_id=session_id, user_id=user_id, chat_history=chat_history, memory=self.memory)
+
+    @property
+    def chat_history(self):
+        return self.default_session.chat_history
+
+    @chat_history.setter
+    def chat_history(self, value):
+        self.default_session.chat_history = value
+
+    @property
+    def last_run_status(self):
+        """Outcome of the default session's last chat: 'completed', 'timeout' or 'max_iter'."""
+        return self.default_session.last_run_status
+
+    @last_run_status.setter
+    def last_run_status(self, value):
+        self.default_session.last_run_status = value
+
+    def _context_for(self, session):
+        """The session's ContextManager, or None when respect_context_window is off."""
+        if not self.respect_context_window:
+            return None
+        if session.context_manager is None:
+            summarizer = self._summarize_history if self.summarize_history else None
+            session.context_manager = ContextManager(self.llm, summarizer=summarizer)
+        return session.context_manager
+
+    @property
+    def context_manager(self):
+        """ContextManager for the default session's conversation."""
+        return self._context_for(self.default_session)
+
+    @context_manager.setter
+    def context_manager(self, value):
+        self.default_session.context_manager = value
+
+    @property
+    def _tool_registry(self):
+        registry = self._registry
+        if registry is None:
+            with _LAZY_INIT_LOCK:
+                registry = self._registry
+                if registry is None:
+                    registry = ToolRegistry(self._generate_tool_definition)
+                    registry.register_tools(self.tools)
+                    self._registry = registry
+        return registry
+
+    def _build_knowledge(self):
+        """
+        Knowledge index for knowledge_sources (a Knowledge instance is used as
+        is). Each agent name and source list gets its own index file, so
+        agents never prune each other's documents.
+        """
+        if not self.knowledge_sources or isinstance(self.knowledge_sources, Knowledge):
+            return self.knowledge_sources or None
+        sources = [self.knowledge_sources] if isinstance(self.knowledge_sources, str) else list(self.knowledge_sources)
+        name = re.sub(r"[^\w.-]+", "_", self.name)
+        digest = hashlib.sha1(json.dumps(sorted(map(str, sources))).encode()).hexdigest()[:8]
+        return Knowledge(
+            sources,
+            path=os.path.join(".praison", "knowledge", f"{name}-{digest}.db"),
+            embedder_config=self.embedder_config,
+            base_url=self.base_url,
+            api_key=self.api_key
+        )
+
+    def spawn(self, **overrides) -> 'Agent':
+        """
+        Return a cheap copy of this agent for a new conversation.
+
+        Configuration, the request policy and the compiled tool schemas and
+        dispatch table (with their call stats) are shared with this agent;
+        the default session (chat history, context summaries), LLM stats and
+        the console start fresh; so does the knowledge index when
+        knowledge_sources or embedder_config is overridden. To serve many
+        conversations with one agent, new_session() is cheaper still. Keyword
+        arguments replace any setting stored on the agent (e.g. name, llm,
+        tools, verbose); hedge_requests, hedge_percentile and hedge_delay
+        rebuild the request policy.
+        """
+        if self.tools:
+            # Compile the tools once here so every clone shares the result
+            self._tool_registry
+        clone = object.__new__(type(self))
+        names, read, setters = _slot_names(type(self))
+        try:
+            for store, value in zip(setters, read(self)):
+                store(clone, value)
+        except AttributeError:
+            # A subclass slot that was never assigned
+            for name in names:
+                if hasattr(self, name):
+                    object.__setattr__(clone, name, getattr(self, name))
+        if hasattr(self, '__dict__'):
+            # Subclasses without __slots__ keep their own attributes
+            clone.__dict__.update(self.__dict__)
+
+        clone.tools = list(self.tools)
+        clone._session = None
+        clone._console = None
+        clone._llm_stats = None
+        clone._llm_stats_lock = threading.Lock()
+        clone._rate_limiters = None
+
+        hedge = {key: overrides.pop(key) for key in ('hedge_requests', 'hedge_percentile', 'hedge_delay') if key in overrides}
+        for key, value in overrides.items():
+            if key.startswith('_') or not hasattr(clone, key):
+                raise TypeError(f"spawn() got an unexpected keyword argument '{key}'")
+            setattr(clone, key, value)
+
+        if 'tools' in overrides:
+            clone.tools = list(overrides['tools'] or [])
+            clone._registry = None
+        if 'tool_concurrency' in overrides:
+            clone._set_tool_concurrency(overrides['tool_concurrency'])
+        if 'max_tool_concurrency' in overrides:
+            clone.max_tool_concurrency = max(1, overrides['max_tool_concurrency'])
+        if 'knowledge_sources' in overrides or 'embedder_config' in overrides:
+            clone.knowledge = clone._build_knowledge()
+        if 'fallback_llms' in overrides or hedge:
+            current = self.request_policy
+            clone.request_policy = RequestPolicy(
+                clone.fallback_llms,
+                hedge=hedge.get('hedge_requests', current.hedge if current else False),
+                hedge_percentile=hedge.get('hedge_percentile', current.hedge_percentile if current else 95.0),
+                hedge_delay=hedge.get('hedge_delay', current.hedge_delay if current else None),
+                should_fallback=_fallback_allowed
+            ) if clone.fallback_llms else None
+        return clone
+
     def generate_task(self) -> 'Task':
         """Generate a Task object from the agent's instructions"""
         from ..task.task import Task
@@ -256,20 +551,15 @@ Your Goal: {self.goal}
             tools=self.tools
         )
 
-    def execute_tool(self, function_name, arguments):
-        """
-        Execute a tool dynamically based on the function name and arguments.
-        """
-        logging.debug(f"{self.name} executing tool {function_name} with arguments: {arguments}")
-
-        # Try to find the function in the agent's tools list first
+    def _resolve_tool(self, function_name):
+        """Find a tool that is not yet in the dispatch table and register it."""
         func = None
         for tool in self.tools:
             if (callable(tool) and getattr(tool, '__name__', '') == function_name) or \
                (inspect.isclass(tool) and tool.__name__ == function_name):
                 func = tool
                 break
-        
+
         if func is None:
             # If not found in tools, try globals and main
             func = globals().get(function_name)
@@ -277,146 +567,657 @@ Your Goal: {self.goal}
                 import __main__
                 func = getattr(__main__, function_name, None)
 
-        if func:
+        if func and callable(func):
+            return self._tool_registry.add_invoker(function_name, func)
+        return None
+
+    def _invoker_for(self, function_name, tools=None):
+        """
+        Dispatch-table invoker for the tool currently named function_name.
+        A tool replaced by another function of the same name gets a fresh
+        invoker instead of the cached one.
+        """
+        tool = next((t for t in (tools or self.tools or []) if callable(t) and getattr(t, '__name__', None) == function_name), None)
+        if tool is not None:
+            return self._tool_registry.add_invoker(function_name, tool)
+        return self._tool_registry.get_invoker(function_name) or self._resolve_tool(function_name)
+
+    def execute_tool(self, function_name, arguments):
+        """
+        Execute a tool dynamically based on the function name and arguments.
+        """
+        logging.debug(f"{self.name} executing tool {function_name} with arguments: {arguments}")
+
+        invoker = self._invoker_for(function_name)
+        if invoker is None:
+            error_msg = f"Tool '{function_name}' is not callable"
+            logging.error(error_msg)
+            return {"error": error_msg}
+
+        try:
+            return invoker.invoke(arguments)
+        except Exception as e:
+            error_msg = str(e)
+            logging.error(f"Error executing tool {function_name}: {error_msg}")
+            return {"error": error_msg}
+
+    def get_tool_stats(self):
+        """Return call counts and latency for each tool this agent has invoked."""
+        return self._tool_registry.stats()
+
+    def _record_llm_usage(self, role, model, elapsed, usage):
+        session = current_session.get()
+        if session is not None:
+            session.record_usage(usage)
+        with self._llm_stats_lock:
+            if self._llm_stats is None:
+                self._llm_stats = {}
+            stats = self._llm_stats.setdefault(role, {
+                "model": model,
+                "requests": 0,
+                "total_time": 0.0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0
+            })
+            stats["model"] = model
+            stats["requests"] += 1
+            stats["total_time"] += elapsed
+            if usage is not None:
+                stats["prompt_tokens"] += getattr(usage, 'prompt_tokens', 0) or 0
+                stats["completion_tokens"] += getattr(usage, 'completion_tokens', 0) or 0
+
+    def get_llm_stats(self):
+        """Return request count, latency and token usage for each model role."""
+        with self._llm_stats_lock:
+            return {
+                role: dict(stats, avg_time=stats["total_time"] / stats["requests"] if stats["requests"] else 0.0)
+                for role, stats in (self._llm_stats or {}).items()
+            }
+
+    def _routing_llm(self, tools):
+        """The model that should handle tool selection, if it differs from the main llm."""
+        if tools and isinstance(self.function_calling_llm, str) and self.function_calling_llm != self.llm:
+            return self.function_calling_llm
+        return None
+
+    def _run_tool_call(self, tool_call):
+        """Execute a single tool call, honouring any per-tool concurrency limit."""
+        function_name = tool_call.function.name
+        arguments = json.loads(tool_call.function.arguments)
+
+        if self.verbose:
+            self._display("tool_call", f"Agent {self.name} is calling function '{function_name}' with arguments: {arguments}")
+
+        limiter = self._tool_semaphores.get(function_name)
+        if limiter:
+            with limiter:
+                tool_result = self.execute_tool(function_name, arguments)
+        else:
+            tool_result = self.execute_tool(function_name, arguments)
+
+        if self.verbose and tool_result:
+            self._display("tool_call", f"Function '{function_name}' returned: {tool_result}")
+        return tool_result
+
+    def _execute_tool_calls(self, tool_calls, budget=None):
+        """
+        Execute the tool calls of one assistant turn and return the tool messages
+        in the order the calls were issued. Calls run on a bounded thread pool
+        when parallel_tool_calls is enabled. With an execution deadline, tools
+        still running when it passes are abandoned and reported as timed out.
+        """
+        timeout = budget.remaining() if budget else None
+        if timeout is not None:
+            workers = self.max_tool_concurrency if self.parallel_tool_calls else 1
+            results = map_with_deadline(
+                self._run_tool_call, tool_calls, workers, timeout, thread_name_prefix=f"{self.name}-tool"
+            )
+            for i, (tool_call, tool_result) in enumerate(zip(tool_calls, results)):
+                if isinstance(tool_result, TimeoutError):
+                    error_msg = f"Tool '{tool_call.function.name}' did not finish before the execution deadline"
+                    self._display("error", error_msg)
+                    results[i] = {"error": error_msg}
+        elif self.parallel_tool_calls and len(tool_calls) > 1:
+            workers = min(self.max_tool_concurrency, len(tool_calls))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{self.name}-tool") as pool:
+                results = list(pool.map(self._run_tool_call, tool_calls))
+        else:
+            results = [self._run_tool_call(tool_call) for tool_call in tool_calls]
+
+        return [
+            {
+                "role": "tool",
+                "tool_call_id": tool_call.id,
+                "content": json.dumps(tool_result) if tool_result else "Function returned an empty output"
+            }
+            for tool_call, tool_result in zip(tool_calls, results)
+        ]
+
+    async def _aexecute_tool_calls(self, tool_calls, tools, budget=None):
+        """
+        Async version of _execute_tool_calls. Coroutine tools are gathered on the
+        event loop and sync tools run on a bounded thread pool. Returns the raw
+        results in call order, with None for missing, failing or timed out tools.
+        """
+        limit = self.max_tool_concurrency if self.parallel_tool_calls else 1
+        turn_limiter = asyncio.Semaphore(limit)
+        tool_limiters = {name: asyncio.Semaphore(n) for name, n in self.tool_concurrency.items()}
+
+        async def run(tool_call, pool):
+            function_name = tool_call.function.name
             try:
-                # If it's a class with run method, instantiate and call run
-                if inspect.isclass(func) and hasattr(func, 'run'):
-                    instance = func()
-                    # Extract only the parameters that run() expects
-                    run_params = {k: v for k, v in arguments.items() 
-                                if k in inspect.signature(instance.run).parameters 
-                                and k != 'self'}
-                    return instance.run(**run_params)
-                # Otherwise treat as regular function
-                elif callable(func):
-                    return func(**arguments)
+                arguments = json.loads(tool_call.function.arguments)
+
+                # Find the matching tool
+                invoker = self._invoker_for(function_name, tools)
+                if not invoker:
+                    self._display("error", f"Tool {function_name} not found")
+                    return None
+
+                async with turn_limiter:
+                    tool_limiter = tool_limiters.get(function_name)
+                    if tool_limiter:
+                        await tool_limiter.acquire()
+                    try:
+                        timeout = budget.remaining() if budget else None
+                        return await asyncio.wait_for(invoker.ainvoke(arguments, pool), timeout)
+                    finally:
+                        if tool_limiter:
+                            tool_limiter.release()
+            except asyncio.TimeoutError:
+                self._display("error", f"Tool {function_name} did not finish before the execution deadline")
+                return None
             except Exception as e:
-                error_msg = str(e)
-                logging.error(f"Error executing tool {function_name}: {error_msg}")
-                return {"error": error_msg}
-        
-        error_msg = f"Tool '{function_name}' is not callable"
-        logging.error(error_msg)
-        return {"error": error_msg}
+                self._display("error", f"Error executing tool {function_name}: {e}")
+                return None
+
+        pool = ThreadPoolExecutor(max_workers=limit, thread_name_prefix=f"{self.name}-tool")
+        try:
+            return await asyncio.gather(*(run(tool_call, pool) for tool_call in tool_calls))
+        finally:
+            # Don't wait on sync tools that were abandoned at the deadline
+            pool.shutdown(wait=budget is None or not budget.expired())
+
+    def _get_client(self, max_retries=None):
+        """Borrow the shared sync client for this agent's endpoint."""
+        return client_manager.get_client(self.base_url, self.api_key, max_retries)
+
+    def _get_async_client(self, max_retries=None):
+        """Borrow the shared async client for this agent's endpoint."""
+        return client_manager.get_async_client(self.base_url, self.api_key, max_retries)
 
-    def clear_history(self):
-        self.chat_history = []
+    def _route_params(self, route, params, budget):
+        if budget and budget.expired():
+            raise budget.exceed("timeout", "LLM request did not finish before the execution deadline")
+        route_params = dict(params, model=route.model)
+        if budget and budget.remaining() is not None:
+            route_params["timeout"] = budget.remaining()
+        return route_params
+
+    def _open_completion(self, params, stream=False, budget=None):
+        """
+        Send a request through the endpoint's concurrency limiter, hedged and
+        falling back across request_policy's models when one is set. Streams
+        are returned once their first chunk has arrived.
+        """
+        def start(route):
+            route_params = self._route_params(route, params, budget)
+            limiter = get_concurrency_limiter(route.base_url)
+            client = client_manager.get_client(route.base_url, route.api_key, max_retries=limiter.client_retries)
+
+            def request():
+                if stream:
+                    return prefetch_stream(client.chat.completions.create(stream=True, **route_params))
+                return client.chat.completions.create(**route_params)
+
+            return limiter.call(request, timeout=route_params.get("timeout"))
+
+        primary = ModelRoute(params["model"], self.base_url, self.api_key)
+        if self.request_policy is None:
+            return start(primary)
+        return self.request_policy.execute(primary, start, stream)
+
+    async def _aopen_completion(self, params, stream=False, budget=None):
+        """Async version of _open_completion."""
+        async def start(route):
+            route_params = self._route_params(route, params, budget)
+            limiter = get_concurrency_limiter(route.base_url)
+            client = client_manager.get_async_client(route.base_url, route.api_key, max_retries=limiter.client_retries)
+
+            async def request():
+                if stream:
+                    return await aprefetch_stream(await client.chat.completions.create(stream=True, **route_params))
+                return await client.chat.completions.create(**route_params)
+
+            return await limiter.acall(request, route_params.get("timeout"))
+
+        primary = ModelRoute(params["model"], self.base_url, self.api_key)
+        if self.request_policy is None:
+            return await start(primary)
+        return await self.request_policy.aexecute(primary, start, stream)
+
+    @property
+    def console(self):
+        """The agent's Rich console, created on first use so headless agents never build one."""
+        if self._console is None:
+            self._console = Console()
+        return self._console
+
+    @console.setter
+    def console(self, value):
+        self._console = value
+
+    def _is_headless(self):
+        return self.headless if self.headless is not None else is_headless()
+
+    def _display(self, display_type, message, **kwargs):
+        """Render a display event, or pass it raw to the display callbacks when headless."""
+        if self._is_headless():
+            if display_type == "interaction":
+                dispatch_display_event(display_type, message=message, **kwargs)
+            else:
+                dispatch_display_event(display_type, message=message)
+            return
+        _DISPLAY_FUNCTIONS[display_type](message, console=self.console, **kwargs)
+
+    def clear_history(self, session=None):
+        (session or self.default_session).clear()
+
+    def _summarize_history(self, text):
+        """Condense older conversation turns for the context manager."""
+        response = self._create_completion(
+            messages=[
+                {"role": "system", "content": "Summarize the conversation below. Keep facts, decisions, names, numbers and open questions; be concise."},
+                {"role": "user", "content": text}
+            ],
+            temperature=0
+        )
+        return response.choices[0].message.content
 
     def __str__(self):
         return f"Agent(name='{self.name}', role='{self.role}', goal='{self.goal}')"
 
-    def _chat_completion(self, messages, temperature=0.2, tools=None, stream=True):
+    def _process_stream_response(self, response_stream, start_time, budget=None, json_parser=None):
+        """
+        Consume a streamed completion, rendering it live unless the agent is
+        headless, and return the rebuilt ChatCompletion.
+        """
+        if self._is_headless():
+            on_content = None
+            if 'generating' in sync_display_callbacks or 'generating' in async_display_callbacks:
+                on_content = lambda text: dispatch_display_event(
+                    "generating", content=text, elapsed_time=f"{time.time() - start_time:.1f}s"
+                )
+            return self._collect_stream(response_stream, start_time, budget, on_content, json_parser)
+
+        # Create Live display with proper configuration
+        with Live(
+            display_generating("", start_time),
+            console=self.console,
+            refresh_per_second=4,
+            transient=True,
+            vertical_overflow="ellipsis",
+            auto_refresh=True
+        ) as live:
+            response = self._collect_stream(
+                response_stream, start_time, budget,
+                lambda text: live.update(display_generating(text, start_time)),
+                json_parser
+            )
+
+        # Clear the last generating display with a blank line
+        self.console.print()
+        return response
+
+    def _collect_stream(self, response_stream, start_time, budget=None, on_content=None, json_parser=None):
+        """
+        Rebuild the final ChatCompletion from streamed deltas (content, tool
+        calls, finish_reason and usage), passing the text so far to on_content
+        as it grows. The stream is closed early if the execution deadline passes.
+        With a json_parser, the content is validated as it arrives and the
+        stream is closed as soon as the JSON object is complete.
+        """
+        content_parts = []
+        tool_calls = {}
+        finish_reason = None
+        usage = None
+        completion_id = None
+        model = self.llm
+        created = int(start_time)
+        full_response_text = ""
+
+        for chunk in response_stream:
+            if budget and budget.expired():
+                response_stream.close()
+                finish_reason = finish_reason or "length"
+                break
+            completion_id = completion_id or getattr(chunk, 'id', None)
+            model = getattr(chunk, 'model', None) or model
+            created = getattr(chunk, 'created', None) or created
+            # Usage arrives on a final chunk without choices when requested
+            usage = getattr(chunk, 'usage', None) or usage
+            if not chunk.choices:
+                continue
+
+            choice = chunk.choices[0]
+            delta = choice.delta
+            if choice.finish_reason:
+                finish_reason = choice.finish_reason
+
+            if delta.content:
+                content_parts.append(delta.content)
+                if on_content:
+                    full_response_text += delta.content
+                    on_content(full_response_text)
+                if json_parser:
+                    try:
+                        done = json_parser.feed(delta.content)
+                    except StructuredOutputError:
+                        response_stream.close()
+                        raise
+                    if done:
+                        # Anything after the closing brace would be discarded anyway
+                        response_stream.close()
+                        content_parts = [json_parser.text]
+                        finish_reason = "stop"
+                        break
+
+            # Tool call deltas arrive in fragments keyed by index: the first
+            # fragment carries id and name, later ones append to the arguments
+            for tc_delta in getattr(delta, 'tool_calls', None) or []:
+                entry = tool_calls.setdefault(tc_delta.index, {
+                    "id": None,
+                    "type": "function",
+                    "function": {"name": "", "arguments": ""}
+                })
+                if tc_delta.id:
+                    entry["id"] = tc_delta.id
+                if tc_delta.function:
+                    if tc_delta.function.name:
+                        entry["function"]["name"] += tc_delta.function.name
+                    if tc_delta.function.arguments:
+                        entry["function"]["arguments"] += tc_delta.function.arguments
+
+        message = {
+            "role": "assistant",
+            "content": "".join(content_parts) if content_parts or not tool_calls else None
+        }
+        if tool_calls:
+            message["tool_calls"] = [tool_calls[i] for i in sorted(tool_calls)]
+
+        return ChatCompletion.construct(
+            id=completion_id or f"chatcmpl-{int(time.time() * 1000)}",
+            object="chat.completion",
+            created=created,
+            model=model,
+            choices=[{
+                "index": 0,
+                "finish_reason": finish_reason or ("tool_calls" if tool_calls else "stop"),
+                "message": message
+            }],
+            usage=usage.model_dump() if usage is not None else None
+        )
+
+    def _get_rate_limiter(self, model):
+        """Return the shared rate limiter for a model, or None if this agent sets no budget."""
+        if not (self.max_rpm or self.max_tpm):
+            return None
+        if self._rate_limiters is None:
+            self._rate_limiters = {}
+        limiter = self._rate_limiters.get(model)
+        if limiter is None:
+            api_key = self.api_key or os.environ.get("OPENAI_API_KEY")
+            limiter = get_rate_limiter(model, api_key, rpm=self.max_rpm, tpm=self.max_tpm)
+            self._rate_limiters[model] = limiter
+        return limiter
+
+    def _flight_key(self, params):
+        """Key identifying identical concurrent requests, or None when coalescing is off."""
+        if not self.coalesce_requests:
+            return None
+        request = {k: v for k, v in params.items() if k not in ("timeout", "stream_options")}
+        return response_cache.make_key(base_url=self.base_url, api_key=self.api_key, **request)
+
+    def _cache_key(self, params, tools, cache=None):
+        """Return the response cache key for a request, or None when caching is bypassed."""
+        use_cache = self.cache if cache is None else cache
+        if not use_cache:
+            return None
+        return response_cache.make_key(
+            base_url=self.base_url,
+            api_key=self.api_key or os.environ.get("OPENAI_API_KEY"),
+            model=params["model"],
+            messages=params["messages"],
+            tools=self._tool_registry.schema_json(tools),
+            temperature=params.get("temperature"),
+            response_format=params.get("response_format")
+        )
+
+    def _create_completion(self, tools=None, stream=False, start_time=None, cache=None, budget=None, role="main", output_model=None, **params):
+        """
+        Send one chat completion request through the agent's request pipeline
+        and return a ChatCompletion, streamed into the live display if requested.
+        Each request counts against the budget, whose remaining time bounds it.
+        A streamed response expected to be JSON for output_model is parsed
+        and validated as it arrives (see StreamingJSONParser).
+        """
+        if budget:
+            budget.next_iteration()
+            if budget.remaining() is not None:
+                params["timeout"] = budget.remaining()
+        params.setdefault("model", self.llm)
+        formatted_tools = self._tool_registry.formatted(tools)
+        if formatted_tools:
+            params["tools"] = formatted_tools
+
+        cache_key = self._cache_key(params, tools, cache)
+        if cache_key:
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                logging.debug(f"{self.name} served completion from cache")
+                return ChatCompletion.construct(**cached)
+
+        def send():
+            limiter = self._get_rate_limiter(params["model"])
+            estimated = 0
+            if limiter:
+                estimated = estimate_tokens(params["messages"], params.get("max_tokens"))
+                limiter.acquire(estimated)
+
+            if stream:
+                # Ask for usage on the final chunk for token accounting
+                params.setdefault("stream_options", {"include_usage": True})
+
+            request_start = time.perf_counter()
+            try:
+                response = self._open_completion(params, stream, budget)
+                if stream:
+                    json_parser = StreamingJSONParser(output_model) if output_model else None
+                    response = self._process_stream_response(response, start_time or time.time(), budget, json_parser)
+            except (APITimeoutError, TimeoutError):
+                if budget and budget.expired():
+                    raise budget.exceed("timeout", "LLM request did not finish before the execution deadline")
+                raise
+
+            self._record_llm_usage(role, params["model"], time.perf_counter() - request_start, getattr(response, 'usage', None))
+            if limiter:
+                usage = getattr(response, 'usage', None)
+                limiter.reconcile(estimated, getattr(usage, 'total_tokens', None))
+
+            if cache_key:
+                response_cache.set(cache_key, response.model_dump(mode="json", exclude_none=True))
+            return response
+
+        flight_key = self._flight_key(params)
+        if flight_key is None:
+            return send()
+        try:
+            return request_coalescer.do(flight_key, send, timeout=params.get("timeout"), retry_on=_CALLER_ERRORS)
+        except FutureTimeoutError:
+            if budget:
+                raise budget.exceed("timeout", "LLM request did not finish before the execution deadline")
+            raise
+
+    async def _acreate_completion(self, tools=None, cache=None, budget=None, role="main", **params):
+        """Async version of _create_completion (non-streaming)."""
+        timeout = None
+        if budget:
+            budget.next_iteration()
+            timeout = budget.remaining()
+        params.setdefault("model", self.llm)
+        formatted_tools = self._tool_registry.formatted(tools)
+        if formatted_tools:
+            params["tools"] = formatted_tools
+
+        cache_key = self._cache_key(params, tools, cache)
+        if cache_key:
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                logging.debug(f"{self.name} served completion from cache")
+                return ChatCompletion.construct(**cached)
+
+        async def send():
+            limiter = self._get_rate_limiter(params["model"])
+            estimated = 0
+            if limiter:
+                estimated = estimate_tokens(params["messages"], params.get("max_tokens"))
+                await limiter.aacquire(estimated)
+
+            request_start = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(self._aopen_completion(params, budget=budget), timeout)
+            except (asyncio.TimeoutError, APITimeoutError):
+                if budget and budget.expired():
+                    raise budget.exceed("timeout", "LLM request did not finish before the execution deadline")
+                raise
+
+            self._record_llm_usage(role, params["model"], time.perf_counter() - request_start, getattr(response, 'usage', None))
+            if limiter:
+                usage = getattr(response, 'usage', None)
+                limiter.reconcile(estimated, getattr(usage, 'total_tokens', None))
+
+            if cache_key:
+                response_cache.set(cache_key, response.model_dump(mode="json", exclude_none=True))
+            return response
+
+        flight_key = self._flight_key(params)
+        if flight_key is None:
+            return await send()
+        try:
+            return await request_coalescer.ado(flight_key, send, timeout=timeout, retry_on=_CALLER_ERRORS)
+        except asyncio.TimeoutError:
+            if budget and budget.expired():
+                raise budget.exceed("timeout", "LLM request did not finish before the execution deadline")
+            raise
+
+    def _chat_completion(self, messages, temperature=0.2, tools=None, stream=True, cache=None, budget=None, output_model=None):
         start_time = time.time()
         logging.debug(f"{self.name} sending messages to LLM: {messages}")
 
-        formatted_tools = []
         if tools is None:
             tools = self.tools
-        if tools:
-            for tool in tools:
-                if isinstance(tool, str):
-                    # Generate tool definition for string tool names
-                    tool_def = self._generate_tool_definition(tool)
-                    if tool_def:
-                        formatted_tools.append(tool_def)
-                    else:
-                        logging.warning(f"Could not generate definition for tool: {tool}")
-                elif isinstance(tool, dict):
-                    formatted_tools.append(tool)
-                elif hasattr(tool, "to_openai_tool"):
-                    formatted_tools.append(tool.to_openai_tool())
-                elif callable(tool):
-                    formatted_tools.append(self._generate_tool_definition(tool.__name__))
-                else:
-                    logging.warning(f"Tool {tool} not recognized")
 
         try:
-            initial_response = client.chat.completions.create(
-                model=self.llm,
+            # When streaming, the final message (including any tool calls) is
+            # rebuilt from the deltas so no second request is needed
+            # Tool selection may go to the cheaper function_calling_llm; its
+            # output is never shown, so that request is not streamed
+            formatted_tools = self._tool_registry.formatted(tools)
+            routing_llm = self._routing_llm(formatted_tools)
+            initial_response = self._create_completion(
                 messages=messages,
                 temperature=temperature,
-                tools=formatted_tools if formatted_tools else None,
-                stream=False
+                tools=tools,
+                stream=stream and not routing_llm,
+                start_time=start_time,
+                cache=cache,
+                budget=budget,
+                model=routing_llm or self.llm,
+                role="function_calling" if routing_llm else "main",
+                # Tool calls may follow text, so only stop early when no tools are offered
+                output_model=None if formatted_tools else output_model
             )
 
             tool_calls = getattr(initial_response.choices[0].message, 'tool_calls', None)
 
-            if tool_calls:
-                messages.append({
-                    "role": "assistant",
-                    "content": initial_response.choices[0].message.content,
-                    "tool_calls": tool_calls
-                })
+            if not tool_calls:
+                if not routing_llm:
+                    return initial_response
+                # No tools needed, so the main model writes the answer
+                return self._create_completion(
+                    messages=messages,
+                    temperature=temperature,
+                    stream=stream,
+                    start_time=start_time,
+                    cache=cache,
+                    budget=budget,
+                    output_model=output_model
+                )
 
-                for tool_call in tool_calls:
-                    function_name = tool_call.function.name
-                    arguments = json.loads(tool_call.function.arguments)
+            messages.append({
+                "role": "assistant",
+                "content": initial_response.choices[0].message.content,
+                "tool_calls": tool_calls
+            })
 
-                    if self.verbose:
-                        display_tool_call(f"Agent {self.name} is calling function '{function_name}' with arguments: {arguments}")
+            messages.extend(self._execute_tool_calls(tool_calls, budget))
 
-                    tool_result = self.execute_tool(function_name, arguments)
-                    results_str = json.dumps(tool_result) if tool_result else "Function returned an empty output"
+            return self._create_completion(
+                messages=messages,
+                temperature=temperature,
+                stream=stream,
+                start_time=start_time,
+                cache=cache,
+                budget=budget,
+                output_model=output_model
+            )
 
-                    if self.verbose:
-                        display_tool_call(f"Function '{function_name}' returned: {results_str}")
+        except (BudgetExceeded, StructuredOutputError):
+            raise
+        except Exception as e:
+            self._display("error", f"Error in chat completion: {e}")
+            return None
 
-                    messages.append({
-                        "role": "tool",
-                        "tool_call_id": tool_call.id,
-                        "content": results_str
-                    })
+    def chat(self, prompt, temperature=0.2, tools=None, output_json=None, output_pydantic=None, cache=None, session=None):
+        """
+        Send a prompt and return the response text. The turn is part of
+        session's conversation (the agent's default session when None).
+        With output_json or output_pydantic, a response that isn't JSON
+        matching the model raises StructuredOutputError.
+        """
+        return self._run_chat(prompt, temperature, tools, output_json, output_pydantic, cache, session)[0]
 
-            if stream:
-                response_stream = client.chat.completions.create(
-                    model=self.llm,
-                    messages=messages,
-                    temperature=temperature,
-                    stream=True
-                )
-                full_response_text = ""
-                
-                # Create Live display with proper configuration
-                with Live(
-                    display_generating("", start_time),
-                    console=self.console,
-                    refresh_per_second=4,
-                    transient=True,  # Changed to False to preserve output
-                    vertical_overflow="ellipsis",
-                    auto_refresh=True
-                ) as live:
-                    for chunk in response_stream:
-                        if chunk.choices[0].delta.content:
-                            full_response_text += chunk.choices[0].delta.content
-                            live.update(display_generating(full_response_text, start_time))
-                
-                # Clear the last generating display with a blank line
-                self.console.print()
-                
-                final_response = client.chat.completions.create(
-                    model=self.llm,
-                    messages=messages,
-                    temperature=temperature,
-                    stream=False
-                )
-                return final_response
-            else:
-                if tool_calls:
-                    final_response = client.chat.completions.create(
-                        model=self.llm,
-                        messages=messages,
-                        temperature=temperature,
-                        stream=False
-                    )
-                    return final_response
-                else:
-                    return initial_response
+    def _run_chat(self, prompt, temperature=0.2, tools=None, output_json=None, output_pydantic=None, cache=None, session=None):
+        """
+        chat() returning (response, status) for this call alone; concurrent
+        callers of the same session can't see each other's status. status
+        is None when the turn failed.
+        """
+        session = session or self.default_session
+        token = current_session.set(session)
+        try:
+            result, status = self._chat(prompt, temperature, tools, output_json, output_pydantic, cache, session)
+        finally:
+            current_session.reset(token)
+        if status:
+            session.last_run_status = status
+        return result, status
 
+    def _knowledge_message(self, prompt):
+        """A system message carrying the knowledge chunks relevant to prompt, or None."""
+        if self.knowledge is None:
+            return None
+        query = prompt if isinstance(prompt, str) else " ".join(item["text"] for item in prompt if item["type"] == "text")
+        try:
+            context = self.knowledge.build_context(query)
         except Exception as e:
-            display_error(f"Error in chat completion: {e}")
+            logging.warning(f"Knowledge search failed for agent {self.name}: {e}")
             return None
+        if not context:
+            return None
+        return {"role": "system", "content": f"Use the following knowledge where it is relevant:\n\n{context}"}
 
-    def chat(self, prompt, temperature=0.2, tools=None, output_json=None, output_pydantic=None):
+    def _chat(self, prompt, temperature, tools, output_json, output_pydantic, cache, session):
         if self.use_system_prompt:
             system_prompt = f"""{self.backstory}\n
 Your Role: {self.role}\n
@@ -432,7 +1233,7 @@ Your Goal: {self.goal}
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
-        messages.extend(self.chat_history)
+        messages.extend(session.chat_history)
 
         # Modify prompt if output_json or output_pydantic is specified
         original_prompt = prompt
@@ -446,15 +1247,25 @@ Your Goal: {self.goal}
                         item["text"] += "\nReturn ONLY a valid JSON object. No other text or explanation."
                         break
 
+        knowledge = self._knowledge_message(original_prompt)
+        if knowledge:
+            messages.append(knowledge)
+
         if isinstance(prompt, list):
             # If we receive a multimodal prompt list, place it directly in the user message
             messages.append({"role": "user", "content": prompt})
         else:
             messages.append({"role": "user", "content": prompt})
 
+        context_manager = self._context_for(session)
+        if context_manager:
+            messages = context_manager.fit(messages)
+
         final_response_text = None
         reflection_count = 0
         start_time = time.time()
+        budget = ExecutionBudget(self.max_execution_time, self.max_iter)
+        response_text = None
 
         while True:
             try:
@@ -468,17 +1279,17 @@ Your Goal: {self.goal}
                     if display_text and str(display_text).strip():
                         # Pass agent information to display_instruction
                         agent_tools = [t.__name__ if hasattr(t, '__name__') else str(t) for t in self.tools]
-                        display_instruction(
-                            f"Agent {self.name} is processing prompt: {display_text}", 
-                            console=self.console,
+                        self._display(
+                            "instruction",
+                            f"Agent {self.name} is processing prompt: {display_text}",
                             agent_name=self.name,
                             agent_role=self.role,
                             agent_tools=agent_tools
                         )
 
-                response = self._chat_completion(messages, temperature=temperature, tools=tools if tools else None)
+                response = self._chat_completion(messages, temperature=temperature, tools=tools if tools else None, cache=cache, budget=budget, output_model=output_json or output_pydantic)
                 if not response:
-                    return None
+                    return None, None
 
                 tool_calls = getattr(response.choices[0].message, 'tool_calls', None)
                 response_text = response.choices[0].message.content.strip()
@@ -490,52 +1301,28 @@ Your Goal: {self.goal}
                         "tool_calls": tool_calls
                     })
                     
-                    for tool_call in tool_calls:
-                        function_name = tool_call.function.name
-                        arguments = json.loads(tool_call.function.arguments)
+                    messages.extend(self._execute_tool_calls(tool_calls, budget))
 
-                        if self.verbose:
-                            display_tool_call(f"Agent {self.name} is calling function '{function_name}' with arguments: {arguments}", console=self.console)
-
-                        tool_result = self.execute_tool(function_name, arguments)
-
-                        if tool_result:
-                            if self.verbose:
-                                display_tool_call(f"Function '{function_name}' returned: {tool_result}", console=self.console)
-                            messages.append({
-                                "role": "tool",
-                                "tool_call_id": tool_call.id,
-                                "content": json.dumps(tool_result)
-                            })
-                        else:
-                            messages.append({
-                                "role": "tool",
-                                "tool_call_id": tool_call.id,
-                                "content": "Function returned an empty output"
-                            })
-                        
-                    response = self._chat_completion(messages, temperature=temperature)
+                    response = self._chat_completion(messages, temperature=temperature, cache=cache, budget=budget, output_model=output_json or output_pydantic)
                     if not response:
-                        return None
+                        return None, None
                     response_text = response.choices[0].message.content.strip()
 
                 # Handle output_json or output_pydantic if specified
                 if output_json or output_pydantic:
+                    parse_json_output(response_text, output_json or output_pydantic)
                     # Add to chat history and return raw response
-                    self.chat_history.append({"role": "user", "content": original_prompt})
-                    self.chat_history.append({"role": "assistant", "content": response_text})
+                    session.add_turn(original_prompt, response_text)
                     if self.verbose:
-                        display_interaction(original_prompt, response_text, markdown=self.markdown, 
-                                         generation_time=time.time() - start_time, console=self.console)
-                    return response_text
+                        self._display("interaction", original_prompt, response=response_text, markdown=self.markdown, generation_time=time.time() - start_time)
+                    return response_text, budget.status()
 
                 if not self.self_reflect:
-                    self.chat_history.append({"role": "user", "content": original_prompt})
-                    self.chat_history.append({"role": "assistant", "content": response_text})
+                    session.add_turn(original_prompt, response_text)
                     if self.verbose:
                         logging.debug(f"Agent {self.name} final response: {response_text}")
-                    display_interaction(original_prompt, response_text, markdown=self.markdown, generation_time=time.time() - start_time, console=self.console)
-                    return response_text
+                    self._display("interaction", original_prompt, response=response_text, markdown=self.markdown, generation_time=time.time() - start_time)
+                    return response_text, budget.status()
 
                 reflection_prompt = f"""
 Reflect on your previous response: '{response_text}'.
@@ -547,55 +1334,77 @@ Output MUST be JSON with 'reflection' and 'satisfactory'.
                 messages.append({"role": "user", "content": reflection_prompt})
 
                 try:
-                    reflection_response = client.beta.chat.completions.parse(
-                        model=self.reflect_llm if self.reflect_llm else self.llm,
-                        messages=messages,
-                        temperature=temperature,
-                        response_format=ReflectionOutput
+                    budget.next_iteration()
+                    limiter = get_concurrency_limiter(self.base_url)
+                    client = self._get_client(max_retries=limiter.client_retries)
+                    reflection_response = limiter.call(
+                        lambda: client.beta.chat.completions.parse(
+                            model=self.reflect_llm if self.reflect_llm else self.llm,
+                            messages=messages,
+                            temperature=temperature,
+                            response_format=ReflectionOutput,
+                            timeout=budget.remaining()
+                        ),
+                        timeout=budget.remaining()
                     )
 
                     reflection_output = reflection_response.choices[0].message.parsed
 
                     if self.verbose:
-                        display_self_reflection(f"Agent {self.name} self reflection (using {self.reflect_llm if self.reflect_llm else self.llm}): reflection='{reflection_output.reflection}' satisfactory='{reflection_output.satisfactory}'", console=self.console)
+                        self._display("self_reflection", f"Agent {self.name} self reflection (using {self.reflect_llm if self.reflect_llm else self.llm}): reflection='{reflection_output.reflection}' satisfactory='{reflection_output.satisfactory}'")
 
                     messages.append({"role": "assistant", "content": f"Self Reflection: {reflection_output.reflection} Satisfactory?: {reflection_output.satisfactory}"})
 
                     # Only consider satisfactory after minimum reflections
                     if reflection_output.satisfactory == "yes" and reflection_count >= self.min_reflect - 1:
                         if self.verbose:
-                            display_self_reflection("Agent marked the response as satisfactory after meeting minimum reflections", console=self.console)
-                        self.chat_history.append({"role": "user", "content": prompt})
-                        self.chat_history.append({"role": "assistant", "content": response_text})
-                        display_interaction(prompt, response_text, markdown=self.markdown, generation_time=time.time() - start_time, console=self.console)
-                        return response_text
+                            self._display("self_reflection", "Agent marked the response as satisfactory after meeting minimum reflections")
+                        session.add_turn(prompt, response_text)
+                        self._display("interaction", prompt, response=response_text, markdown=self.markdown, generation_time=time.time() - start_time)
+                        return response_text, budget.status()
 
                     # Check if we've hit max reflections
                     if reflection_count >= self.max_reflect - 1:
                         if self.verbose:
-                            display_self_reflection("Maximum reflection count reached, returning current response", console=self.console)
-                        self.chat_history.append({"role": "user", "content": prompt})
-                        self.chat_history.append({"role": "assistant", "content": response_text})
-                        display_interaction(prompt, response_text, markdown=self.markdown, generation_time=time.time() - start_time, console=self.console)
-                        return response_text
+                            self._display("self_reflection", "Maximum reflection count reached, returning current response")
+                        session.add_turn(prompt, response_text)
+                        self._display("interaction", prompt, response=response_text, markdown=self.markdown, generation_time=time.time() - start_time)
+                        return response_text, budget.status()
 
                     logging.debug(f"{self.name} reflection count {reflection_count + 1}, continuing reflection process")
                     messages.append({"role": "user", "content": "Now regenerate your response using the reflection you made"})
-                    response = self._chat_completion(messages, temperature=temperature, tools=None, stream=True)
+                    response = self._chat_completion(messages, temperature=temperature, tools=None, stream=True, cache=cache, budget=budget)
                     response_text = response.choices[0].message.content.strip()
                     reflection_count += 1
                     continue  # Continue the loop for more reflections
 
+                except BudgetExceeded:
+                    raise
                 except Exception as e:
-                    display_error(f"Error in parsing self-reflection json {e}. Retrying", console=self.console)
+                    if budget.expired():
+                        raise budget.exceed("timeout", "Maximum execution time reached")
+                    self._display("error", f"Error in parsing self-reflection json {e}. Retrying")
                     logging.error("Reflection parsing failed.", exc_info=True)
                     messages.append({"role": "assistant", "content": f"Self Reflection failed."})
                     reflection_count += 1
                     continue  # Continue even after error to try again
                 
+            except BudgetExceeded as e:
+                return self._partial_response(original_prompt, response_text, e, start_time, session)
+            except StructuredOutputError:
+                raise
             except Exception as e:
-                display_error(f"Error in chat: {e}", console=self.console)
-                return None 
+                self._display("error", f"Error in chat: {e}")
+                return None, None
+
+    def _partial_response(self, prompt, response_text, error, start_time, session):
+        """Record and return the best response available when the execution budget ran out, with its status."""
+        self._display("error", f"Agent {self.name} stopped early: {error}. Returning partial result.")
+        if response_text:
+            session.add_turn(prompt, response_text)
+            if self.verbose:
+                self._display("interaction", prompt, response=response_text, markdown=self.markdown, generation_time=time.time() - start_time)
+        return response_text, error.reason
 
     def clean_json_output(self, output: str) -> str:
         """Clean and extract JSON from response text."""
@@ -609,43 +1418,86 @@ Output MUST be JSON with 'reflection' and 'satisfactory'.
             cleaned = cleaned[:-3].strip()
         return cleaned 
 
-    async def achat(self, prompt, temperature=0.2, tools=None, output_json=None, output_pydantic=None):
-        """Async version of chat method"""
+    def _build_messages(self, prompt, output_json=None, output_pydantic=None, history=()):
+        """System and user messages for a prompt, after any history given (chat_history is not read)."""
+        system_prompt = self.system_prompt
+        if output_json:
+            system_prompt += f"\nReturn ONLY a JSON object that matches this Pydantic model: {output_json.schema_json()}"
+        elif output_pydantic:
+            system_prompt += f"\nReturn ONLY a JSON object that matches this Pydantic model: {output_pydantic.schema_json()}"
+
+        if isinstance(prompt, str):
+            return [
+                {"role": "system", "content": system_prompt},
+                *history,
+                {"role": "user", "content": prompt + ("\nReturn ONLY a valid JSON object. No other text or explanation." if (output_json or output_pydantic) else "")}
+            ]
+        # For multimodal prompts
+        messages = [
+            {"role": "system", "content": system_prompt},
+            *history,
+            {"role": "user", "content": prompt}
+        ]
+        if output_json or output_pydantic:
+            # Add JSON instruction to text content
+            for item in messages[-1]["content"]:
+                if item["type"] == "text":
+                    item["text"] += "\nReturn ONLY a valid JSON object. No other text or explanation."
+                    break
+        return messages
+
+    async def achat(self, prompt, temperature=0.2, tools=None, output_json=None, output_pydantic=None, cache=None, session=None):
+        """
+        Async version of chat method. Without a session the prompt is
+        answered on its own (history is not used); with one, the turn
+        continues and extends that session's conversation. Only the tools
+        passed are offered, and their results go back to the model as in
+        chat(); self-reflection is not run.
+        """
+        return (await self._arun_chat(prompt, temperature, tools, output_json, output_pydantic, cache, session))[0]
+
+    async def _arun_chat(self, prompt, temperature=0.2, tools=None, output_json=None, output_pydantic=None, cache=None, session=None, reflect=False):
+        """Async version of _run_chat; reflect=True runs self-reflection as chat() does."""
+        target = session or self.default_session
+        token = current_session.set(target)
         try:
-            # Build system prompt
-            system_prompt = self.system_prompt
-            if output_json:
-                system_prompt += f"\nReturn ONLY a JSON object that matches this Pydantic model: {output_json.schema_json()}"
-            elif output_pydantic:
-                system_prompt += f"\nReturn ONLY a JSON object that matches this Pydantic model: {output_pydantic.schema_json()}"
+            result, status = await self._achat(prompt, temperature, tools, output_json, output_pydantic, cache, session=session, reflect=reflect)
+        except BudgetExceeded as e:
+            self._display("error", f"Agent {self.name} stopped early: {e}")
+            result, status = None, e.reason
+        except StructuredOutputError:
+            raise
+        except Exception as e:
+            self._display("error", f"Error in chat completion: {e}")
+            return None, None
+        finally:
+            current_session.reset(token)
+        target.last_run_status = status
+        return result, status
 
-            # Build messages
-            if isinstance(prompt, str):
-                messages = [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt + ("\nReturn ONLY a valid JSON object. No other text or explanation." if (output_json or output_pydantic) else "")}
-                ]
-            else:
-                # For multimodal prompts
-                messages = [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt}
-                ]
-                if output_json or output_pydantic:
-                    # Add JSON instruction to text content
-                    for item in messages[-1]["content"]:
-                        if item["type"] == "text":
-                            item["text"] += "\nReturn ONLY a valid JSON object. No other text or explanation."
-                            break
+    async def _achat(self, prompt, temperature=0.2, tools=None, output_json=None, output_pydantic=None, cache=None, display=True, session=None, reflect=False):
+        """Run one prompt and return (result, status); errors propagate."""
+        budget = ExecutionBudget(self.max_execution_time, self.max_iter)
+        messages = self._build_messages(prompt, output_json, output_pydantic, session.chat_history if session else ())
+        if self.knowledge is not None:
+            knowledge = await asyncio.get_running_loop().run_in_executor(None, self._knowledge_message, prompt)
+            if knowledge:
+                messages.insert(-1, knowledge)
+        context_manager = self._context_for(session) if session else None
+        if context_manager:
+            messages = context_manager.fit(messages)
 
-            # Display instruction with agent info if verbose
-            if self.verbose:
-                display_text = prompt
-                if isinstance(prompt, list):
-                    display_text = next((item["text"] for item in prompt if item["type"] == "text"), "")
-                
-                if display_text and str(display_text).strip():
-                    agent_tools = [t.__name__ if hasattr(t, '__name__') else str(t) for t in self.tools]
+        # Display instruction with agent info if verbose
+        if self.verbose and display:
+            display_text = prompt
+            if isinstance(prompt, list):
+                display_text = next((item["text"] for item in prompt if item["type"] == "text"), "")
+
+            if display_text and str(display_text).strip():
+                agent_tools = [t.__name__ if hasattr(t, '__name__') else str(t) for t in self.tools]
+                if self._is_headless():
+                    self._display("instruction", f"Agent {self.name} is processing prompt: {display_text}")
+                else:
                     await adisplay_instruction(
                         f"Agent {self.name} is processing prompt: {display_text}",
                         console=self.console,
@@ -654,110 +1506,506 @@ Output MUST be JSON with 'reflection' and 'satisfactory'.
                         agent_tools=agent_tools
                     )
 
-            # Format tools if provided
-            formatted_tools = []
-            if tools:
-                for tool in tools:
-                    if isinstance(tool, str):
-                        tool_def = self._generate_tool_definition(tool)
-                        if tool_def:
-                            formatted_tools.append(tool_def)
-                    elif isinstance(tool, dict):
-                        formatted_tools.append(tool)
-                    elif hasattr(tool, "to_openai_tool"):
-                        formatted_tools.append(tool.to_openai_tool())
-                    elif callable(tool):
-                        formatted_tools.append(self._generate_tool_definition(tool.__name__))
-
-            # Create async OpenAI client
-            async_client = AsyncOpenAI()
-
-            # Make the API call based on the type of request
-            if tools:
-                response = await async_client.chat.completions.create(
-                    model=self.llm,
-                    messages=messages,
-                    temperature=temperature,
-                    tools=formatted_tools
-                )
-                return await self._achat_completion(response, tools)
-            elif output_json or output_pydantic:
-                response = await async_client.chat.completions.create(
-                    model=self.llm,
-                    messages=messages,
-                    temperature=temperature,
-                    response_format={"type": "json_object"}
-                )
-                # Return the raw response
-                return response.choices[0].message.content
-            else:
-                response = await async_client.chat.completions.create(
-                    model=self.llm,
-                    messages=messages,
-                    temperature=temperature
-                )
-                return response.choices[0].message.content
+        json_format = {"response_format": {"type": "json_object"}} if (output_json or output_pydantic) else {}
+        routing_llm = self._routing_llm(self._tool_registry.formatted(tools))
+        response = await self._acreate_completion(
+            messages=messages,
+            temperature=temperature,
+            tools=tools,
+            cache=cache,
+            budget=budget,
+            model=routing_llm or self.llm,
+            role="function_calling" if routing_llm else "main",
+            **({} if tools else json_format)
+        )
+        message = response.choices[0].message
+        if message.tool_calls:
+            # As in chat(): the results go back as tool messages in the same conversation
+            messages.append({
+                "role": "assistant",
+                "content": message.content,
+                "tool_calls": [tool_call.model_dump() for tool_call in message.tool_calls]
+            })
+            results = await self._aexecute_tool_calls(message.tool_calls, tools, budget)
+            for tool_call, tool_result in zip(message.tool_calls, results):
+                messages.append({
+                    "role": "tool",
+                    "tool_call_id": tool_call.id,
+                    "content": json.dumps(tool_result) if tool_result else "Function returned an empty output"
+                })
+            try:
+                response = await self._acreate_completion(messages=messages, temperature=temperature, cache=cache, budget=budget, **json_format)
+            except BudgetExceeded as e:
+                # Out of time: the raw tool results are the partial answer
+                self._display("error", f"Agent {self.name} stopped early: {e}. Returning tool results.")
+                return "\n".join(str(r) for r in results if r is not None) or None, e.reason
+        elif routing_llm:
+            # No tools needed, so the main model writes the answer
+            response = await self._acreate_completion(messages=messages, temperature=temperature, cache=cache, budget=budget, **json_format)
+        result = response.choices[0].message.content
+
+        if reflect and self.self_reflect and result and not (output_json or output_pydantic):
+            try:
+                result = await self._areflect(messages, result, temperature, cache, budget)
+            except BudgetExceeded as e:
+                # As in chat(): keep the response from before the reflection ran out of budget
+                self._display("error", f"Agent {self.name} stopped early: {e}. Returning partial result.")
+                if session:
+                    session.add_turn(prompt, result)
+                return result, e.reason
+        if (output_json or output_pydantic) and result is not None:
+            parse_json_output(result, output_json or output_pydantic)
+        if session and result:
+            session.add_turn(prompt, result)
+        return result, budget.status()
+
+    async def _achat_item(self, index, prompt, **kwargs):
+        """Run one chat_many prompt without rendering, capturing its outcome as a BatchResult."""
+        started = time.perf_counter()
+        output, status, error = None, "error", None
+        try:
+            output, status = await self._achat(prompt, display=False, **kwargs)
+        except BudgetExceeded as e:
+            status, error = e.reason, str(e)
         except Exception as e:
-            display_error(f"Error in chat completion: {e}")
-            return None
+            logging.error(f"Agent {self.name} failed on prompt {index}: {e}")
+            error = str(e)
+        return BatchResult(index=index, prompt=prompt, output=output, status=status, error=error, elapsed=time.perf_counter() - started)
 
-    async def _achat_completion(self, response, tools):
-        """Async version of _chat_completion method"""
+    async def achat_many(
+        self,
+        prompts,
+        concurrency: int = 8,
+        ordered: bool = False,
+        checkpoint: Optional[str] = None,
+        batch_api: bool = False,
+        poll_interval: float = 30.0,
+        temperature: float = 0.2,
+        tools=None,
+        output_json=None,
+        output_pydantic=None,
+        cache=None
+    ) -> AsyncIterator[BatchResult]:
+        """
+        Run many independent prompts and yield a BatchResult for each as it
+        finishes (or in input order with ordered=True).
+
+        Prompts are stateless like achat(): chat_history is neither read nor
+        updated. Nothing is rendered per prompt and self-reflection is
+        skipped, so each prompt costs one request plus any tool rounds. At most `concurrency`
+        run at once over the shared client pool; prompts are read lazily from
+        any iterable. With a checkpoint path, every result is appended to
+        that JSONL file and a rerun skips prompts that already completed,
+        yielding their recorded results. batch_api=True submits everything
+        as one OpenAI Batch API job instead and polls for the results.
+        """
+        store = Checkpoint(checkpoint) if checkpoint else None
+        order = Reorder() if ordered else None
+        emit = order.push if order else (lambda result: [result])
+        request = dict(temperature=temperature, output_json=output_json, output_pydantic=output_pydantic)
+        running = set()
         try:
-            message = response.choices[0].message
-            if not hasattr(message, 'tool_calls') or not message.tool_calls:
-                return message.content
+            if batch_api:
+                pending = []
+                for index, prompt in enumerate(prompts):
+                    restored = store.get(index, prompt) if store else None
+                    if restored:
+                        for result in emit(restored):
+                            yield result
+                    else:
+                        pending.append((index, prompt))
+                if pending:
+                    async for result in run_batch_api(self, pending, store, poll_interval, **request):
+                        if store:
+                            store.record(result)
+                        for ready in emit(result):
+                            yield ready
+                return
 
-            results = []
-            for tool_call in message.tool_calls:
-                try:
-                    function_name = tool_call.function.name
-                    arguments = json.loads(tool_call.function.arguments)
-                    
-                    # Find the matching tool
-                    tool = next((t for t in tools if t.__name__ == function_name), None)
-                    if not tool:
-                        display_error(f"Tool {function_name} not found")
+            get_concurrency_limiter(self.base_url).expect(concurrency)
+            items = enumerate(prompts)
+            exhausted = False
+            while True:
+                while not exhausted and len(running) < max(1, concurrency):
+                    try:
+                        index, prompt = next(items)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    restored = store.get(index, prompt) if store else None
+                    if restored:
+                        for result in emit(restored):
+                            yield result
                         continue
-                    
-                    # Check if the tool is async
-                    if asyncio.iscoroutinefunction(tool):
-                        result = await tool(**arguments)
+                    running.add(asyncio.ensure_future(self._achat_item(index, prompt, tools=tools, cache=cache, **request)))
+                if not running:
+                    break
+                done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    if store:
+                        store.record(result)
+                    for ready in emit(result):
+                        yield ready
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+            if store:
+                store.close()
+
+    def chat_many(self, prompts, concurrency: int = 8, ordered: bool = False, checkpoint: Optional[str] = None, batch_api: bool = False, poll_interval: float = 30.0, **kwargs) -> Iterator[BatchResult]:
+        """
+        Synchronous version of achat_many, yielding each BatchResult as it
+        becomes available. Breaking out of the loop cancels outstanding prompts.
+        """
+        return self._iterate_in_thread(
+            self.achat_many(
+                prompts,
+                concurrency=concurrency,
+                ordered=ordered,
+                checkpoint=checkpoint,
+                batch_api=batch_api,
+                poll_interval=poll_interval,
+                **kwargs
+            ),
+            f"{self.name}-batch"
+        )
+
+    async def _areflect(self, messages, response_text, temperature, cache, budget):
+        """Self-reflection rounds for _achat, as in chat(); returns the final response text."""
+        reflection_count = 0
+        while True:
+            messages.append({"role": "assistant", "content": response_text})
+            messages.append({"role": "user", "content": f"""
+Reflect on your previous response: '{response_text}'.
+Identify any flaws, improvements, or actions.
+Provide a "satisfactory" status ('yes' or 'no').
+Output MUST be JSON with 'reflection' and 'satisfactory'.
+                """})
+            try:
+                budget.next_iteration()
+                limiter = get_concurrency_limiter(self.base_url)
+                client = self._get_async_client(max_retries=limiter.client_retries)
+                reflection_response = await limiter.acall(
+                    lambda: client.beta.chat.completions.parse(
+                        model=self.reflect_llm if self.reflect_llm else self.llm,
+                        messages=messages,
+                        temperature=temperature,
+                        response_format=ReflectionOutput,
+                        timeout=budget.remaining()
+                    ),
+                    timeout=budget.remaining()
+                )
+                reflection_output = reflection_response.choices[0].message.parsed
+            except BudgetExceeded:
+                raise
+            except Exception as e:
+                if budget.expired():
+                    raise budget.exceed("timeout", "Maximum execution time reached")
+                self._display("error", f"Error in parsing self-reflection json {e}. Retrying")
+                messages.append({"role": "assistant", "content": "Self Reflection failed."})
+                if reflection_count >= self.max_reflect - 1:
+                    return response_text
+                reflection_count += 1
+                continue
+
+            if self.verbose:
+                self._display("self_reflection", f"Agent {self.name} self reflection (using {self.reflect_llm if self.reflect_llm else self.llm}): reflection='{reflection_output.reflection}' satisfactory='{reflection_output.satisfactory}'")
+            if reflection_output.satisfactory == "yes" and reflection_count >= self.min_reflect - 1:
+                return response_text
+            if reflection_count >= self.max_reflect - 1:
+                return response_text
+
+            messages.append({"role": "assistant", "content": f"Self Reflection: {reflection_output.reflection} Satisfactory?: {reflection_output.satisfactory}"})
+            messages.append({"role": "user", "content": "Now regenerate your response using the reflection you made"})
+            response = await self._acreate_completion(messages=messages, temperature=temperature, cache=cache, budget=budget)
+            response_text = response.choices[0].message.content
+            reflection_count += 1
+
+    async def _astream_completion(self, tools=None, budget=None, role="main", **params):
+        """
+        Streaming counterpart of _acreate_completion that yields raw chunks.
+        Streamed requests bypass the response cache. The HTTP stream is closed
+        as soon as the consumer stops iterating.
+        """
+        if budget:
+            budget.next_iteration()
+        params.setdefault("model", self.llm)
+        formatted_tools = self._tool_registry.formatted(tools)
+        if formatted_tools:
+            params["tools"] = formatted_tools
+
+        limiter = self._get_rate_limiter(params["model"])
+        estimated = 0
+        if limiter:
+            estimated = estimate_tokens(params["messages"], params.get("max_tokens"))
+            await limiter.aacquire(estimated)
+
+        params.setdefault("stream_options", {"include_usage": True})
+        request_start = time.perf_counter()
+        usage = None
+        timeout = budget.remaining() if budget else None
+        try:
+            # The slot is held only while opening the stream, which is when
+            # providers reject overloaded requests
+            response_stream = await asyncio.wait_for(self._aopen_completion(params, stream=True, budget=budget), timeout)
+        except (asyncio.TimeoutError, APITimeoutError):
+            if budget and budget.expired():
+                raise budget.exceed("timeout", "LLM request did not finish before the execution deadline")
+            raise
+
+        try:
+            chunks = response_stream.__aiter__()
+            while True:
+                timeout = budget.remaining() if budget else None
+                try:
+                    if timeout is None:
+                        chunk = await chunks.__anext__()
                     else:
-                        # Run sync function in executor to avoid blocking
-                        loop = asyncio.get_event_loop()
-                        result = await loop.run_in_executor(None, lambda: tool(**arguments))
-                    
-                    results.append(result)
-                except Exception as e:
-                    display_error(f"Error executing tool {function_name}: {e}")
-                    results.append(None)
-
-            # If we have results, format them into a response
-            if results:
-                formatted_results = "\n".join([str(r) for r in results if r is not None])
-                if formatted_results:
-                    messages = [
-                        {"role": "system", "content": self.system_prompt},
-                        {"role": "assistant", "content": "Here are the tool results:"},
-                        {"role": "user", "content": formatted_results + "\nPlease process these results and provide a final response."}
-                    ]
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout)
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    raise budget.exceed("timeout", "LLM stream did not finish before the execution deadline")
+                usage = getattr(chunk, 'usage', None) or usage
+                yield chunk
+        finally:
+            await response_stream.close()
+            self._record_llm_usage(role, params["model"], time.perf_counter() - request_start, usage)
+            if limiter:
+                limiter.reconcile(estimated, getattr(usage, 'total_tokens', None))
+
+    async def _astream_turn(self, turn, **params):
+        """
+        Stream one model response as events. The full content, tool calls and
+        usage are left in the turn dict once the response is complete.
+        """
+        content_parts = []
+        tool_calls = {}
+        started = set()
+        async with aclosing(self._astream_completion(**params)) as chunks:
+            async for chunk in chunks:
+                if getattr(chunk, 'usage', None):
+                    turn["usage"] = chunk.usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if delta.content:
+                    content_parts.append(delta.content)
+                    yield StreamEvent(type="text", content=delta.content)
+                for tc_delta in getattr(delta, 'tool_calls', None) or []:
+                    entry = tool_calls.get(tc_delta.index)
+                    if entry is None:
+                        entry = tool_calls[tc_delta.index] = {
+                            "id": None,
+                            "type": "function",
+                            "function": {"name": "", "arguments": ""}
+                        }
+                    if tc_delta.id:
+                        entry["id"] = tc_delta.id
+                    if tc_delta.function:
+                        if tc_delta.function.name:
+                            entry["function"]["name"] += tc_delta.function.name
+                        if tc_delta.function.arguments:
+                            entry["function"]["arguments"] += tc_delta.function.arguments
+                    # One start event per tool call, once its name is complete (arguments follow the name)
+                    if entry["function"]["arguments"] and tc_delta.index not in started:
+                        started.add(tc_delta.index)
+                        yield StreamEvent(type="tool_call_start", tool_name=entry["function"]["name"], tool_call_id=entry["id"])
+        for index in sorted(tool_calls):
+            if index not in started:
+                yield StreamEvent(type="tool_call_start", tool_name=tool_calls[index]["function"]["name"], tool_call_id=tool_calls[index]["id"])
+        turn["content"] = "".join(content_parts)
+        turn["tool_calls"] = [tool_calls[index] for index in sorted(tool_calls)]
+
+    async def astream(self, prompt, temperature=0.2, tools=None, session=None) -> AsyncIterator[StreamEvent]:
+        """
+        Run a chat turn and yield StreamEvent objects as they happen: text
+        deltas, tool call start/end, tool results, reflections, and a final
+        event with the full response, token usage and run status.
+
+        Nothing is rendered to the terminal. The model stream is read only as
+        fast as the consumer iterates (backpressure), and closing the generator
+        or cancelling its task closes the underlying request. Tool rounds
+        repeat until the model stops calling tools, within max_iter. After a
+        reflection event, text events carry the regenerated response. The
+        turn belongs to session (the default session when None).
+        """
+        session = session or self.default_session
+        messages = []
+        if self.use_system_prompt:
+            messages.append({"role": "system", "content": self.system_prompt})
+        messages.extend(session.chat_history)
+        if self.knowledge is not None:
+            knowledge = await asyncio.get_running_loop().run_in_executor(None, self._knowledge_message, prompt)
+            if knowledge:
+                messages.append(knowledge)
+        messages.append({"role": "user", "content": prompt})
+        context_manager = self._context_for(session)
+        if context_manager:
+            messages = context_manager.fit(messages)
+
+        if tools is None:
+            tools = self.tools
+        budget = ExecutionBudget(self.max_execution_time, self.max_iter)
+        usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        response_text = ""
+
+        def add_usage(reported):
+            # Charged here rather than through current_session, which an
+            # async generator can't scope to its own steps
+            session.record_usage(reported)
+            for field in usage:
+                usage[field] += getattr(reported, field, 0) or 0
+
+        try:
+            while True:
+                turn = {}
+                routing_llm = self._routing_llm(self._tool_registry.formatted(tools))
+                if routing_llm:
+                    response = await self._acreate_completion(
+                        messages=messages,
+                        temperature=temperature,
+                        tools=tools,
+                        budget=budget,
+                        model=routing_llm,
+                        role="function_calling"
+                    )
+                    add_usage(response.usage)
+                    response_text = response.choices[0].message.content or ""
+                    tool_calls = [tool_call.model_dump() for tool_call in response.choices[0].message.tool_calls or []]
+                    for tool_call in tool_calls:
+                        yield StreamEvent(type="tool_call_start", tool_name=tool_call["function"]["name"], tool_call_id=tool_call["id"])
+                    if not tool_calls:
+                        # No tools needed, so the main model writes the answer
+                        async with aclosing(self._astream_turn(turn, messages=messages, temperature=temperature, budget=budget)) as events:
+                            async for event in events:
+                                yield event
+                        add_usage(turn.get("usage"))
+                        response_text = turn["content"] or response_text
+                        break
+                else:
+                    async with aclosing(self._astream_turn(turn, messages=messages, temperature=temperature, tools=tools, budget=budget)) as events:
+                        async for event in events:
+                            yield event
+                    add_usage(turn.get("usage"))
+                    response_text = turn["content"]
+                    tool_calls = turn["tool_calls"]
+                    if not tool_calls:
+                        break
+
+                calls = [ChatCompletionMessageToolCall(**tool_call) for tool_call in tool_calls]
+                for call in calls:
                     try:
-                        async_client = AsyncOpenAI()
-                        final_response = await async_client.chat.completions.create(
-                            model=self.llm,
+                        arguments = json.loads(call.function.arguments)
+                    except json.JSONDecodeError:
+                        arguments = call.function.arguments
+                    yield StreamEvent(type="tool_call_end", tool_name=call.function.name, tool_call_id=call.id, arguments=arguments)
+
+                messages.append({"role": "assistant", "content": response_text or None, "tool_calls": tool_calls})
+                results = await self._aexecute_tool_calls(calls, tools, budget)
+                for call, result in zip(calls, results):
+                    yield StreamEvent(type="tool_result", tool_name=call.function.name, tool_call_id=call.id, result=result)
+                    messages.append({
+                        "role": "tool",
+                        "tool_call_id": call.id,
+                        "content": json.dumps(result) if result else "Function returned an empty output"
+                    })
+
+            reflection_count = 0
+            while self.self_reflect:
+                messages.append({"role": "assistant", "content": response_text})
+                messages.append({"role": "user", "content": f"""
+Reflect on your previous response: '{response_text}'.
+Identify any flaws, improvements, or actions.
+Provide a "satisfactory" status ('yes' or 'no').
+Output MUST be JSON with 'reflection' and 'satisfactory'.
+                """})
+                try:
+                    budget.next_iteration()
+                    limiter = get_concurrency_limiter(self.base_url)
+                    client = self._get_async_client(max_retries=limiter.client_retries)
+                    reflection_response = await limiter.acall(
+                        lambda: client.beta.chat.completions.parse(
+                            model=self.reflect_llm if self.reflect_llm else self.llm,
                             messages=messages,
-                            temperature=0.2
-                        )
-                        return final_response.choices[0].message.content
-                    except Exception as e:
-                        display_error(f"Error in final chat completion: {e}")
-                        return formatted_results
-                return formatted_results
-            return None
-        except Exception as e:
-            display_error(f"Error in _achat_completion: {e}")
-            return None 
+                            temperature=temperature,
+                            response_format=ReflectionOutput,
+                            timeout=budget.remaining()
+                        ),
+                        timeout=budget.remaining()
+                    )
+                    add_usage(reflection_response.usage)
+                    reflection_output = reflection_response.choices[0].message.parsed
+                    if reflection_output is None:
+                        raise ValueError("the reflection was not valid JSON")
+                except BudgetExceeded:
+                    raise
+                except Exception as e:
+                    # As in chat(): a reflection that can't be parsed is retried, up to max_reflect
+                    if budget.expired():
+                        raise budget.exceed("timeout", "Maximum execution time reached")
+                    yield StreamEvent(type="error", content=f"Error in parsing self-reflection json {e}. Retrying")
+                    messages.append({"role": "assistant", "content": "Self Reflection failed."})
+                    if reflection_count >= self.max_reflect - 1:
+                        break
+                    reflection_count += 1
+                    continue
+                yield StreamEvent(type="reflection", content=reflection_output.reflection, satisfactory=reflection_output.satisfactory)
+
+                if reflection_output.satisfactory == "yes" and reflection_count >= self.min_reflect - 1:
+                    break
+                if reflection_count >= self.max_reflect - 1:
+                    break
+
+                messages.append({"role": "assistant", "content": f"Self Reflection: {reflection_output.reflection} Satisfactory?: {reflection_output.satisfactory}"})
+                messages.append({"role": "user", "content": "Now regenerate your response using the reflection you made"})
+                turn = {}
+                async with aclosing(self._astream_turn(turn, messages=messages, temperature=temperature, budget=budget)) as events:
+                    async for event in events:
+                        yield event
+                add_usage(turn.get("usage"))
+                response_text = turn["content"]
+                reflection_count += 1
+
+            status = budget.status()
+        except BudgetExceeded as e:
+            logging.warning(f"Agent {self.name} stopped early: {e}")
+            status = e.reason
+
+        session.last_run_status = status
+        if response_text:
+            session.add_turn(prompt, response_text)
+        yield StreamEvent(type="final", content=response_text, usage=usage, status=status)
+
+    def stream(self, prompt, temperature=0.2, tools=None, session=None) -> Iterator[StreamEvent]:
+        """
+        Synchronous version of astream. The agent runs on a private event loop
+        thread and each event is pulled on demand, so backpressure and early
+        exit (breaking out of the loop) behave as with astream.
+        """
+        return self._iterate_in_thread(self.astream(prompt, temperature=temperature, tools=tools, session=session), f"{self.name}-stream")
+
+    @staticmethod
+    def _iterate_in_thread(events, thread_name):
+        """Drive an async generator on a private event loop thread, one item per step."""
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, name=thread_name, daemon=True)
+        thread.start()
+        try:
+            while True:
+                try:
+                    event = asyncio.run_coroutine_threadsafe(events.__anext__(), loop).result()
+                except StopAsyncIteration:
+                    return
+                yield event
+        finally:
+            asyncio.run_coroutine_threadsafe(events.aclose(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
 
     def run(self):
         """Alias for start() method"""
@@ -0,0 +1,192 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from ..main import BatchResult
+
+if TYPE_CHECKING:
+    from .agent import Agent
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+_TERMINAL_STATES = {"completed", "failed", "expired", "cancelled"}
+
+
+class Checkpoint:
+    """
+    Append-only JSONL log of finished prompts, so an interrupted
+    chat_many() run can resume where it stopped.
+
+    Each line is a BatchResult, or a record of a submitted Batch API job.
+    Failed prompts are retried on resume; a truncated last line (from a
+    crash mid-write) is ignored.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.results: Dict[int, BatchResult] = {}
+        self.batch_id: Optional[str] = None
+        self.batch_indices: List[int] = []
+        self._lock = threading.Lock()
+        self._file = None
+        # A line cut short by a crash is finished before anything is appended
+        self._needs_newline = False
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                self._needs_newline = not line.endswith("\n")
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if "batch_id" in record:
+                    self.batch_id = record["batch_id"]
+                    self.batch_indices = record.get("indices", [])
+                elif record.get("batch_finished"):
+                    self.batch_id = None
+                    self.batch_indices = []
+                elif record.get("status") == "error":
+                    self.results.pop(record["index"], None)
+                else:
+                    self.results[record["index"]] = BatchResult(**record)
+        logging.debug(f"Checkpoint {self.path}: {len(self.results)} prompts already done")
+
+    def get(self, index: int, prompt: Any) -> Optional[BatchResult]:
+        """The recorded result for a prompt, if it finished in an earlier run."""
+        result = self.results.get(index)
+        return result if result is not None and result.prompt == prompt else None
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+                if self._needs_newline:
+                    self._file.write("\n")
+            self._file.write(json.dumps(record, default=str) + "\n")
+            self._file.flush()
+
+    def record(self, result: BatchResult) -> None:
+        self._write(result.model_dump())
+
+    def record_batch(self, batch_id: str, indices: List[int]) -> None:
+        self.batch_id, self.batch_indices = batch_id, list(indices)
+        self._write({"batch_id": batch_id, "indices": self.batch_indices})
+
+    def finish_batch(self) -> None:
+        self.batch_id, self.batch_indices = None, []
+        self._write({"batch_finished": True})
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class Reorder:
+    """Releases results in input order, holding back any that finish early."""
+
+    def __init__(self):
+        self.next_index = 0
+        self.waiting: Dict[int, BatchResult] = {}
+
+    def push(self, result: BatchResult) -> List[BatchResult]:
+        self.waiting[result.index] = result
+        ready = []
+        while self.next_index in self.waiting:
+            ready.append(self.waiting.pop(self.next_index))
+            self.next_index += 1
+        return ready
+
+
+def _parse_batch_line(line: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """(custom_id, output, error) from one line of a Batch API output or error file."""
+    record = json.loads(line)
+    response = record.get("response") or {}
+    body = response.get("body") or {}
+    if record.get("error"):
+        return record.get("custom_id"), None, record["error"].get("message", str(record["error"]))
+    if response.get("status_code") != 200:
+        error = body.get("error") or {}
+        return record.get("custom_id"), None, error.get("message", f"HTTP {response.get('status_code')}")
+    return record.get("custom_id"), body["choices"][0]["message"].get("content"), None
+
+
+async def run_batch_api(
+    agent: "Agent",
+    pending: List[Tuple[int, Any]],
+    checkpoint: Optional[Checkpoint] = None,
+    poll_interval: float = 30.0,
+    completion_window: str = "24h",
+    temperature: float = 0.2,
+    output_json: Optional[Any] = None,
+    output_pydantic: Optional[Any] = None
+) -> AsyncIterator[BatchResult]:
+    """
+    Submit prompts as one OpenAI Batch API job, poll until it finishes and
+    yield a BatchResult per prompt. Each prompt is a single completion
+    (tools are not called). A job recorded in the checkpoint is resumed
+    instead of being submitted again.
+    """
+    client = agent._get_async_client()
+    started = time.perf_counter()
+    indices = [index for index, _ in pending]
+
+    if checkpoint and checkpoint.batch_id and set(indices) <= set(checkpoint.batch_indices):
+        batch_id = checkpoint.batch_id
+        logging.info(f"Resuming Batch API job {batch_id}")
+    else:
+        lines = []
+        for index, prompt in pending:
+            body = {
+                "model": agent.llm,
+                "messages": agent._build_messages(prompt, output_json, output_pydantic),
+                "temperature": temperature
+            }
+            if output_json or output_pydantic:
+                body["response_format"] = {"type": "json_object"}
+            lines.append(json.dumps({"custom_id": f"request-{index}", "method": "POST", "url": BATCH_ENDPOINT, "body": body}))
+        upload = await client.files.create(file=("batch.jsonl", "\n".join(lines).encode("utf-8")), purpose="batch")
+        batch = await client.batches.create(input_file_id=upload.id, endpoint=BATCH_ENDPOINT, completion_window=completion_window)
+        batch_id = batch.id
+        logging.info(f"Submitted Batch API job {batch_id} with {len(lines)} requests")
+        if checkpoint:
+            checkpoint.record_batch(batch_id, indices)
+
+    while True:
+        batch = await client.batches.retrieve(batch_id)
+        if batch.status in _TERMINAL_STATES:
+            break
+        logging.debug(f"Batch API job {batch_id} is {batch.status}")
+        await asyncio.sleep(poll_interval)
+
+    outcomes: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if not file_id:
+            continue
+        content = await client.files.content(file_id)
+        for line in content.text.splitlines():
+            if line.strip():
+                custom_id, output, error = _parse_batch_line(line)
+                outcomes[custom_id] = (output, error)
+
+    elapsed = time.perf_counter() - started
+    for index, prompt in pending:
+        output, error = outcomes.get(f"request-{index}", (None, f"Batch API job ended with status '{batch.status}'"))
+        yield BatchResult(
+            index=index,
+            prompt=prompt,
+            output=output,
+            status="error" if error else "completed",
+            error=error,
+            elapsed=elapsed
+        )
+    if checkpoint:
+        checkpoint.finish_batch()
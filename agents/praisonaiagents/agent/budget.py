@@ -0,0 +1,107 @@
+import time
+import threading
+from typing import Any, Callable, List, Optional
+
+
+class BudgetExceeded(Exception):
+    """Raised inside the agent loop once the execution time or iteration budget runs out."""
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+class ExecutionBudget:
+    """
+    Wall-clock deadline and iteration cap for a single chat() / achat() call.
+
+    Every LLM request (tool rounds, reflection and regeneration alike) counts
+    as one iteration. remaining() gives the time left, which is used as the
+    per-request timeout and to cut off tools that are still running.
+    """
+
+    def __init__(self, max_execution_time: Optional[float] = None, max_iter: Optional[int] = None):
+        self.deadline = time.monotonic() + max_execution_time if max_execution_time else None
+        self.max_iter = max_iter
+        self.iterations = 0
+        self.exceeded: Optional[str] = None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, or None when there is no deadline."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def exceed(self, reason: str, message: str) -> BudgetExceeded:
+        self.exceeded = reason
+        return BudgetExceeded(reason, message)
+
+    def check(self) -> None:
+        if self.expired():
+            raise self.exceed("timeout", "Maximum execution time reached")
+
+    def next_iteration(self) -> None:
+        """Account for one more LLM request, raising if the budget is spent."""
+        self.check()
+        self.iterations += 1
+        if self.max_iter and self.iterations > self.max_iter:
+            raise self.exceed("max_iter", f"Maximum iterations ({self.max_iter}) reached")
+
+    def status(self) -> str:
+        """'completed', or why the run was cut short ('timeout' or 'max_iter')."""
+        if self.exceeded:
+            return self.exceeded
+        return "timeout" if self.expired() else "completed"
+
+
+def map_with_deadline(
+    func: Callable[[Any], Any],
+    items: List[Any],
+    workers: int = 1,
+    timeout: Optional[float] = None,
+    thread_name_prefix: str = "worker"
+) -> List[Any]:
+    """
+    Apply func to items on daemon threads and return the results in order.
+
+    Items that have not finished when the timeout elapses are returned as
+    TimeoutError instances. Their threads are abandoned rather than joined, so
+    a hung call cannot hold up the caller (or interpreter shutdown). Exceptions
+    raised by func are re-raised in the caller, as with Executor.map.
+    """
+    results: List[Any] = [TimeoutError(f"{thread_name_prefix} did not finish in time")] * len(items)
+    errors = {}
+    done = threading.Condition()
+    state = {"next": 0, "finished": 0, "cancelled": False}
+
+    def worker():
+        while True:
+            with done:
+                index = state["next"]
+                if state["cancelled"] or index >= len(items):
+                    return
+                state["next"] += 1
+            try:
+                value = func(items[index])
+            except Exception as e:
+                with done:
+                    errors[index] = e
+            else:
+                with done:
+                    results[index] = value
+            with done:
+                state["finished"] += 1
+                done.notify_all()
+
+    for i in range(max(1, min(workers, len(items)))):
+        threading.Thread(target=worker, name=f"{thread_name_prefix}-{i}", daemon=True).start()
+
+    with done:
+        done.wait_for(lambda: state["finished"] == len(items), timeout=timeout)
+        state["cancelled"] = True
+        if errors:
+            raise errors[min(errors)]
+        return list(results)
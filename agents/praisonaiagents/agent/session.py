@@ -0,0 +1,79 @@
+import uuid
+import threading
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+# The session whose chat is running in the current thread or task, so usage
+# recorded deep in the request pipeline is charged to the right conversation
+current_session: ContextVar[Optional["Session"]] = ContextVar("praisonai_session", default=None)
+
+
+class Session:
+    """
+    One conversation with an Agent.
+
+    Holds everything a conversation changes (history, the context window
+    summaries, token usage, the outcome of the last turn) so one Agent can
+    serve any number of sessions concurrently. A session is meant to be used
+    by one caller at a time. Memory helpers are scoped to the session's
+    user_id, or to its session_id when there is no user.
+    """
+
+    __slots__ = (
+        "session_id", "user_id", "chat_history", "last_run_status",
+        "context_manager", "usage", "memory", "_lock"
+    )
+
+    def __init__(
+        self,
+        session_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        chat_history: Optional[List[Dict[str, Any]]] = None,
+        memory: Optional[Any] = None
+    ):
+        self.session_id = session_id or uuid.uuid4().hex
+        self.user_id = user_id
+        self.chat_history = chat_history if chat_history is not None else []
+        self.last_run_status = None
+        # Created by the agent on first use when respect_context_window is on
+        self.context_manager = None
+        self.usage = {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        self.memory = memory
+        self._lock = threading.Lock()
+
+    def add_turn(self, prompt: Any, response: str) -> None:
+        with self._lock:
+            self.chat_history.append({"role": "user", "content": prompt})
+            self.chat_history.append({"role": "assistant", "content": response})
+
+    def record_usage(self, usage: Any) -> None:
+        with self._lock:
+            self.usage["requests"] += 1
+            if usage is not None:
+                self.usage["prompt_tokens"] += getattr(usage, 'prompt_tokens', 0) or 0
+                self.usage["completion_tokens"] += getattr(usage, 'completion_tokens', 0) or 0
+
+    def clear(self) -> None:
+        """Forget the conversation (history and context summaries)."""
+        with self._lock:
+            self.chat_history = []
+            self.context_manager = None
+
+    @property
+    def memory_scope(self) -> str:
+        return self.user_id or self.session_id
+
+    def remember(self, text: str, extra: Optional[Dict[str, Any]] = None) -> None:
+        """Store text in the agent's user memory under this session's scope."""
+        if self.memory is None:
+            return
+        self.memory.store_user_memory(self.memory_scope, text, dict(extra or {}, session_id=self.session_id))
+
+    def recall(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Search the agent's user memory within this session's scope."""
+        if self.memory is None:
+            return []
+        return self.memory.search_user_memory(self.memory_scope, query, limit=limit)
+
+    def __repr__(self):
+        return f"Session(session_id={self.session_id!r}, user_id={self.user_id!r}, turns={len(self.chat_history) // 2})"
@@ -0,0 +1,242 @@
+import json
+import time
+import asyncio
+import inspect
+import logging
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+# Tool definitions generated from callables are shared by every agent in the
+# process; entries disappear with the function or class they describe.
+_definition_cache: "weakref.WeakKeyDictionary[Any, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+_definition_lock = threading.Lock()
+
+
+def _has_definition_override(name: str) -> bool:
+    """Check whether a hand-written `<name>_definition` exists in __main__."""
+    import __main__
+    return getattr(__main__, f"{name}_definition", None) is not None
+
+
+def _run_coroutine_sync(coro):
+    """Run a coroutine to completion from synchronous code."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # A loop is already running in this thread, so finish the coroutine on a helper thread
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+
+class ToolInvoker:
+    """
+    A prepared call target for one tool.
+
+    Classes exposing `run` (LangChain style) get a fresh instance for every
+    call, so concurrent calls (and agents sharing the invoker through
+    spawn()) never share a tool's state; the parameters `run` accepts are
+    computed up front. Call counts, errors and latency are recorded for
+    every invocation.
+    """
+
+    def __init__(self, name: str, target: Any):
+        self.name = name
+        self.target = target
+        self.is_class = inspect.isclass(target) and hasattr(target, 'run')
+        run = target.run if self.is_class else target
+        self.is_async = asyncio.iscoroutinefunction(run)
+        self.accepted_params = None
+        if self.is_class:
+            try:
+                self.accepted_params = frozenset(
+                    name for name in inspect.signature(run).parameters if name != 'self'
+                )
+            except (TypeError, ValueError):
+                self.accepted_params = None
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.total_time = 0.0
+
+    def _callable(self) -> Callable:
+        if not self.is_class:
+            return self.target
+        return self.target().run
+
+    def _arguments(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        if self.accepted_params is None:
+            return arguments
+        # Extract only the parameters that run() expects
+        return {k: v for k, v in arguments.items() if k in self.accepted_params}
+
+    def _record(self, start: float, ok: bool) -> None:
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.calls += 1
+            self.total_time += elapsed
+            if not ok:
+                self.errors += 1
+
+    def invoke(self, arguments: Dict[str, Any]) -> Any:
+        """Call the tool synchronously."""
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = self._callable()(**self._arguments(arguments))
+            if self.is_async:
+                result = _run_coroutine_sync(result)
+            ok = True
+            return result
+        finally:
+            self._record(start, ok)
+
+    async def ainvoke(self, arguments: Dict[str, Any], executor: Optional[ThreadPoolExecutor] = None) -> Any:
+        """Call the tool from async code, running sync tools on the given executor."""
+        start = time.perf_counter()
+        ok = False
+        try:
+            func = self._callable()
+            kwargs = self._arguments(arguments)
+            if self.is_async:
+                result = await func(**kwargs)
+            else:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(executor, lambda: func(**kwargs))
+            ok = True
+            return result
+        finally:
+            self._record(start, ok)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "total_time": self.total_time,
+                "avg_time": self.total_time / self.calls if self.calls else 0.0
+            }
+
+
+class ToolRegistry:
+    """
+    Caches the OpenAI tool schemas for the tool lists an agent is called with.
+
+    A formatted list is built the first time a given tool list is seen and reused
+    until the list changes (compared by the identity of its items). Definitions
+    generated from callables are additionally shared across all registries.
+
+    The registry also holds the dispatch table mapping tool names to
+    ToolInvoker objects, so executing a tool call is a dictionary lookup.
+    """
+
+    def __init__(self, definition_builder: Callable[..., Optional[Dict[str, Any]]], max_entries: int = 16):
+        self._build_definition = definition_builder
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._invokers: Dict[str, ToolInvoker] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, tools: List[Any]) -> tuple:
+        return tuple(id(tool) for tool in tools)
+
+    def _definition_for_callable(self, tool: Any) -> Optional[Dict[str, Any]]:
+        name = getattr(tool, '__name__', '')
+        if _has_definition_override(name):
+            return self._build_definition(name)
+        try:
+            cached = _definition_cache.get(tool)
+        except TypeError:  # not weak-referenceable
+            return self._build_definition(name, tool)
+        if cached is None:
+            cached = self._build_definition(name, tool)
+            if cached is not None:
+                with _definition_lock:
+                    _definition_cache[tool] = cached
+        return cached
+
+    def _format(self, tools: List[Any]) -> List[Dict[str, Any]]:
+        formatted_tools = []
+        for tool in tools:
+            if isinstance(tool, str):
+                # Generate tool definition for string tool names
+                tool_def = self._build_definition(tool)
+                if tool_def:
+                    formatted_tools.append(tool_def)
+                else:
+                    logging.warning(f"Could not generate definition for tool: {tool}")
+            elif isinstance(tool, dict):
+                formatted_tools.append(tool)
+            elif hasattr(tool, "to_openai_tool"):
+                formatted_tools.append(tool.to_openai_tool())
+            elif callable(tool):
+                tool_def = self._definition_for_callable(tool)
+                if tool_def:
+                    formatted_tools.append(tool_def)
+                else:
+                    logging.warning(f"Could not generate definition for tool: {tool}")
+            else:
+                logging.warning(f"Tool {tool} not recognized")
+        return formatted_tools
+
+    def _entry(self, tools: List[Any]) -> tuple:
+        key = self._key(tools)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        # Keep a reference to the tools so their ids stay valid while cached
+        formatted = self._format(tools)
+        entry = (tuple(tools), formatted, json.dumps(formatted, sort_keys=True, default=str))
+        with self._lock:
+            self._entries[key] = entry
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def formatted(self, tools: Optional[List[Any]]) -> List[Dict[str, Any]]:
+        """Return the OpenAI tool definitions for a tool list."""
+        if not tools:
+            return []
+        return self._entry(tools)[1]
+
+    def schema_json(self, tools: Optional[List[Any]]) -> str:
+        """Return the canonical JSON serialization of the tool definitions."""
+        if not tools:
+            return "[]"
+        return self._entry(tools)[2]
+
+    def invalidate(self) -> None:
+        """Drop all cached tool lists, e.g. after tools were mutated in place."""
+        with self._lock:
+            self._entries.clear()
+
+    # -------------------------------------------------------------------------
+    #                          Dispatch Table
+    # -------------------------------------------------------------------------
+    def register_tools(self, tools: Optional[List[Any]]) -> None:
+        """Prepare invokers for every callable in a tool list, replacing those whose tool changed."""
+        for tool in tools or []:
+            name = getattr(tool, '__name__', None)
+            if name and callable(tool):
+                self.add_invoker(name, tool)
+
+    def add_invoker(self, name: str, target: Any) -> ToolInvoker:
+        with self._lock:
+            invoker = self._invokers.get(name)
+            if invoker is None or invoker.target is not target:
+                invoker = ToolInvoker(name, target)
+                self._invokers[name] = invoker
+            return invoker
+
+    def get_invoker(self, name: str) -> Optional[ToolInvoker]:
+        return self._invokers.get(name)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-tool call counts and latency."""
+        return {name: invoker.stats() for name, invoker in list(self._invokers.items())}
@@ -1,5 +1,6 @@
 """Agents module for managing multiple AI agents"""
 from .agents import PraisonAIAgents
 from .autoagents import AutoAgents
+from .run_store import RunStore
 
-__all__ = ['PraisonAIAgents', 'AutoAgents'] 
\ No newline at end of file
+__all__ = ['PraisonAIAgents', 'AutoAgents', 'RunStore'] 
\ No newline at end of file
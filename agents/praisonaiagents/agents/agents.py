@@ -2,16 +2,21 @@ import os
 import time
 import json
 import logging
-from typing import Any, Dict, Optional, List
+from typing import Any, AsyncIterator, Dict, Optional, List
 from pydantic import BaseModel
 from rich.text import Text
 from rich.panel import Panel
 from rich.console import Console
-from ..main import display_error, TaskOutput, error_logs, client
+from ..main import display_error, TaskOutput, TaskEvent, BatchResult, error_logs
 from ..agent.agent import Agent
 from ..task.task import Task
 from ..process.process import Process, LoopItems
+from ..process.scheduler import TaskScheduler
+from .run_store import RunStore
+from ..llm.json_stream import StructuredOutputError, parse_json_output
+from ..llm.concurrency import get_concurrency_limiter
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 
 # Set up logger
 logger = logging.getLogger(__name__)
@@ -44,7 +49,7 @@ def process_video(video_path: str, seconds_per_frame=2):
     return base64_frames
 
 class PraisonAIAgents:
-    def __init__(self, agents, tasks=None, verbose=0, completion_checker=None, max_retries=5, process="sequential", manager_llm=None, memory=False, memory_config=None, embedder=None):
+    def __init__(self, agents, tasks=None, verbose=0, completion_checker=None, max_retries=5, process="sequential", manager_llm=None, memory=False, memory_config=None, embedder=None, max_concurrency=None, agent_concurrency=None, critical_path=False, run_store=None):
         if not agents:
             raise ValueError("At least one agent must be provided")
             
@@ -57,6 +62,16 @@ class PraisonAIAgents:
         self.verbose = verbose
         self.max_retries = max_retries
         self.process = process
+        # process="parallel" runs tasks as a dependency graph (see TaskScheduler)
+        self.max_concurrency = max_concurrency
+        self.agent_concurrency = agent_concurrency
+        self.critical_path = critical_path
+        # Reuse stored outputs of tasks whose inputs are unchanged (True, a path or a RunStore)
+        if run_store is True:
+            run_store = RunStore()
+        elif isinstance(run_store, str):
+            run_store = RunStore(run_store)
+        self.run_store = run_store or None
         
         # Check for manager_llm in environment variable if not provided
         self.manager_llm = manager_llm or os.getenv('OPENAI_MODEL_NAME', 'gpt-4o')
@@ -95,7 +110,7 @@ class PraisonAIAgents:
             task.status = "not started"
             
         # If tasks were auto-generated from agents or process is sequential, set up sequential flow
-        if len(tasks) > 1 and (process == "sequential" or all(task.next_tasks == [] for task in tasks)):
+        if len(tasks) > 1 and (process == "sequential" or (process != "parallel" and all(task.next_tasks == [] for task in tasks))):
             for i in range(len(tasks) - 1):
                 # Set up next task relationship
                 tasks[i].next_tasks = [tasks[i + 1].name]
@@ -187,6 +202,33 @@ class PraisonAIAgents:
             return True
         return len(agent_output.strip()) > 0
 
+    def _reuse_stored_output(self, task_id):
+        """
+        Complete a task from the run store when an output for its current
+        inputs is stored. Returns the store key to record a fresh output
+        under, or None when the task was completed or there is no store.
+        """
+        if not self.run_store:
+            return None
+        task = self.tasks[task_id]
+        key = self.run_store.key_for(task)
+        stored = self.run_store.get(task, key)
+        if stored is None:
+            return key
+        task.result = stored
+        task.status = "completed"
+        self.save_output_to_file(task, stored)
+        logger.info(f"Task {task_id} reused its stored output")
+        return None
+
+    def _store_output(self, task_id, key, task_output):
+        # A partial result (timeout, max_iter) must not stand in for a full run
+        if key and task_output.status == "completed":
+            try:
+                self.run_store.put(self.tasks[task_id], task_output, key)
+            except Exception as e:
+                logger.error(f"Could not store output of task {task_id}: {e}")
+
     async def aexecute_task(self, task_id):
         """Async version of execute_task method"""
         if task_id not in self.tasks:
@@ -265,19 +307,21 @@ Here are the results of previous tasks that might be useful:\n
                         })
                 return content
 
-            agent_output = await executor_agent.achat(
-                _get_multimodal_message(task_prompt, task.images),
-                tools=task.tools,
-                output_json=task.output_json,
-                output_pydantic=task.output_pydantic
-            )
+            prompt = _get_multimodal_message(task_prompt, task.images)
         else:
-            agent_output = await executor_agent.achat(
-                task_prompt,
-                tools=task.tools,
+            prompt = task_prompt
+        try:
+            # As chat() does for sync tasks: the agent's own tools by default, and self-reflection
+            agent_output, status = await executor_agent._arun_chat(
+                prompt,
+                tools=task.tools or executor_agent.tools,
                 output_json=task.output_json,
-                output_pydantic=task.output_pydantic
+                output_pydantic=task.output_pydantic,
+                reflect=True
             )
+        except StructuredOutputError as e:
+            logger.error(f"Output of task {task_id} does not match its schema: {e}")
+            agent_output, status = None, None
 
         if agent_output:
             task_output = TaskOutput(
@@ -285,13 +329,13 @@ Here are the results of previous tasks that might be useful:\n
                 summary=task.description[:10],
                 raw=agent_output,
                 agent=executor_agent.name,
-                output_format="RAW"
+                output_format="RAW",
+                status=status or "completed"
             )
 
             if task.output_json:
-                cleaned = self.clean_json_output(agent_output)
                 try:
-                    parsed = json.loads(cleaned)
+                    parsed = parse_json_output(agent_output)
                     task_output.json_dict = parsed
                     task_output.output_format = "JSON"
                 except:
@@ -299,9 +343,8 @@ Here are the results of previous tasks that might be useful:\n
                     logger.debug(f"Output that failed JSON parsing: {agent_output}")
 
             if task.output_pydantic:
-                cleaned = self.clean_json_output(agent_output)
                 try:
-                    parsed = json.loads(cleaned)
+                    parsed = parse_json_output(agent_output)
                     pyd_obj = task.output_pydantic(**parsed)
                     task_output.pydantic = pyd_obj
                     task_output.output_format = "Pydantic"
@@ -324,6 +367,9 @@ Here are the results of previous tasks that might be useful:\n
         if task.status == "completed":
             logger.info(f"Task with ID {task_id} is already completed")
             return
+        store_key = self._reuse_stored_output(task_id)
+        if task.status == "completed":
+            return
 
         retries = 0
         while task.status != "completed" and retries < self.max_retries:
@@ -332,6 +378,7 @@ Here are the results of previous tasks that might be useful:\n
                 task_output = await self.aexecute_task(task_id)
                 if task_output and self.completion_checker(task, task_output.raw):
                     task.status = "completed"
+                    self._store_output(task_id, store_key, task_output)
                     # Run execute_callback for memory operations
                     try:
                         await task.execute_callback(task_output)
@@ -370,8 +417,112 @@ Here are the results of previous tasks that might be useful:\n
         if retries == self.max_retries and task.status != "completed":
             logger.info(f"Task {task_id} failed after {self.max_retries} retries.")
 
+    async def astream(self) -> AsyncIterator[TaskEvent]:
+        """
+        Run the tasks as a dependency graph and yield a TaskEvent as each
+        starts, completes, fails or is skipped.
+
+        Independent tasks overlap, up to max_concurrency at once and
+        agent_concurrency per agent; each task waits only for its context
+        and the tasks naming it in next_tasks. Every task runs through
+        arun_task, so sync tasks don't block the event loop.
+        """
+        scheduler = TaskScheduler(
+            self.tasks,
+            max_concurrency=self.max_concurrency,
+            agent_concurrency=self.agent_concurrency,
+            critical_path=self.critical_path
+        )
+        async for event in scheduler.run(self.arun_task):
+            if self.verbose >= 1 and event.type != "started":
+                logger.info(f"Task {event.task_name or event.task_id} {event.type} ({event.elapsed:.2f}s)")
+            yield event
+
+    async def arun_map(self, task_id):
+        """
+        Run a map-mode loop task: each of its loop_items runs as a copy of
+        the task, at most map_concurrency at once. Item copies are registered
+        only while they run, so self.tasks holds the same tasks afterwards. Items are read lazily, so an item stream is never held in
+        memory as a whole.
+
+        The task's result lists the item outputs in item order as JSON,
+        with a BatchResult per item (status, error, elapsed seconds) under
+        json_dict['items']. Failed items don't stop the others; the task
+        fails only when every item failed.
+        """
+        task = self.tasks[task_id]
+        items = enumerate(task.loop_items or [])
+        task.loop_items = None
+        task.status = "in progress"
+        results: Dict[int, BatchResult] = {}
+        running = set()
+        exhausted = False
+
+        async def run_item(index, item):
+            item_task = task.for_item(index, item)
+            item_id = self.add_task(item_task)
+            started = time.perf_counter()
+            try:
+                await self.arun_task(item_id)
+                error = None if item_task.status == "completed" else f"Task ended with status '{item_task.status}'"
+            except Exception as e:
+                error = str(e)
+            finally:
+                del self.tasks[item_id]
+            return BatchResult(
+                index=index,
+                prompt=item,
+                output=item_task.result.raw if item_task.result and not error else None,
+                status="error" if error else item_task.result.status,
+                error=error,
+                elapsed=time.perf_counter() - started
+            )
+
+        if task.agent:
+            get_concurrency_limiter(task.agent.base_url).expect(task.map_concurrency)
+        started = time.perf_counter()
+        try:
+            while True:
+                while not exhausted and len(running) < max(1, task.map_concurrency):
+                    try:
+                        index, item = next(items)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    running.add(asyncio.ensure_future(run_item(index, item)))
+                if not running:
+                    break
+                done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    results[result.index] = result
+        finally:
+            for future in running:
+                future.cancel()
+
+        ordered = [results[index] for index in sorted(results)]
+        failed = [result for result in ordered if result.status == "error"]
+        task.result = TaskOutput(
+            description=task.description,
+            raw=json.dumps([result.output for result in ordered], ensure_ascii=False),
+            json_dict={"items": [result.model_dump() for result in ordered]},
+            agent=task.agent.name if task.agent else "",
+            output_format="JSON"
+        )
+        task.status = "failed" if failed and len(failed) == len(ordered) else "completed"
+        if failed:
+            display_error(f"{len(failed)} of {len(ordered)} items of task {task.name or task_id} failed")
+        self.save_output_to_file(task, task.result)
+        logger.info(f"Task {task.name or task_id} mapped {len(ordered)} items in {time.perf_counter() - started:.2f}s")
+        return task.result
+
     async def arun_all_tasks(self):
         """Async version of run_all_tasks method"""
+        if self.process == "parallel":
+            async for _ in self.astream():
+                pass
+            return
+
         process = Process(
             tasks=self.tasks,
             agents=self.agents,
@@ -381,7 +532,9 @@ Here are the results of previous tasks that might be useful:\n
         
         if self.process == "workflow":
             async for task_id in process.aworkflow():
-                if self.tasks[task_id].async_execution:
+                if self.tasks[task_id].loop_items is not None:
+                    await self.arun_map(task_id)
+                elif self.tasks[task_id].async_execution:
                     await self.arun_task(task_id)
                 else:
                     self.run_task(task_id)
@@ -516,19 +669,19 @@ Here are the results of previous tasks that might be useful:\n
                         })
                 return content
 
-            agent_output = executor_agent.chat(
-                _get_multimodal_message(task_prompt, task.images),
-                tools=task.tools,
-                output_json=task.output_json,
-                output_pydantic=task.output_pydantic
-            )
+            prompt = _get_multimodal_message(task_prompt, task.images)
         else:
-            agent_output = executor_agent.chat(
-                task_prompt,
+            prompt = task_prompt
+        try:
+            agent_output, status = executor_agent._run_chat(
+                prompt,
                 tools=task.tools,
                 output_json=task.output_json,
                 output_pydantic=task.output_pydantic
             )
+        except StructuredOutputError as e:
+            logger.error(f"Output of task {task_id} does not match its schema: {e}")
+            agent_output, status = None, None
 
         if agent_output:
             # Store the response in memory
@@ -547,13 +700,13 @@ Here are the results of previous tasks that might be useful:\n
                 summary=task.description[:10],
                 raw=agent_output,
                 agent=executor_agent.name,
-                output_format="RAW"
+                output_format="RAW",
+                status=status or "completed"
             )
 
             if task.output_json:
-                cleaned = self.clean_json_output(agent_output)
                 try:
-                    parsed = json.loads(cleaned)
+                    parsed = parse_json_output(agent_output)
                     task_output.json_dict = parsed
                     task_output.output_format = "JSON"
                 except:
@@ -561,9 +714,8 @@ Here are the results of previous tasks that might be useful:\n
                     logger.debug(f"Output that failed JSON parsing: {agent_output}")
 
             if task.output_pydantic:
-                cleaned = self.clean_json_output(agent_output)
                 try:
-                    parsed = json.loads(cleaned)
+                    parsed = parse_json_output(agent_output)
                     pyd_obj = task.output_pydantic(**parsed)
                     task_output.pydantic = pyd_obj
                     task_output.output_format = "Pydantic"
@@ -586,6 +738,9 @@ Here are the results of previous tasks that might be useful:\n
         if task.status == "completed":
             logger.info(f"Task with ID {task_id} is already completed")
             return
+        store_key = self._reuse_stored_output(task_id)
+        if task.status == "completed":
+            return
 
         retries = 0
         while task.status != "completed" and retries < self.max_retries:
@@ -594,6 +749,7 @@ Here are the results of previous tasks that might be useful:\n
                 task_output = self.execute_task(task_id)
                 if task_output and self.completion_checker(task, task_output.raw):
                     task.status = "completed"
+                    self._store_output(task_id, store_key, task_output)
                     # Run execute_callback for memory operations
                     try:
                         loop = asyncio.get_event_loop()
@@ -635,6 +791,10 @@ Here are the results of previous tasks that might be useful:\n
 
     def run_all_tasks(self):
         """Synchronous version of run_all_tasks method"""
+        if self.process == "parallel":
+            asyncio.run(self.arun_all_tasks())
+            return
+
         process = Process(
             tasks=self.tasks,
             agents=self.agents,
@@ -644,7 +804,12 @@ Here are the results of previous tasks that might be useful:\n
         
         if self.process == "workflow":
             for task_id in process.workflow():
-                self.run_task(task_id)
+                if self.tasks[task_id].loop_items is not None:
+                    # On a helper thread, so this thread's event loop stays usable for task callbacks
+                    with ThreadPoolExecutor(max_workers=1) as pool:
+                        pool.submit(asyncio.run, self.arun_map(task_id)).result()
+                else:
+                    self.run_task(task_id)
         elif self.process == "sequential":
             for task_id in process.sequential():
                 self.run_task(task_id)
@@ -12,7 +12,7 @@ from typing import List, Any, Optional, Dict, Union
 import logging
 import os
 from pydantic import BaseModel, Field
-from ..main import display_instruction, display_tool_call, display_interaction, client
+from ..main import display_instruction, display_tool_call, display_interaction, client_manager
 
 # Define Pydantic models for structured output
 class TaskConfig(BaseModel):
@@ -57,7 +57,7 @@ class AutoAgents(PraisonAIAgents):
         embedder_config: Optional[Dict[str, Any]] = None,
         knowledge_sources: Optional[List[Any]] = None,
         use_system_prompt: bool = True,
-        cache: bool = True,
+        cache: bool = False,
         allow_delegation: bool = False,
         step_callback: Optional[Any] = None,
         system_template: Optional[str] = None,
@@ -235,7 +235,7 @@ Return the configuration in a structured JSON format matching the AutoAgentsConf
 """
         
         try:
-            response = client.beta.chat.completions.parse(
+            response = client_manager.get_client().beta.chat.completions.parse(
                 model=self.llm,
                 response_format=AutoAgentsConfig,
                 messages=[
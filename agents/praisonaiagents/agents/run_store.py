@@ -0,0 +1,135 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import inspect
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from ..main import TaskOutput
+from ..task.task import Task
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Agent settings that change what a task produces
+_AGENT_FIELDS = (
+    "name", "role", "goal", "backstory", "instructions", "llm", "function_calling_llm",
+    "self_reflect", "min_reflect", "max_reflect", "reflect_llm", "use_system_prompt",
+    "system_template", "prompt_template", "response_template", "knowledge_sources"
+)
+
+
+def _tool_fingerprint(tool: Any) -> List[str]:
+    """Name and source hash of a tool, so editing a tool's code invalidates outputs that used it."""
+    name = getattr(tool, "__name__", None) or getattr(tool, "name", None) or type(tool).__name__
+    if isinstance(tool, (str, dict)):
+        source = json.dumps(tool, sort_keys=True)
+    else:
+        try:
+            source = inspect.getsource(tool if inspect.isroutine(tool) or inspect.isclass(tool) else type(tool))
+        except (OSError, TypeError):
+            source = ""
+    return [str(name), hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]]
+
+
+class RunStore:
+    """
+    Content-addressed store of task outputs, so a rerun only executes what changed.
+
+    A task's key hashes its description, expected output, output schema,
+    images, agent configuration, tools (names and source) and the outputs
+    of the tasks in its context. Before a task runs, an output stored
+    under its key is reused, and downstream tasks see it as context like a
+    fresh result. Outputs are written as each task completes, so a crashed
+    or interrupted run picks up at the first task that didn't finish, and
+    editing one task of a playbook re-runs only that task and the tasks
+    downstream of it. Only outputs that ran to completion are reused; a
+    result cut short by max_execution_time or max_iter runs again.
+    """
+
+    def __init__(self, path: str = ".praison/runs.db"):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = sqlite3.connect(path)
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS task_outputs (
+            key TEXT PRIMARY KEY,
+            task_name TEXT,
+            output TEXT,
+            created_at REAL
+        )
+        """)
+        conn.commit()
+        conn.close()
+
+    def key_for(self, task: Task) -> str:
+        agent = task.agent
+        tools = task.tools or (agent.tools if agent else [])
+        schema = task.output_json or task.output_pydantic
+        payload = {
+            "description": task.description,
+            "expected_output": task.expected_output,
+            "output_schema": json.dumps(schema.model_json_schema(), sort_keys=True) if schema else None,
+            "images": task.images,
+            "agent": {field: getattr(agent, field, None) for field in _AGENT_FIELDS} if agent else None,
+            "tools": [_tool_fingerprint(tool) for tool in tools],
+            "context": [context_task.result.raw if context_task.result else None for context_task in task.context],
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def get(self, task: Task, key: Optional[str] = None) -> Optional[TaskOutput]:
+        """The stored output for task, rebuilt with its Pydantic model, or None."""
+        key = key or self.key_for(task)
+        with self._lock:
+            conn = sqlite3.connect(self.path)
+            try:
+                row = conn.execute("SELECT output FROM task_outputs WHERE key = ?", (key,)).fetchone()
+            finally:
+                conn.close()
+            data = json.loads(row[0]) if row else None
+            if data is None or data.get("status", "completed") != "completed":
+                self.misses += 1
+                return None
+            self.hits += 1
+        pydantic_data = data.pop("pydantic", None)
+        output = TaskOutput(**data)
+        if pydantic_data is not None and task.output_pydantic:
+            try:
+                output.pydantic = task.output_pydantic(**pydantic_data)
+            except Exception as e:
+                logger.warning(f"Could not rebuild stored {task.output_pydantic.__name__} output: {e}")
+        return output
+
+    def put(self, task: Task, output: TaskOutput, key: Optional[str] = None) -> str:
+        key = key or self.key_for(task)
+        data = output.model_dump(exclude={"pydantic"})
+        data["pydantic"] = output.pydantic.model_dump() if output.pydantic else None
+        with self._lock:
+            conn = sqlite3.connect(self.path)
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO task_outputs (key, task_name, output, created_at) VALUES (?, ?, ?, ?)",
+                    (key, task.name, json.dumps(data, default=str), time.time())
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        return key
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = sqlite3.connect(self.path)
+            try:
+                conn.execute("DELETE FROM task_outputs")
+                conn.commit()
+            finally:
+                conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"path": self.path, "hits": self.hits, "misses": self.misses}
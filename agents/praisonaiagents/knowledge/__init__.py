@@ -0,0 +1,5 @@
+"""Knowledge ingestion and retrieval for agents"""
+from .knowledge import Knowledge, IngestReport
+from .chunking import TextChunker
+
+__all__ = ['Knowledge', 'IngestReport', 'TextChunker'] 
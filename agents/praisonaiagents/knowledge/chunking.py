@@ -0,0 +1,100 @@
+import os
+import re
+from typing import Callable, List, Optional, Sequence
+
+from ..llm.context import count_tokens
+
+# Split points tried in order, coarsest first, so a chunk breaks at a
+# section, then a paragraph, a line, a sentence and only then a word
+MARKDOWN_SEPARATORS = ("\n# ", "\n## ", "\n### ", "\n#### ", "\n\n", "\n", ". ", " ")
+CODE_SEPARATORS = ("\nclass ", "\ndef ", "\nasync def ", "\nfunction ", "\n\n", "\n", " ")
+TEXT_SEPARATORS = ("\n\n", "\n", ". ", "? ", "! ", "; ", ", ", " ")
+
+_CODE_EXTENSIONS = {
+    ".py", ".js", ".ts", ".tsx", ".jsx", ".java", ".go", ".rs", ".rb", ".php",
+    ".c", ".h", ".cpp", ".hpp", ".cs", ".kt", ".swift", ".scala", ".sh"
+}
+_MARKDOWN_EXTENSIONS = {".md", ".markdown", ".rst", ".mdx"}
+
+
+def separators_for(name: str) -> Sequence[str]:
+    """Separators suited to a document, chosen by its file extension."""
+    extension = os.path.splitext(name.split("?")[0])[1].lower()
+    if extension in _CODE_EXTENSIONS:
+        return CODE_SEPARATORS
+    if extension in _MARKDOWN_EXTENSIONS:
+        return MARKDOWN_SEPARATORS
+    return TEXT_SEPARATORS
+
+
+class TextChunker:
+    """
+    Recursive text splitter measured in tokens.
+
+    Text is cut at the coarsest separator that yields pieces under
+    chunk_size, and adjacent pieces are packed back together up to
+    chunk_size; consecutive chunks share about chunk_overlap tokens so a
+    passage cut at a boundary is still found whole in one of them.
+    """
+
+    def __init__(self, chunk_size: int = 512, chunk_overlap: int = 64, model: Optional[str] = None):
+        if chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self._count: Callable[[str], int] = lambda text: count_tokens(text, model)
+
+    def split(self, text: str, separators: Sequence[str] = TEXT_SEPARATORS) -> List[str]:
+        text = re.sub(r"\n{3,}", "\n\n", text.replace("\r\n", "\n")).strip()
+        if not text:
+            return []
+        return [chunk for chunk in (c.strip() for c in self._merge(self._pieces(text, separators))) if chunk]
+
+    def _pieces(self, text: str, separators: Sequence[str]) -> List[str]:
+        """Cut text into pieces of at most chunk_size tokens, keeping separators attached."""
+        if self._count(text) <= self.chunk_size:
+            return [text]
+        for i, separator in enumerate(separators):
+            if separator not in text:
+                continue
+            parts = text.split(separator)
+            # Re-attach the separator to the piece it introduces (headings, "def ...")
+            parts = [parts[0]] + [separator.lstrip("\n") + part if separator.startswith("\n") else part for part in parts[1:]]
+            if not separator.startswith("\n"):
+                parts = [part + separator for part in parts[:-1]] + parts[-1:]
+            pieces = []
+            for part in parts:
+                if part:
+                    pieces.extend(self._pieces(part, separators[i + 1:]))
+            return pieces
+        # No separator left (e.g. a very long token run): cut by characters
+        step = max(1, len(text) * self.chunk_size // max(1, self._count(text)))
+        return [text[i:i + step] for i in range(0, len(text), step)]
+
+    def _merge(self, pieces: List[str]) -> List[str]:
+        chunks = []
+        current: List[str] = []
+        sizes: List[int] = []
+        for piece in pieces:
+            size = self._count(piece)
+            if current and sum(sizes) + size > self.chunk_size:
+                chunks.append(self._join(current))
+                # Carry the tail of this chunk into the next one as overlap
+                while current and (sum(sizes) > self.chunk_overlap or sum(sizes) + size > self.chunk_size):
+                    current.pop(0)
+                    sizes.pop(0)
+            current.append(piece)
+            sizes.append(size)
+        if current:
+            chunks.append(self._join(current))
+        return chunks
+
+    @staticmethod
+    def _join(pieces: List[str]) -> str:
+        text = ""
+        for piece in pieces:
+            # Pieces cut at a newline separator lost it; put it back
+            if text and not text.endswith((" ", "\n")) and not piece.startswith((" ", "\n")):
+                text += "\n"
+            text += piece
+        return text
@@ -0,0 +1,471 @@
+import os
+import re
+import json
+import math
+import time
+import heapq
+import sqlite3
+import hashlib
+import logging
+import threading
+import urllib.request
+from array import array
+from html.parser import HTMLParser
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from ..main import client_manager
+from ..llm.concurrency import get_concurrency_limiter
+from ..llm.context import count_tokens
+from ..llm.policy import ModelRoute
+from .chunking import TextChunker, separators_for
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    from pypdf import PdfReader
+    PYPDF_AVAILABLE = True
+except ImportError:
+    PYPDF_AVAILABLE = False
+
+DEFAULT_EMBEDDING_MODEL = "text-embedding-3-small"
+
+_TEXT_EXTENSIONS = {
+    ".txt", ".md", ".markdown", ".rst", ".mdx", ".csv", ".tsv", ".json", ".jsonl",
+    ".yaml", ".yml", ".toml", ".ini", ".cfg", ".xml", ".html", ".htm", ".log", ".tex",
+    ".py", ".js", ".ts", ".tsx", ".jsx", ".java", ".go", ".rs", ".rb", ".php",
+    ".c", ".h", ".cpp", ".hpp", ".cs", ".kt", ".swift", ".scala", ".sh", ".sql", ".pdf"
+}
+
+
+class IngestReport(BaseModel):
+    """What one Knowledge.ingest() run did."""
+    documents: int = 0
+    ingested: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    failed: int = 0
+    chunks: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def docs_per_sec(self) -> float:
+        return self.documents / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.documents} documents in {self.elapsed:.2f}s ({self.docs_per_sec:.1f} docs/sec): "
+            f"{self.ingested} ingested ({self.chunks} chunks), {self.unchanged} unchanged, "
+            f"{self.removed} removed, {self.failed} failed"
+        )
+
+
+class _TextExtractor(HTMLParser):
+    """Visible text of an HTML page."""
+
+    def __init__(self):
+        super().__init__()
+        self.parts: List[str] = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style", "noscript"):
+            self._skip += 1
+        elif tag in ("p", "div", "br", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "section", "article"):
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style", "noscript") and self._skip:
+            self._skip -= 1
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(data)
+
+
+def html_to_text(html: str) -> str:
+    extractor = _TextExtractor()
+    extractor.feed(html)
+    return re.sub(r"[ \t]+", " ", "".join(extractor.parts))
+
+
+def _is_url(source: str) -> bool:
+    return source.startswith(("http://", "https://"))
+
+
+class _Document:
+    __slots__ = ("source", "digest", "chunks", "vectors", "pending")
+
+    def __init__(self, source: str, digest: str, chunks: List[str]):
+        self.source = source
+        self.digest = digest
+        self.chunks = chunks
+        self.vectors: List[Optional[array]] = [None] * len(chunks)
+        self.pending = len(chunks)
+
+
+class Knowledge:
+    """
+    Retrieval index over an agent's knowledge sources.
+
+    Files, directories (walked recursively) and URLs are split into token
+    sized chunks, embedded in batches through the shared client and stored
+    in a SQLite file. Each source's content hash is recorded, so ingesting
+    again only re-embeds sources that changed and drops ones that are gone.
+    search() returns the chunks most similar to a query that fit in a
+    token budget.
+
+    embedder_config example:
+    {
+      "provider": "openai",            # or any "provider/model" prefix, e.g. "ollama"
+      "config": {
+        "model": "text-embedding-3-small",
+        "base_url": "...",             # optional
+        "api_key": "...",              # optional
+        "dimensions": 512              # optional, for models that support it
+      }
+    }
+    """
+
+    def __init__(
+        self,
+        sources: Optional[Iterable[str]] = None,
+        path: str = ".praison/knowledge/knowledge.db",
+        embedder_config: Optional[Dict[str, Any]] = None,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        chunk_size: int = 512,
+        chunk_overlap: int = 64,
+        batch_size: int = 64,
+        workers: int = 4,
+        top_k: int = 5,
+        max_tokens: int = 2000
+    ):
+        self.sources = list(sources or [])
+        self.path = path
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.batch_size = batch_size
+        self.workers = workers
+        self.top_k = top_k
+        self.max_tokens = max_tokens
+        self.chunker = TextChunker(chunk_size, chunk_overlap)
+        self.route, self.dimensions = self._embedding_route(embedder_config or {}, base_url, api_key)
+        self.last_report: Optional[IngestReport] = None
+        self._lock = threading.RLock()
+        self._ingested = False
+        # In-memory copy of the index for search, rebuilt after each ingest
+        self._rows: Optional[List[Tuple[str, str, int]]] = None
+        self._vectors = None
+
+    @staticmethod
+    def _embedding_route(embedder_config, base_url, api_key) -> Tuple[ModelRoute, Optional[int]]:
+        config = dict(embedder_config.get("config") or {})
+        provider = embedder_config.get("provider", "openai")
+        model = config.get("model", DEFAULT_EMBEDDING_MODEL)
+        route = ModelRoute.parse(model if provider == "openai" else f"{provider}/{model}")
+        if provider == "openai":
+            route.base_url, route.api_key = base_url, api_key
+        route.base_url = config.get("base_url", route.base_url)
+        route.api_key = config.get("api_key", route.api_key)
+        return route, config.get("dimensions")
+
+    # -------------------------------------------------------------------------
+    #                               Storage
+    # -------------------------------------------------------------------------
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS sources (
+            source TEXT PRIMARY KEY,
+            hash TEXT,
+            chunks INTEGER,
+            ingested_at REAL
+        )
+        """)
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS chunks (
+            id INTEGER PRIMARY KEY,
+            source TEXT,
+            position INTEGER,
+            content TEXT,
+            tokens INTEGER,
+            embedding BLOB
+        )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS chunks_source ON chunks (source)")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        return conn
+
+    def _signature(self) -> str:
+        """Settings that change every chunk or vector; a mismatch forces a full re-ingest."""
+        return json.dumps([self.route.model, self.route.base_url, self.dimensions, self.chunk_size, self.chunk_overlap])
+
+    def _stored_hashes(self, conn: sqlite3.Connection) -> Dict[str, str]:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'signature'").fetchone()
+        if row is None or row[0] != self._signature():
+            if row is not None:
+                logger.info(f"Knowledge settings changed, re-indexing {self.path}")
+            conn.execute("DELETE FROM chunks")
+            conn.execute("DELETE FROM sources")
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('signature', ?)", (self._signature(),))
+            conn.commit()
+            return {}
+        return dict(conn.execute("SELECT source, hash FROM sources"))
+
+    def _write(self, conn: sqlite3.Connection, doc: _Document) -> None:
+        with conn:
+            conn.execute("DELETE FROM chunks WHERE source = ?", (doc.source,))
+            conn.executemany(
+                "INSERT INTO chunks (source, position, content, tokens, embedding) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (doc.source, position, chunk, count_tokens(chunk), vector.tobytes())
+                    for position, (chunk, vector) in enumerate(zip(doc.chunks, doc.vectors))
+                ]
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO sources (source, hash, chunks, ingested_at) VALUES (?, ?, ?, ?)",
+                (doc.source, doc.digest, len(doc.chunks), time.time())
+            )
+
+    # -------------------------------------------------------------------------
+    #                               Loading
+    # -------------------------------------------------------------------------
+    def expand(self, sources: Iterable[str]) -> List[str]:
+        """Resolve sources to individual documents: URLs and absolute file paths."""
+        documents = []
+        for source in sources:
+            source = str(source)
+            if _is_url(source):
+                documents.append(source)
+            elif os.path.isdir(source):
+                for root, dirs, files in os.walk(source):
+                    dirs[:] = sorted(d for d in dirs if not d.startswith((".", "__")))
+                    for name in sorted(files):
+                        if not name.startswith(".") and os.path.splitext(name)[1].lower() in _TEXT_EXTENSIONS:
+                            documents.append(os.path.abspath(os.path.join(root, name)))
+            elif os.path.isfile(source):
+                documents.append(os.path.abspath(source))
+            else:
+                logger.warning(f"Knowledge source not found: {source}")
+        return list(dict.fromkeys(documents))
+
+    @staticmethod
+    def load(source: str) -> str:
+        """Text of a document."""
+        if _is_url(source):
+            request = urllib.request.Request(source, headers={"User-Agent": "praisonaiagents"})
+            with urllib.request.urlopen(request, timeout=30) as response:
+                charset = response.headers.get_content_charset() or "utf-8"
+                body = response.read().decode(charset, errors="replace")
+                is_html = "html" in (response.headers.get_content_type() or "")
+            return html_to_text(body) if is_html else body
+        extension = os.path.splitext(source)[1].lower()
+        if extension == ".pdf":
+            if not PYPDF_AVAILABLE:
+                raise ImportError("Reading PDF knowledge requires pypdf: pip install \"praisonaiagents[knowledge]\"")
+            return "\n\n".join(page.extract_text() or "" for page in PdfReader(source).pages)
+        with open(source, "rb") as f:
+            data = f.read()
+        if b"\0" in data[:1024]:
+            raise ValueError("binary file")
+        text = data.decode("utf-8", errors="replace")
+        return html_to_text(text) if extension in (".html", ".htm") else text
+
+    def _prepare(self, source: str, stored_hash: Optional[str]) -> Optional[_Document]:
+        """Load and chunk a document, or return None when its content is unchanged."""
+        text = self.load(source)
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        if digest == stored_hash:
+            return None
+        return _Document(source, digest, self.chunker.split(text, separators_for(source)))
+
+    # -------------------------------------------------------------------------
+    #                               Embedding
+    # -------------------------------------------------------------------------
+    def embed(self, texts: List[str]) -> List[array]:
+        """Unit-length embeddings for texts, from one request paced by the endpoint's limiter."""
+        limiter = get_concurrency_limiter(self.route.base_url)
+        client = client_manager.get_client(self.route.base_url, self.route.api_key, max_retries=limiter.client_retries)
+        params = {"input": texts, "model": self.route.model}
+        if self.dimensions:
+            params["dimensions"] = self.dimensions
+        response = limiter.call(lambda: client.embeddings.create(**params))
+        vectors = []
+        for item in sorted(response.data, key=lambda item: item.index):
+            norm = math.sqrt(sum(x * x for x in item.embedding)) or 1.0
+            vectors.append(array("f", (x / norm for x in item.embedding)))
+        return vectors
+
+    # -------------------------------------------------------------------------
+    #                               Ingestion
+    # -------------------------------------------------------------------------
+    def ingest(self, sources: Optional[Iterable[str]] = None, prune: Optional[bool] = None) -> IngestReport:
+        """
+        Bring the index up to date with sources (default: self.sources).
+
+        Documents are loaded, chunked and embedded on `workers` threads, and
+        chunks from different documents share embedding requests of up to
+        batch_size inputs. Sources whose content hash is unchanged are
+        skipped. With prune (the default when indexing self.sources),
+        documents no longer among the sources are removed from the index.
+        """
+        if prune is None:
+            prune = sources is None
+        started = time.perf_counter()
+        with self._lock:
+            documents = self.expand(self.sources if sources is None else sources)
+            report = IngestReport(documents=len(documents))
+            conn = self._connect()
+            try:
+                stored = self._stored_hashes(conn)
+                if prune:
+                    current = set(documents)
+                    gone = [source for source in stored if source not in current]
+                    with conn:
+                        conn.executemany("DELETE FROM chunks WHERE source = ?", [(s,) for s in gone])
+                        conn.executemany("DELETE FROM sources WHERE source = ?", [(s,) for s in gone])
+                    report.removed = len(gone)
+                self._run(conn, documents, stored, report)
+            finally:
+                conn.close()
+            self._ingested = True
+            self._rows = self._vectors = None
+        report.elapsed = time.perf_counter() - started
+        self.last_report = report
+        logger.info(f"Knowledge ingest {self.path}: {report}")
+        return report
+
+    def _run(self, conn, documents: List[str], stored: Dict[str, str], report: IngestReport) -> None:
+        buffer: List[Tuple[_Document, int]] = []
+        with ThreadPoolExecutor(max_workers=max(1, self.workers), thread_name_prefix="knowledge") as pool:
+            loading = {pool.submit(self._prepare, source, stored.get(source)): source for source in documents}
+            embedding = {}
+
+            def flush():
+                batch = buffer[:self.batch_size]
+                del buffer[:self.batch_size]
+                embedding[pool.submit(self.embed, [doc.chunks[i] for doc, i in batch])] = batch
+
+            def finish(doc):
+                self._write(conn, doc)
+                report.ingested += 1
+                report.chunks += len(doc.chunks)
+
+            while loading or embedding or buffer:
+                if not loading and buffer:
+                    flush()
+                done = next(as_completed(list(loading) + list(embedding)))
+                if done in loading:
+                    source = loading.pop(done)
+                    try:
+                        doc = done.result()
+                    except Exception as e:
+                        logger.warning(f"Skipping knowledge source {source}: {e}")
+                        report.failed += 1
+                        continue
+                    if doc is None:
+                        report.unchanged += 1
+                    elif not doc.chunks:
+                        finish(doc)
+                    else:
+                        buffer.extend((doc, i) for i in range(len(doc.chunks)))
+                        while len(buffer) >= self.batch_size:
+                            flush()
+                    continue
+                batch = embedding.pop(done)
+                try:
+                    vectors = done.result()
+                except Exception as e:
+                    for doc in {id(doc): doc for doc, _ in batch}.values():
+                        if doc.pending > 0:
+                            logger.warning(f"Skipping knowledge source {doc.source}: embedding failed: {e}")
+                            report.failed += 1
+                            doc.pending = -1
+                    continue
+                for (doc, i), vector in zip(batch, vectors):
+                    if doc.pending < 0:
+                        continue
+                    doc.vectors[i] = vector
+                    doc.pending -= 1
+                    if doc.pending == 0:
+                        finish(doc)
+
+    def ensure_ingested(self) -> None:
+        """Ingest self.sources once, on first use."""
+        if not self._ingested:
+            with self._lock:
+                if not self._ingested:
+                    self.ingest()
+
+    # -------------------------------------------------------------------------
+    #                               Retrieval
+    # -------------------------------------------------------------------------
+    def _load_index(self):
+        with self._lock:
+            if self._rows is None:
+                conn = self._connect()
+                try:
+                    rows = conn.execute("SELECT source, content, tokens, embedding FROM chunks ORDER BY id").fetchall()
+                finally:
+                    conn.close()
+                vectors = []
+                for _, _, _, blob in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    vectors.append(vector)
+                if NUMPY_AVAILABLE and vectors:
+                    vectors = np.array(vectors, dtype=np.float32)
+                self._vectors = vectors
+                self._rows = [(source, content, tokens) for source, content, tokens, _ in rows]
+            return self._rows, self._vectors
+
+    def search(self, query: str, top_k: Optional[int] = None, max_tokens: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        The top_k chunks most similar to query, best first, keeping only as
+        many as fit in max_tokens.
+        """
+        self.ensure_ingested()
+        rows, vectors = self._load_index()
+        if not rows or not query:
+            return []
+        top_k = top_k or self.top_k
+        max_tokens = self.max_tokens if max_tokens is None else max_tokens
+        query_vector = self.embed([query])[0]
+        if NUMPY_AVAILABLE:
+            scores = vectors @ np.array(query_vector, dtype=np.float32)
+            ranked = [(float(scores[i]), int(i)) for i in np.argsort(-scores)[:top_k]]
+        else:
+            ranked = heapq.nlargest(top_k, ((sum(a * b for a, b in zip(vector, query_vector)), i) for i, vector in enumerate(vectors)))
+        results, used = [], 0
+        for score, i in ranked:
+            source, content, tokens = rows[i]
+            if used + tokens > max_tokens:
+                continue
+            used += tokens
+            results.append({"source": source, "content": content, "score": score, "tokens": tokens})
+        return results
+
+    def build_context(self, query: str, top_k: Optional[int] = None, max_tokens: Optional[int] = None) -> str:
+        """Retrieved chunks formatted for a prompt, or "" when nothing matched."""
+        hits = self.search(query, top_k, max_tokens)
+        return "\n\n".join(f"[{hit['source']}]\n{hit['content']}" for hit in hits)
+
+    def stats(self) -> Dict[str, Any]:
+        rows, _ = self._load_index()
+        return {
+            "path": self.path,
+            "chunks": len(rows),
+            "sources": len({source for source, _, _ in rows}),
+            "last_ingest": self.last_report.model_dump() if self.last_report else None
+        }
@@ -0,0 +1,30 @@
+"""LLM request infrastructure shared by agents"""
+from .cache import ResponseCache, response_cache
+from .rate_limiter import RateLimiter, get_rate_limiter, estimate_tokens
+from .singleflight import SingleFlight, request_coalescer
+from .concurrency import AdaptiveLimiter, get_concurrency_limiter
+from .policy import ModelRoute, RequestPolicy, latency_tracker
+from .json_stream import StreamingJSONParser, StructuredOutputError, parse_json_output
+from .context import ContextManager, count_tokens, count_message_tokens, get_context_window
+
+__all__ = [
+    'ResponseCache',
+    'response_cache',
+    'RateLimiter',
+    'get_rate_limiter',
+    'estimate_tokens',
+    'SingleFlight',
+    'request_coalescer',
+    'AdaptiveLimiter',
+    'get_concurrency_limiter',
+    'ModelRoute',
+    'RequestPolicy',
+    'latency_tracker',
+    'StreamingJSONParser',
+    'StructuredOutputError',
+    'parse_json_output',
+    'ContextManager',
+    'count_tokens',
+    'count_message_tokens',
+    'get_context_window',
+]
@@ -0,0 +1,229 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+
+def _canonical_default(obj: Any) -> Any:
+    """JSON fallback for pydantic objects (e.g. tool calls) inside messages."""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(exclude_none=True)
+    if isinstance(obj, type) and hasattr(obj, "model_json_schema"):
+        return obj.model_json_schema()
+    return str(obj)
+
+
+class ResponseCache:
+    """
+    Two-tier cache for LLM responses.
+
+    Entries are keyed on a canonical hash of the request (endpoint, model,
+    messages, tool schemas, temperature, response_format) and stored as
+    JSON-compatible dicts. An in-memory LRU tier answers repeated requests
+    within a process. The SQLite tier, which persists them across runs, is
+    off until a path is configured, e.g.
+    response_cache.configure(path=".praison/llm_cache.db"). Both tiers honour
+    a TTL, and the disk tier evicts least recently used entries once it
+    exceeds max_disk_bytes.
+
+    Only agents created with cache=True (or calls passing cache=True) use
+    the cache; a cached answer is replayed even when temperature > 0.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        path: Optional[str] = None,
+        ttl: Optional[float] = 24 * 60 * 60,
+        max_disk_bytes: int = 256 * 1024 * 1024,
+        enabled: bool = True
+    ):
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._disk_ready = False
+        self.max_entries = max_entries
+        self.path = path
+        self.ttl = ttl
+        self.max_disk_bytes = max_disk_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def configure(self, **settings) -> None:
+        """Update cache settings, e.g. configure(path=None) to disable the disk tier."""
+        with self._lock:
+            for name, value in settings.items():
+                if not hasattr(self, name) or name.startswith("_"):
+                    raise ValueError(f"Unknown cache setting: {name}")
+                setattr(self, name, value)
+            self._disk_ready = False
+
+    @staticmethod
+    def make_key(**request) -> str:
+        """Hash a request into a stable cache key."""
+        payload = json.dumps(request, sort_keys=True, default=_canonical_default, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # -------------------------------------------------------------------------
+    #                            Disk Tier
+    # -------------------------------------------------------------------------
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if not self.path:
+            return None
+        if not self._disk_ready:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT,
+                size INTEGER,
+                created_at REAL,
+                accessed_at REAL
+            )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+            if self.ttl:
+                conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,))
+            conn.commit()
+            self._disk_ready = True
+            return conn
+        return sqlite3.connect(self.path, timeout=5)
+
+    def _disk_get(self, key: str) -> Optional[tuple]:
+        conn = self._connect()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if self._expired(row[1]):
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+            return json.loads(row[0]), row[1]
+        finally:
+            conn.close()
+
+    def _disk_set(self, key: str, value: Dict[str, Any], created: float) -> None:
+        conn = self._connect()
+        if conn is None:
+            return
+        try:
+            data = json.dumps(value)
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created_at, accessed_at) VALUES (?,?,?,?,?)",
+                (key, data, len(data), created, created)
+            )
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_disk_bytes:
+                # Evict least recently used entries down to 90% of the budget
+                target = self.max_disk_bytes * 0.9
+                stale = []
+                for old_key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+                    if total <= target:
+                        break
+                    stale.append((old_key,))
+                    total -= size
+                conn.executemany("DELETE FROM responses WHERE key = ?", stale)
+            conn.commit()
+        finally:
+            conn.close()
+
+    # -------------------------------------------------------------------------
+    #                            Public API
+    # -------------------------------------------------------------------------
+    def _expired(self, created: float) -> bool:
+        return bool(self.ttl) and time.time() - created > self.ttl
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached response for a key, or None on a miss."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if self._expired(entry[1]):
+                    del self._memory[key]
+                else:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    self.memory_hits += 1
+                    return entry[0]
+
+        try:
+            entry = self._disk_get(key)
+        except Exception as e:
+            logger.warning(f"Response cache read failed: {e}")
+            entry = None
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, entry[0], entry[1])
+        return entry[0]
+
+    def _remember(self, key: str, value: Dict[str, Any], created: float) -> None:
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a response in both tiers."""
+        if not self.enabled:
+            return
+        created = time.time()
+        with self._lock:
+            self._remember(key, value, created)
+            self.writes += 1
+        try:
+            self._disk_set(key, value, created)
+        except Exception as e:
+            logger.warning(f"Response cache write failed: {e}")
+
+    def clear(self) -> None:
+        """Remove every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+        conn = self._connect()
+        if conn is not None:
+            try:
+                conn.execute("DELETE FROM responses")
+                conn.commit()
+            finally:
+                conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory)
+            }
+
+
+# Process-wide cache used by agents created with cache=True (memory only by default)
+response_cache = ResponseCache()
@@ -0,0 +1,324 @@
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from openai import APIConnectionError, APIStatusError, APITimeoutError
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds the provider asked us to wait, from Retry-After(-ms) headers."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+def _classify(error: Exception) -> Optional[str]:
+    """'overload' for 429/5xx, 'transient' for connection failures, None otherwise."""
+    if isinstance(error, APITimeoutError):
+        return None
+    if isinstance(error, APIStatusError):
+        if error.status_code == 429 or error.status_code >= 500:
+            return "overload"
+        return None
+    if isinstance(error, APIConnectionError):
+        return "transient"
+    return None
+
+
+class _Waiter:
+    __slots__ = ("event", "loop", "future", "granted")
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop
+        self.event = None if loop else threading.Event()
+        self.future = loop.create_future() if loop else None
+        self.granted = False
+
+    def wake(self) -> None:
+        self.granted = True
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self) -> None:
+        if not self.future.done():
+            self.future.set_result(True)
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit for one provider endpoint.
+
+    Requests beyond the current limit queue in arrival order. Each success
+    grows the limit by about one slot per limit's worth of successes (additive
+    increase); a 429 or 5xx cuts it by decrease_factor (multiplicative
+    decrease) and pauses new requests for the provider's Retry-After. Failed
+    overload and connection errors are retried with jittered exponential
+    backoff. Sync and async callers share the same slots.
+
+    With initial_limit=None the limiter is inactive: calls run straight
+    away, uncapped, and are left to the client's own retries (see
+    client_retries) until configure() sets a limit.
+    """
+
+    def __init__(
+        self,
+        initial_limit: Optional[int] = 8,
+        min_limit: int = 1,
+        max_limit: int = 256,
+        decrease_factor: float = 0.5,
+        max_retries: int = 5,
+        base_backoff: float = 0.5,
+        max_backoff: float = 30.0
+    ):
+        self._lock = threading.Lock()
+        self._queue: "deque[_Waiter]" = deque()
+        self.active = initial_limit is not None
+        self.limit = float(initial_limit if initial_limit is not None else max_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.successes = 0
+        self.throttled = 0
+        self.retries = 0
+        self._last_decrease = 0.0
+
+    def configure(self, initial_limit: int, **settings) -> None:
+        """Activate the limiter at initial_limit, updating any other settings (max_limit, max_retries, ...)."""
+        with self._lock:
+            for name, value in settings.items():
+                if not hasattr(self, name):
+                    raise TypeError(f"Unknown limiter setting: {name}")
+                setattr(self, name, value)
+            self.active = True
+            self.limit = float(min(self.max_limit, initial_limit))
+            self._grant()
+
+    @property
+    def client_retries(self) -> Optional[int]:
+        """max_retries for clients whose calls go through this limiter: 0 while it retries itself, else the client default."""
+        return 0 if self.active else None
+
+    # -------------------------------------------------------------------------
+    #                            Slots
+    # -------------------------------------------------------------------------
+    def _capacity(self) -> int:
+        return max(self.min_limit, int(self.limit))
+
+    def _grant(self) -> None:
+        """Hand free slots to queued waiters (caller holds the lock)."""
+        while self._queue and self.in_flight < self._capacity():
+            waiter = self._queue.popleft()
+            self.in_flight += 1
+            waiter.wake()
+
+    def _enter(self, waiter_loop: Optional[asyncio.AbstractEventLoop] = None) -> Optional[_Waiter]:
+        with self._lock:
+            if not self._queue and self.in_flight < self._capacity():
+                self.in_flight += 1
+                return None
+            waiter = _Waiter(waiter_loop)
+            self._queue.append(waiter)
+            return waiter
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        with self._lock:
+            if waiter.granted:
+                self.in_flight -= 1
+                self._grant()
+            else:
+                self._queue.remove(waiter)
+
+    def expect(self, concurrency: int) -> None:
+        """
+        Raise the limit to at least `concurrency` (up to max_limit) for a
+        caller about to run that many requests at once, so the starting limit
+        doesn't cap it. Once the endpoint has been throttled the learned limit
+        is kept.
+        """
+        with self._lock:
+            if not self.active or self.throttled or concurrency <= self.limit:
+                return
+            self.limit = float(min(self.max_limit, concurrency))
+            self._grant()
+
+    def _pause_delay(self) -> float:
+        return max(0.0, self.paused_until - time.monotonic())
+
+    def acquire(self, timeout: Optional[float] = None) -> None:
+        """Take a slot, waiting in line if the endpoint is at its limit."""
+        delay = self._pause_delay()
+        if delay:
+            time.sleep(delay)
+        waiter = self._enter()
+        if waiter and not waiter.event.wait(timeout):
+            self._abandon(waiter)
+            raise TimeoutError("Timed out waiting for an LLM request slot")
+
+    async def aacquire(self, timeout: Optional[float] = None) -> None:
+        """Async version of acquire."""
+        delay = self._pause_delay()
+        if delay:
+            await asyncio.sleep(delay)
+        waiter = self._enter(asyncio.get_running_loop())
+        if waiter is None:
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            self._abandon(waiter)
+            raise
+
+    def release(self, outcome: str = "success", retry_after: Optional[float] = None) -> None:
+        """Return a slot and adjust the limit for the request's outcome."""
+        with self._lock:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if outcome == "success":
+                self.successes += 1
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            elif outcome == "overload":
+                self.throttled += 1
+                # Requests already in flight when the limit was cut report the
+                # same overload; only cut once per pause window
+                if now >= self._last_decrease:
+                    self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                    self._last_decrease = now + (retry_after or self.base_backoff)
+                if retry_after:
+                    self.paused_until = max(self.paused_until, now + retry_after)
+            self._grant()
+
+    # -------------------------------------------------------------------------
+    #                            Calls
+    # -------------------------------------------------------------------------
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        delay = min(self.max_backoff, self.base_backoff * (2 ** attempt))
+        delay = random.uniform(delay / 2, delay)  # jitter
+        return max(delay, retry_after or 0.0)
+
+    def _should_retry(self, error: Exception, attempt: int, deadline: Optional[float], delay: float) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            return False
+        return True
+
+    def call(self, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """Run fn within a slot, retrying overload and connection errors."""
+        if not self.active:
+            return fn()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        attempt = 0
+        while True:
+            self.acquire(None if deadline is None else max(0.0, deadline - time.monotonic()))
+            try:
+                result = fn()
+            except Exception as e:
+                kind = _classify(e)
+                retry_after = _retry_after(e) if kind == "overload" else None
+                self.release(kind or "error", retry_after)
+                delay = self._backoff(attempt, retry_after)
+                if kind is None or not self._should_retry(e, attempt, deadline, delay):
+                    raise
+                with self._lock:
+                    self.retries += 1
+                logger.debug(f"LLM request failed ({e}); retrying in {delay:.2f}s")
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self.release("success")
+            return result
+
+    async def acall(self, fn: Callable[[], Awaitable[Any]], timeout: Optional[float] = None) -> Any:
+        """Async version of call; fn is called to create the coroutine for each attempt."""
+        if not self.active:
+            return await fn()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        attempt = 0
+        while True:
+            await self.aacquire(None if deadline is None else max(0.0, deadline - time.monotonic()))
+            try:
+                result = await fn()
+            except asyncio.CancelledError:
+                self.release("error")
+                raise
+            except Exception as e:
+                kind = _classify(e)
+                retry_after = _retry_after(e) if kind == "overload" else None
+                self.release(kind or "error", retry_after)
+                delay = self._backoff(attempt, retry_after)
+                if kind is None or not self._should_retry(e, attempt, deadline, delay):
+                    raise
+                with self._lock:
+                    self.retries += 1
+                logger.debug(f"LLM request failed ({e}); retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            self.release("success")
+            return result
+
+    def queue_depth(self) -> int:
+        with self._lock:
+            return len(self._queue)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "limit": self._capacity() if self.active else None,
+                "in_flight": self.in_flight,
+                "queue_depth": len(self._queue),
+                "successes": self.successes,
+                "throttled": self.throttled,
+                "retries": self.retries,
+                "paused_for": self._pause_delay()
+            }
+
+
+_limiters: Dict[Optional[str], AdaptiveLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_concurrency_limiter(base_url: Optional[str] = None) -> AdaptiveLimiter:
+    """
+    Return the limiter shared by every caller of an endpoint (None is the
+    default OpenAI URL). It is inactive until configured, e.g.
+    get_concurrency_limiter(base_url).configure(initial_limit=16).
+    """
+    key = (base_url or "").rstrip("/") or None
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = _limiters[key] = AdaptiveLimiter(initial_limit=None)
+        return limiter
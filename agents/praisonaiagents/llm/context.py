@@ -0,0 +1,276 @@
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+# Context sizes (in tokens) by model name prefix; the longest matching prefix wins
+MODEL_CONTEXT_WINDOWS: Dict[str, int] = {
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+    "gpt-4-turbo": 128000,
+    "gpt-4-1106": 128000,
+    "gpt-4-0125": 128000,
+    "gpt-4-32k": 32768,
+    "gpt-4": 8192,
+    "gpt-3.5-turbo": 16385,
+    "o1": 200000,
+    "o1-mini": 128000,
+    "o1-preview": 128000,
+    "o3-mini": 200000,
+    "claude-3": 200000,
+    "gemini-1.5-flash": 1048576,
+    "gemini-1.5-pro": 2097152,
+    "gemini-2.0": 1048576,
+    "llama3": 8192,
+    "llama-3.1": 131072,
+    "llama3.1": 131072,
+    "llama3.2": 131072,
+    "mistral": 32768,
+    "deepseek": 65536,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# Tokens an image part costs at low detail
+_IMAGE_TOKENS = 85
+
+
+def get_context_window(model: Optional[str]) -> int:
+    """Return the context size for a model, falling back to a conservative default."""
+    name = (model or "").lower().split("/")[-1]
+    match = max((prefix for prefix in MODEL_CONTEXT_WINDOWS if name.startswith(prefix)), key=len, default=None)
+    return MODEL_CONTEXT_WINDOWS[match] if match else DEFAULT_CONTEXT_WINDOW
+
+
+@lru_cache(maxsize=32)
+def _encoding_for(model: Optional[str]):
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model or "gpt-4o")
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base" if (model or "").startswith(("gpt-4o", "o1", "o3")) else "cl100k_base")
+    except Exception as e:
+        # Encodings are downloaded on first use and may be unavailable offline
+        logger.debug(f"tiktoken encoding unavailable for {model}: {e}")
+        return None
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Count tokens with tiktoken when installed, otherwise estimate four characters per token."""
+    if not text:
+        return 0
+    encoding = _encoding_for(model)
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(messages: List[Dict[str, Any]], model: Optional[str] = None) -> int:
+    """Count the prompt tokens of a chat message list, including per-message framing."""
+    total = 3  # every reply is primed with <|start|>assistant<|message|>
+    for message in messages:
+        total += 4
+        content = message.get("content")
+        if isinstance(content, str):
+            total += count_tokens(content, model)
+        elif isinstance(content, list):
+            for part in content:
+                if part.get("type") == "text":
+                    total += count_tokens(part.get("text", ""), model)
+                else:
+                    total += _IMAGE_TOKENS
+        if message.get("tool_calls"):
+            total += count_tokens(json.dumps(message["tool_calls"], default=str), model)
+    return total
+
+
+def _truncate(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """text cut down to about max_tokens tokens."""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    encoding = _encoding_for(model)
+    if encoding is None:
+        return text[:max_tokens * 4]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+
+def _message_text(message: Dict[str, Any]) -> str:
+    content = message.get("content")
+    if isinstance(content, list):
+        content = " ".join(part.get("text", "") for part in content if part.get("type") == "text")
+    return f"{message.get('role', 'user')}: {content or ''}"
+
+
+class ContextManager:
+    """
+    Fits an agent's conversation into the model's context window.
+
+    System messages and the current prompt are always kept, and the most recent
+    pin_turns turns of history are kept verbatim when they fit. The cut
+    between older and kept history is chosen by token count alone; with a
+    summarizer, the turns before it are then folded into one summary (a
+    single summarizer call per request), otherwise they are dropped.
+    Summaries are cached by the history prefix they cover, so later requests
+    extend the previous summary instead of starting over. The summarizer's
+    input is capped at summary_input_tokens, keeping the newest messages,
+    and its output is capped at summary_tokens.
+    """
+
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        max_context_tokens: Optional[int] = None,
+        reserve_tokens: int = 4096,
+        pin_turns: int = 4,
+        summarizer: Optional[Callable[[str], str]] = None,
+        max_cached_summaries: int = 64,
+        summary_tokens: int = 1024,
+        summary_input_tokens: Optional[int] = None
+    ):
+        self.model = model
+        self.max_context_tokens = max_context_tokens
+        self.reserve_tokens = reserve_tokens
+        self.pin_turns = pin_turns
+        self.summarizer = summarizer
+        self.summary_tokens = summary_tokens
+        self.summary_input_tokens = summary_input_tokens
+        self._summaries: "OrderedDict[str, str]" = OrderedDict()
+        self._max_cached_summaries = max_cached_summaries
+        self._lock = threading.Lock()
+        self.summaries_built = 0
+        self.turns_dropped = 0
+
+    def budget(self, model: Optional[str] = None) -> int:
+        """Prompt tokens available once room for the completion is reserved."""
+        window = self.max_context_tokens or get_context_window(model or self.model)
+        return max(window // 2, window - self.reserve_tokens)
+
+    @staticmethod
+    def _turn_starts(history: List[Dict[str, Any]]) -> List[int]:
+        # Cut only before user messages so assistant/tool exchanges stay together
+        return [i for i, message in enumerate(history) if message.get("role") == "user"]
+
+    @staticmethod
+    def _prefix_key(history: List[Dict[str, Any]], end: int) -> str:
+        digest = hashlib.sha256()
+        for message in history[:end]:
+            digest.update(_message_text(message).encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def _summary_input(self, previous: Optional[str], messages: List[Dict[str, Any]], model: Optional[str]) -> str:
+        """Summarizer prompt for messages, keeping the newest that fit in summary_input_tokens."""
+        limit = self.summary_input_tokens or self.budget(model) // 2
+        used = count_tokens(previous, model) if previous else 0
+        lines: List[str] = []
+        for message in reversed(messages):
+            line = _message_text(message)
+            tokens = count_tokens(line, model)
+            if used + tokens > limit:
+                if not lines:
+                    # A single oversized message: keep its start
+                    lines.append(_truncate(line, max(limit - used, 0), model))
+                break
+            lines.append(line)
+            used += tokens
+        omitted = len(messages) - len(lines)
+        text = "\n".join(reversed(lines))
+        if omitted:
+            text = f"({omitted} older messages omitted)\n{text}"
+        if previous:
+            text = f"Summary so far:\n{previous}\n\nNew messages:\n{text}"
+        return text
+
+    def _summary_for(self, history: List[Dict[str, Any]], end: int, model: Optional[str] = None) -> Optional[str]:
+        """Summary of history[:end], extending the longest cached summary of a shorter prefix."""
+        key = self._prefix_key(history, end)
+        with self._lock:
+            if key in self._summaries:
+                self._summaries.move_to_end(key)
+                return self._summaries[key]
+
+        previous, start = None, 0
+        for candidate in reversed(self._turn_starts(history[:end])):
+            if candidate == 0:
+                break
+            with self._lock:
+                cached = self._summaries.get(self._prefix_key(history, candidate))
+            if cached is not None:
+                previous, start = cached, candidate
+                break
+
+        try:
+            summary = self.summarizer(self._summary_input(previous, history[start:end], model))
+        except Exception as e:
+            logger.warning(f"Failed to summarize conversation history: {e}")
+            return None
+        if not summary:
+            return None
+        summary = _truncate(summary, self.summary_tokens, model)
+
+        with self._lock:
+            self.summaries_built += 1
+            self._summaries[key] = summary
+            while len(self._summaries) > self._max_cached_summaries:
+                self._summaries.popitem(last=False)
+        return summary
+
+    def fit(self, messages: List[Dict[str, Any]], model: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Return messages trimmed to the context budget. Leading system messages
+        and the final message are kept; everything in between is history.
+        """
+        model = model or self.model
+        budget = self.budget(model)
+        if count_message_tokens(messages, model) <= budget or len(messages) < 3:
+            return messages
+
+        head = 0
+        while head < len(messages) - 1 and messages[head].get("role") == "system":
+            head += 1
+        system, history, current = messages[:head], messages[head:-1], messages[-1:]
+
+        starts = self._turn_starts(history)
+        # Keep the most recent pinned turns verbatim; fold or drop the rest
+        pinned_from = starts[-self.pin_turns] if self.pin_turns and len(starts) >= self.pin_turns else (starts[0] if starts else len(history))
+        cuts = [i for i in starts if i >= pinned_from] + [len(history)]
+
+        # Pick the cut from token counts alone, leaving room for the summary
+        available = budget - count_message_tokens(system + current, model) + 3
+        if self.summarizer:
+            available -= self.summary_tokens + 16
+        kept_tokens = [count_message_tokens(history[cut:], model) - 3 for cut in cuts]
+        cut = next((c for c, tokens in zip(cuts, kept_tokens) if tokens <= available), len(history))
+
+        summary_messages = []
+        if cut and self.summarizer:
+            summary = self._summary_for(history, cut, model)
+            if summary:
+                summary_messages = [{"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"}]
+        if not summary_messages:
+            self.turns_dropped += len([i for i in starts if i < cut])
+        return system + summary_messages + history[cut:] + current
+
+    def clear(self) -> None:
+        with self._lock:
+            self._summaries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "summaries_built": self.summaries_built,
+                "cached_summaries": len(self._summaries),
+                "turns_dropped": self.turns_dropped
+            }
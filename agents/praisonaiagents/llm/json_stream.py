@@ -0,0 +1,179 @@
+import json
+from typing import Any, Dict, List, Optional, Type, Union
+
+from pydantic import BaseModel, ValidationError
+
+
+class StructuredOutputError(ValueError):
+    """Model output isn't a JSON object (or array of objects) matching the expected schema."""
+
+
+class StreamingJSONParser:
+    """
+    Incremental parser for a JSON object or array arriving in text fragments.
+
+    Text before the first '{', or before a '[' that opens an array of
+    objects, arrays or strings, is skipped (prose, a ```json fence, a "[1]"
+    citation). Each top-level field of an object, or each element of an
+    array, is checked against the Pydantic model as soon as its value
+    closes, so a schema violation is reported mid-stream; `complete`
+    becomes True the moment the top-level value closes, after which the
+    rest of the stream can be dropped.
+    """
+
+    def __init__(self, model: Optional[Type[BaseModel]] = None):
+        self.model = model
+        self.value: Optional[Union[Dict[str, Any], List[Any]]] = None
+        self.fields: Dict[str, Any] = {}
+        self.items: List[Any] = []
+        self.is_array = False
+        self._text = ""
+        self._pos = 0
+        self._start = None
+        self._end = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        # What the top-level object expects next: 'key', 'colon' or 'value'
+        self._expect = "key"
+        self._key = None
+        self._key_start = None
+        self._value_start = None
+        self._blank = model.model_construct() if model is not None else None
+
+    @property
+    def started(self) -> bool:
+        return self._start is not None
+
+    @property
+    def complete(self) -> bool:
+        return self._end is not None
+
+    @property
+    def text(self) -> str:
+        """The JSON value's text, or everything received so far if it hasn't started."""
+        if self._start is None:
+            return self._text
+        return self._text[self._start:self._end]
+
+    def feed(self, fragment: str) -> bool:
+        """Consume the next fragment; returns True once the top-level value is complete."""
+        if self.complete:
+            return True
+        self._text += fragment
+        text = self._text
+        for i in range(self._pos, len(text)):
+            c = text[i]
+            if self._start is None:
+                if c == "{":
+                    self._start = i
+                    self._depth = 1
+                elif c == "[":
+                    rest = text[i + 1:].lstrip()
+                    if not rest:
+                        # Whether this opens an array depends on what follows
+                        self._pos = i
+                        return False
+                    if rest[0] in '{["]':
+                        self._start = i
+                        self._depth = 1
+                        self.is_array = True
+                        self._expect = "value"
+                        self._value_start = i + 1
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._key_start is not None:
+                        self._key = json.loads(text[self._key_start:i + 1])
+                        self._key_start = None
+                        self._expect = "colon"
+                continue
+            if c == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect == "key":
+                    self._key_start = i
+            elif c in "{[":
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    if self._expect == "value" and text[self._value_start:i].strip():
+                        self._value(text[self._value_start:i])
+                    self._end = i + 1
+                    self._pos = i + 1
+                    self._finish()
+                    return True
+            elif self._depth == 1:
+                if c == ":" and self._expect == "colon":
+                    self._expect = "value"
+                    self._value_start = i + 1
+                elif c == "," and self._expect == "value":
+                    self._value(text[self._value_start:i])
+                    if self.is_array:
+                        self._value_start = i + 1
+                    else:
+                        self._expect = "key"
+        self._pos = len(text)
+        return False
+
+    def _value(self, raw: str) -> None:
+        if self.is_array:
+            self._item(raw)
+        else:
+            self._field(raw)
+
+    def _item(self, raw: str) -> None:
+        index = len(self.items)
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise StructuredOutputError(f"Invalid JSON for item {index}: {e}") from e
+        if self.model is not None:
+            try:
+                self.model.model_validate(value)
+            except ValidationError as e:
+                raise StructuredOutputError(f"Item {index} does not match {self.model.__name__}: {e}") from e
+        self.items.append(value)
+
+    def _field(self, raw: str) -> None:
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise StructuredOutputError(f"Invalid JSON for field '{self._key}': {e}") from e
+        if self.model is not None and self._key in self.model.model_fields:
+            try:
+                self.model.__pydantic_validator__.validate_assignment(self._blank, self._key, value)
+            except ValidationError as e:
+                raise StructuredOutputError(f"Field '{self._key}' does not match {self.model.__name__}: {e}") from e
+        self.fields[self._key] = value
+
+    def _finish(self) -> None:
+        try:
+            self.value = json.loads(self.text)
+        except json.JSONDecodeError as e:
+            raise StructuredOutputError(f"Invalid JSON {'array' if self.is_array else 'object'}: {e}") from e
+        # Array items were validated as they closed
+        if self.model is not None and not self.is_array:
+            try:
+                self.model.model_validate(self.value)
+            except ValidationError as e:
+                raise StructuredOutputError(f"Output does not match {self.model.__name__}: {e}") from e
+
+
+def parse_json_output(text: str, model: Optional[Type[BaseModel]] = None) -> Union[Dict[str, Any], List[Any]]:
+    """
+    Parse the first JSON object or array in text, ignoring surrounding prose
+    and code fences. An array is returned whole; with a model, the object
+    (or every element of the array) must match it.
+    """
+    parser = StreamingJSONParser(model)
+    if not parser.feed(text):
+        if parser.started:
+            raise StructuredOutputError("Output ends before its JSON value is complete")
+        raise StructuredOutputError("Output does not contain a JSON object or array")
+    return parser.value
@@ -0,0 +1,382 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# OpenAI-compatible providers addressable as "<provider>/<model>"
+# (mirrors the provider table of praisonai's PraisonAIModel)
+PROVIDERS: Dict[str, tuple] = {
+    "openai": ("https://api.openai.com/v1", "OPENAI_API_KEY"),
+    "groq": ("https://api.groq.com/openai/v1", "GROQ_API_KEY"),
+    "ollama": ("http://localhost:11434/v1", "OLLAMA_API_KEY"),
+    "openrouter": ("https://openrouter.ai/api/v1", "OPENROUTER_API_KEY"),
+    "deepseek": ("https://api.deepseek.com/v1", "DEEPSEEK_API_KEY"),
+}
+
+
+class ModelRoute:
+    """A model together with the endpoint and key used to reach it."""
+
+    __slots__ = ("model", "base_url", "api_key")
+
+    def __init__(self, model: str, base_url: Optional[str] = None, api_key: Optional[str] = None):
+        self.model = model
+        self.base_url = base_url
+        self.api_key = api_key
+
+    @classmethod
+    def parse(cls, spec: Union[str, Dict[str, Any], "ModelRoute"]) -> "ModelRoute":
+        """
+        Build a route from "provider/model", a plain model name or a dict.
+        Plain names and dicts without a base_url are left unbound and reach
+        the endpoint of the request they fall back from (see bind).
+        """
+        if isinstance(spec, ModelRoute):
+            return spec
+        if isinstance(spec, dict):
+            return cls(spec["model"], spec.get("base_url"), spec.get("api_key"))
+        provider, _, name = spec.partition("/")
+        if name and provider in PROVIDERS:
+            base_url, key_var = PROVIDERS[provider]
+            return cls(name, base_url, os.environ.get(key_var, "nokey"))
+        return cls(spec)
+
+    def bind(self, primary: "ModelRoute") -> "ModelRoute":
+        """This route, or a copy on primary's endpoint and key when it names no endpoint."""
+        if self.base_url is not None:
+            return self
+        return ModelRoute(self.model, primary.base_url, self.api_key or primary.api_key)
+
+    def key(self) -> tuple:
+        return (self.model, self.base_url)
+
+    def __repr__(self):
+        return f"ModelRoute(model={self.model!r}, base_url={self.base_url!r})"
+
+
+class LatencyTracker:
+    """Rolling window of time-to-first-token samples per route, from streamed requests."""
+
+    def __init__(self, window: int = 200):
+        self._lock = threading.Lock()
+        self._samples: Dict[tuple, deque] = {}
+        self.window = window
+
+    def record(self, route: ModelRoute, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(route.key(), deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, route: ModelRoute, percentile: float, min_samples: int = 20) -> Optional[float]:
+        with self._lock:
+            samples = self._samples.get(route.key())
+            if not samples or len(samples) < min_samples:
+                return None
+            ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(len(ordered) * percentile / 100))
+        return ordered[index]
+
+
+# Shared by all policies so every agent learns from every request
+latency_tracker = LatencyTracker()
+
+
+class _Prefetched:
+    """A stream whose first chunk has been read; iterates that chunk, then the rest."""
+
+    def __init__(self, stream, chunks, first, exhausted=False):
+        self.stream = stream
+        self.chunks = chunks
+        self.first = first
+        self.exhausted = exhausted
+
+    def __iter__(self):
+        if not self.exhausted:
+            yield self.first
+            yield from self.chunks
+
+    def close(self):
+        self.stream.close()
+
+
+class _AsyncPrefetched(_Prefetched):
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        if not self.exhausted:
+            yield self.first
+            async for chunk in self.chunks:
+                yield chunk
+
+    async def close(self):
+        await self.stream.close()
+
+
+def prefetch_stream(stream) -> _Prefetched:
+    """Block until a stream delivers its first chunk, so its start can be timed and raced."""
+    chunks = iter(stream)
+    try:
+        return _Prefetched(stream, chunks, next(chunks))
+    except StopIteration:
+        return _Prefetched(stream, chunks, None, exhausted=True)
+    except BaseException:
+        stream.close()
+        raise
+
+
+async def aprefetch_stream(stream) -> _AsyncPrefetched:
+    """Async version of prefetch_stream; the stream is closed if the wait is cancelled."""
+    chunks = stream.__aiter__()
+    try:
+        return _AsyncPrefetched(stream, chunks, await chunks.__anext__())
+    except StopAsyncIteration:
+        return _AsyncPrefetched(stream, chunks, None, exhausted=True)
+    except BaseException:
+        await stream.close()
+        raise
+
+
+def _discard(result: Any) -> None:
+    """Close a losing attempt's stream (non-streamed responses need nothing)."""
+    close = getattr(result, "close", None)
+    if close is None:
+        return
+    try:
+        close()
+    except Exception as e:
+        logger.debug(f"Failed to close discarded response: {e}")
+
+
+def _discard_future(future) -> None:
+    if not future.cancelled() and future.exception() is None:
+        _discard(future.result())
+
+
+async def _aclose(result: Any) -> None:
+    close = getattr(result, "close", None)
+    if close is None:
+        return
+    try:
+        await close()
+    except Exception as e:
+        logger.debug(f"Failed to close discarded response: {e}")
+
+
+class RequestPolicy:
+    """
+    Hedging and fallback across an ordered list of model routes.
+
+    A request starts on the primary route. If hedging is enabled and the first
+    token hasn't arrived within the hedge delay (a percentile of that route's
+    recent streamed time-to-first-token, or a fixed hedge_delay; a
+    non-streamed request has no first token, so it waits the fixed or
+    initial delay), a duplicate request goes to the next route and
+    whichever starts first wins; the loser is
+    cancelled (async) or discarded when it returns (sync). Whenever every
+    running attempt fails, the next route in the list is tried.
+    """
+
+    def __init__(
+        self,
+        fallbacks: Optional[List[Union[str, Dict[str, Any], ModelRoute]]] = None,
+        hedge: bool = False,
+        hedge_percentile: float = 95.0,
+        hedge_delay: Optional[float] = None,
+        initial_hedge_delay: float = 10.0,
+        min_samples: int = 20,
+        should_fallback: Optional[Callable[[Exception], bool]] = None
+    ):
+        self.fallbacks = [ModelRoute.parse(spec) for spec in fallbacks or []]
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_delay = hedge_delay
+        self.initial_hedge_delay = initial_hedge_delay
+        self.min_samples = min_samples
+        self.should_fallback = should_fallback or (lambda error: True)
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.requests = 0
+        self.hedges_fired = 0
+        self.hedges_won = 0
+        self.fallbacks_used = 0
+
+    def routes(self, primary: ModelRoute) -> List[ModelRoute]:
+        fallbacks = [route.bind(primary) for route in self.fallbacks]
+        return [primary] + [route for route in fallbacks if route.key() != primary.key()]
+
+    def delay_for(self, route: ModelRoute, stream: bool = True) -> Optional[float]:
+        """How long to wait for the first token before hedging, or None if hedging is off."""
+        if not self.hedge:
+            return None
+        if self.hedge_delay is not None:
+            return self.hedge_delay
+        if not stream:
+            return self.initial_hedge_delay
+        observed = latency_tracker.percentile(route, self.hedge_percentile, self.min_samples)
+        return observed if observed is not None else self.initial_hedge_delay
+
+    def _count(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def _timed(self, start: Callable[[ModelRoute], Any], route: ModelRoute, stream: bool) -> Any:
+        began = time.perf_counter()
+        result = start(route)
+        # A non-streamed call returns the whole completion, not its first token
+        if stream:
+            latency_tracker.record(route, time.perf_counter() - began)
+        return result
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="praison-hedge")
+        return self._executor
+
+    def execute(self, primary: ModelRoute, start: Callable[[ModelRoute], Any], stream: bool = False) -> Any:
+        """
+        Run start(route) under the policy and return the winning result.
+        start should return once the first token has arrived; with
+        stream=True that time is recorded as the route's time-to-first-token.
+        """
+        self._count("requests")
+        routes = self.routes(primary)
+        if len(routes) == 1:
+            return self._timed(start, primary, stream)
+
+        pool = self._pool()
+        running = {}
+        next_route = 0
+        hedged = False
+        last_error: Optional[Exception] = None
+
+        def launch(is_hedge=False):
+            nonlocal next_route
+            route = routes[next_route]
+            next_route += 1
+            running[pool.submit(self._timed, start, route, stream)] = (route, is_hedge)
+
+        launch()
+        while True:
+            delay = self.delay_for(routes[0], stream) if not hedged and next_route < len(routes) else None
+            done, _ = wait(list(running), timeout=delay, return_when=FIRST_COMPLETED)
+            if not done:
+                hedged = True
+                self._count("hedges_fired")
+                logger.debug(f"No first token from {routes[0].model} after {delay:.2f}s, hedging to {routes[next_route].model}")
+                launch(is_hedge=True)
+                continue
+
+            winner = None
+            for future in done:
+                route, is_hedge = running.pop(future)
+                error = future.exception()
+                if error is None:
+                    if winner is None:
+                        winner = future
+                        if is_hedge:
+                            self._count("hedges_won")
+                    else:
+                        _discard(future.result())
+                    continue
+                last_error = error
+                if not self.should_fallback(error):
+                    raise error
+                logger.warning(f"Request to {route.model} failed: {error}")
+
+            if winner is not None:
+                # Threads can't be interrupted; drop the losers' results when they arrive
+                for loser in running:
+                    loser.add_done_callback(_discard_future)
+                return winner.result()
+
+            if not running:
+                if next_route >= len(routes):
+                    raise last_error
+                self._count("fallbacks_used")
+                launch()
+
+    async def aexecute(self, primary: ModelRoute, start: Callable[[ModelRoute], Awaitable[Any]], stream: bool = False) -> Any:
+        """Async version of execute; losing attempts are cancelled."""
+        self._count("requests")
+        routes = self.routes(primary)
+
+        async def timed(route):
+            began = time.perf_counter()
+            result = await start(route)
+            if stream:
+                latency_tracker.record(route, time.perf_counter() - began)
+            return result
+
+        if len(routes) == 1:
+            return await timed(primary)
+
+        running = {}
+        next_route = 0
+        hedged = False
+        last_error: Optional[Exception] = None
+
+        def launch(is_hedge=False):
+            nonlocal next_route
+            route = routes[next_route]
+            next_route += 1
+            running[asyncio.ensure_future(timed(route))] = (route, is_hedge)
+
+        launch()
+        try:
+            while True:
+                delay = self.delay_for(routes[0], stream) if not hedged and next_route < len(routes) else None
+                done, _ = await asyncio.wait(list(running), timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    self._count("hedges_fired")
+                    logger.debug(f"No first token from {routes[0].model} after {delay:.2f}s, hedging to {routes[next_route].model}")
+                    launch(is_hedge=True)
+                    continue
+
+                winner = None
+                for task in done:
+                    route, is_hedge = running.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        if winner is None:
+                            winner = task
+                            if is_hedge:
+                                self._count("hedges_won")
+                        else:
+                            await _aclose(task.result())
+                        continue
+                    last_error = error
+                    if not self.should_fallback(error):
+                        raise error
+                    logger.warning(f"Request to {route.model} failed: {error}")
+
+                if winner is not None:
+                    return winner.result()
+
+                if not running:
+                    if next_route >= len(routes):
+                        raise last_error
+                    self._count("fallbacks_used")
+                    launch()
+        finally:
+            for task in running:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedges_fired": self.hedges_fired,
+                "hedges_won": self.hedges_won,
+                "hedge_win_rate": self.hedges_won / self.hedges_fired if self.hedges_fired else 0.0,
+                "fallbacks_used": self.fallbacks_used
+            }
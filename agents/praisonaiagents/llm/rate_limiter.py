@@ -0,0 +1,145 @@
+import json
+import time
+import asyncio
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(messages: List[Dict[str, Any]], max_tokens: Optional[int] = None) -> int:
+    """
+    Rough pre-flight token estimate for a request: about four characters per
+    prompt token plus any completion allowance the request reserves.
+    """
+    chars = 0
+    for message in messages:
+        content = message.get("content") if isinstance(message, dict) else getattr(message, "content", None)
+        if isinstance(content, str):
+            chars += len(content)
+        elif content:
+            chars += len(json.dumps(content, default=str))
+        chars += 16  # role and framing overhead
+    return chars // 4 + 1 + (max_tokens or 0)
+
+
+class _Bucket:
+    """A token bucket that may run into debt; debt is repaid by waiting."""
+
+    def __init__(self, per_minute: int, now: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = float(per_minute)
+        self.updated = now
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, amount: float) -> float:
+        """Consume amount and return how long the caller must wait to cover any debt."""
+        self.level -= min(amount, self.capacity)
+        return max(0.0, -self.level / self.rate)
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute budget for one model and API key.
+
+    Every acquire reserves its share immediately and is told how long to wait,
+    so callers are served in arrival order (sync and async alike) rather than
+    racing each other once the budget frees up. Token estimates are corrected
+    from the actual usage reported by the response. ``clock`` supplies the
+    current time in seconds and defaults to ``time.monotonic``.
+    """
+
+    def __init__(self, rpm: Optional[int] = None, tpm: Optional[int] = None, clock: Callable[[], float] = time.monotonic):
+        self._lock = threading.Lock()
+        self._clock = clock
+        self.rpm = None
+        self.tpm = None
+        self._requests: Optional[_Bucket] = None
+        self._tokens: Optional[_Bucket] = None
+        self.waits = 0
+        self.total_wait = 0.0
+        self.set_limits(rpm, tpm)
+
+    def set_limits(self, rpm: Optional[int] = None, tpm: Optional[int] = None) -> None:
+        """Apply budgets; when several agents share a limiter the tightest one wins."""
+        with self._lock:
+            if rpm and (self.rpm is None or rpm < self.rpm):
+                self.rpm = rpm
+                self._requests = _Bucket(rpm, self._clock())
+            if tpm and (self.tpm is None or tpm < self.tpm):
+                self.tpm = tpm
+                self._tokens = _Bucket(tpm, self._clock())
+
+    def _reserve(self, tokens: int) -> float:
+        with self._lock:
+            now = self._clock()
+            wait = 0.0
+            if self._requests:
+                self._requests.refill(now)
+                wait = max(wait, self._requests.take(1))
+            if self._tokens:
+                self._tokens.refill(now)
+                wait = max(wait, self._tokens.take(tokens))
+            if wait > 0:
+                self.waits += 1
+                self.total_wait += wait
+            return wait
+
+    def acquire(self, tokens: int = 0) -> None:
+        """Block until a request of the given size fits the budget."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            logger.debug(f"Rate limit reached, waiting {wait:.2f}s")
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: int = 0) -> None:
+        """Async version of acquire."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            logger.debug(f"Rate limit reached, waiting {wait:.2f}s")
+            await asyncio.sleep(wait)
+
+    def reconcile(self, estimated: int, actual: Optional[int]) -> None:
+        """Correct the token bucket once the real usage of a request is known."""
+        if actual is None or not self._tokens:
+            return
+        with self._lock:
+            self._tokens.refill(self._clock())
+            self._tokens.level = min(self._tokens.capacity, self._tokens.level - (actual - estimated))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "rpm": self.rpm,
+                "tpm": self.tpm,
+                "waits": self.waits,
+                "total_wait": self.total_wait
+            }
+
+
+_limiters: Dict[tuple, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(model: str, api_key: Optional[str] = None, rpm: Optional[int] = None, tpm: Optional[int] = None) -> Optional[RateLimiter]:
+    """
+    Return the limiter shared by every agent using this model and API key,
+    creating it when budgets are given. Returns None if no budget applies.
+    """
+    key = (model, api_key)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            if not rpm and not tpm:
+                return None
+            limiter = _limiters[key] = RateLimiter(rpm, tpm)
+            return limiter
+    if rpm or tpm:
+        limiter.set_limits(rpm, tpm)
+    return limiter
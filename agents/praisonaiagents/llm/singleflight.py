@@ -0,0 +1,111 @@
+import time
+import asyncio
+import threading
+from concurrent.futures import CancelledError, Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type
+
+# Set on a call whose leader stopped for its own reasons; waiters then run it themselves
+_RETRY = object()
+
+
+class SingleFlight:
+    """
+    Coalesces identical requests that are in flight at the same time.
+
+    The first caller for a key (the leader) does the work; callers arriving
+    with the same key before it finishes wait for the leader's result instead
+    of repeating the request. Sync and async callers share one table, so a
+    coroutine can wait on a request started from a thread and vice versa.
+    Errors from the request itself are re-raised in every waiter. If the
+    leader is cancelled or interrupted, or fails with one of the caller's
+    own errors (retry_on, e.g. its execution budget running out), waiters
+    are not failed with it: one of them leads the request again instead.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self.leaders = 0
+        self.deduplicated = 0
+
+    def _join(self, key: str):
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.deduplicated += 1
+                return future, False
+            future = self._calls[key] = Future()
+            self.leaders += 1
+            return future, True
+
+    def _finish(self, key: str, future: Future, result: Any = None, error: Optional[BaseException] = None,
+                retry_on: Tuple[Type[BaseException], ...] = ()) -> None:
+        with self._lock:
+            self._calls.pop(key, None)
+        if future.cancelled():
+            return
+        if error is None:
+            future.set_result(result)
+        elif not isinstance(error, Exception) or isinstance(error, (CancelledError,) + tuple(retry_on)):
+            future.set_result(_RETRY)
+        else:
+            future.set_exception(error)
+
+    @staticmethod
+    def _remaining(deadline: Optional[float]) -> Optional[float]:
+        return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+    def do(self, key: str, fn: Callable[[], Any], timeout: Optional[float] = None,
+           retry_on: Tuple[Type[BaseException], ...] = ()) -> Any:
+        """Run fn, or wait (up to timeout) for an identical call already in flight."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            result = future.result(self._remaining(deadline))
+            if result is not _RETRY:
+                return result
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, future, error=e, retry_on=retry_on)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]], timeout: Optional[float] = None,
+                  retry_on: Tuple[Type[BaseException], ...] = ()) -> Any:
+        """Async version of do; fn is called to create the coroutine when leading."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            # Shield so a timed-out waiter doesn't cancel the shared call
+            result = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self._remaining(deadline))
+            if result is not _RETRY:
+                return result
+        try:
+            result = await fn()
+        except BaseException as e:
+            self._finish(key, future, error=e, retry_on=retry_on)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "leaders": self.leaders,
+                "deduplicated": self.deduplicated,
+                "in_flight": len(self._calls)
+            }
+
+
+# Process-wide table shared by all agents
+request_coalescer = SingleFlight()
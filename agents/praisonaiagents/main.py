@@ -2,8 +2,12 @@ import os
 import time
 import json
 import logging
+import queue
+import threading
+import weakref
+import importlib.util
 from typing import List, Optional, Dict, Any, Union, Literal, Type
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient, DEFAULT_CONNECTION_LIMITS
 from pydantic import BaseModel
 from rich import print
 from rich.console import Console
@@ -30,12 +34,83 @@ error_logs = []
 sync_display_callbacks = {}
 async_display_callbacks = {}
 
+# Headless mode skips all Rich rendering and content cleaning; registered
+# display callbacks receive the raw events on a background thread instead
+_headless = os.environ.get("PRAISONAI_HEADLESS", "").lower() in ("1", "true", "yes")
+
+def set_headless(enabled: bool = True) -> None:
+    """Turn headless mode on or off for every agent that doesn't set its own."""
+    global _headless
+    _headless = enabled
+
+def is_headless() -> bool:
+    return _headless
+
+class EventDispatcher:
+    """
+    Delivers raw display events to registered callbacks without blocking the
+    caller. Events are queued and handled in order by one worker thread, which
+    runs sync callbacks directly and async callbacks on its own event loop.
+    Events without a registered callback are dropped immediately.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def dispatch(self, display_type: str, **kwargs) -> None:
+        if display_type not in sync_display_callbacks and display_type not in async_display_callbacks:
+            return
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name="praison-display-events", daemon=True)
+                    self._worker.start()
+        self._queue.put((display_type, kwargs))
+
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        while True:
+            display_type, kwargs = self._queue.get()
+            try:
+                callback = sync_display_callbacks.get(display_type)
+                if callback:
+                    callback(**kwargs)
+                acallback = async_display_callbacks.get(display_type)
+                if acallback:
+                    loop.run_until_complete(acallback(**kwargs))
+            except Exception as e:
+                logging.error(f"Display callback for '{display_type}' failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        """Block until every queued event has been delivered."""
+        self._queue.join()
+
+event_dispatcher = EventDispatcher()
+
+def dispatch_display_event(display_type: str, **kwargs) -> None:
+    """Record a display event without rendering it (used in headless mode)."""
+    if display_type == "error":
+        error_logs.append(kwargs.get("message"))
+        logging.error(kwargs.get("message"))
+    event_dispatcher.dispatch(display_type, **kwargs)
+
 # At the top of the file, add display_callbacks to __all__
 __all__ = [
     'error_logs',
     'register_display_callback',
     'sync_display_callbacks',
     'async_display_callbacks',
+    'ClientManager',
+    'client_manager',
+    'set_headless',
+    'is_headless',
+    'EventDispatcher',
+    'event_dispatcher',
+    'dispatch_display_event',
     # ... other exports
 ]
 
@@ -92,6 +167,9 @@ def _clean_display_content(content: str, max_length: int = 20000) -> str:
 
 def display_interaction(message, response, markdown=True, generation_time=None, console=None):
     """Synchronous version of display_interaction."""
+    if _headless:
+        dispatch_display_event("interaction", message=message, response=response, markdown=markdown, generation_time=generation_time)
+        return
     if console is None:
         console = Console()
     
@@ -123,6 +201,9 @@ def display_interaction(message, response, markdown=True, generation_time=None,
         console.print(Panel.fit(Text(response, style="bold blue"), title="Response", border_style="cyan"))
 
 def display_self_reflection(message: str, console=None):
+    if _headless:
+        dispatch_display_event("self_reflection", message=message)
+        return
     if not message or not message.strip():
         return
     if console is None:
@@ -136,6 +217,9 @@ def display_self_reflection(message: str, console=None):
     console.print(Panel.fit(Text(message, style="bold yellow"), title="Self Reflection", border_style="magenta"))
 
 def display_instruction(message: str, console=None, agent_name: str = None, agent_role: str = None, agent_tools: List[str] = None):
+    if _headless:
+        dispatch_display_event("instruction", message=message)
+        return
     if not message or not message.strip():
         return
     if console is None:
@@ -161,6 +245,9 @@ def display_instruction(message: str, console=None, agent_name: str = None, agen
         console.print(Panel.fit(Text(message, style="bold blue"), title="Instruction", border_style="cyan"))
 
 def display_tool_call(message: str, console=None):
+    if _headless:
+        dispatch_display_event("tool_call", message=message)
+        return
     if not message or not message.strip():
         return
     if console is None:
@@ -174,6 +261,9 @@ def display_tool_call(message: str, console=None):
     console.print(Panel.fit(Text(message, style="bold cyan"), title="Tool Call", border_style="green"))
 
 def display_error(message: str, console=None):
+    if _headless:
+        dispatch_display_event("error", message=message)
+        return
     if not message or not message.strip():
         return
     if console is None:
@@ -210,6 +300,9 @@ def display_generating(content: str = "", start_time: Optional[float] = None):
 # Async versions with 'a' prefix
 async def adisplay_interaction(message, response, markdown=True, generation_time=None, console=None):
     """Async version of display_interaction."""
+    if _headless:
+        dispatch_display_event("interaction", message=message, response=response, markdown=markdown, generation_time=generation_time)
+        return
     if console is None:
         console = Console()
     
@@ -242,6 +335,9 @@ async def adisplay_interaction(message, response, markdown=True, generation_time
 
 async def adisplay_self_reflection(message: str, console=None):
     """Async version of display_self_reflection."""
+    if _headless:
+        dispatch_display_event("self_reflection", message=message)
+        return
     if not message or not message.strip():
         return
     if console is None:
@@ -255,6 +351,9 @@ async def adisplay_self_reflection(message: str, console=None):
 
 async def adisplay_instruction(message: str, console=None, agent_name: str = None, agent_role: str = None, agent_tools: List[str] = None):
     """Async version of display_instruction."""
+    if _headless:
+        dispatch_display_event("instruction", message=message)
+        return
     if not message or not message.strip():
         return
     if console is None:
@@ -280,6 +379,9 @@ async def adisplay_instruction(message: str, console=None, agent_name: str = Non
 
 async def adisplay_tool_call(message: str, console=None):
     """Async version of display_tool_call."""
+    if _headless:
+        dispatch_display_event("tool_call", message=message)
+        return
     if not message or not message.strip():
         return
     if console is None:
@@ -293,6 +395,9 @@ async def adisplay_tool_call(message: str, console=None):
 
 async def adisplay_error(message: str, console=None):
     """Async version of display_error."""
+    if _headless:
+        dispatch_display_event("error", message=message)
+        return
     if not message or not message.strip():
         return
     if console is None:
@@ -340,7 +445,154 @@ class ReflectionOutput(BaseModel):
     reflection: str
     satisfactory: Literal["yes", "no"]
 
-client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+class StreamEvent(BaseModel):
+    """
+    One event from Agent.stream() / Agent.astream().
+
+    text: content holds a text delta.
+    tool_call_start / tool_call_end: tool_name and tool_call_id; arguments on end.
+    tool_result: result of the tool call.
+    reflection: content holds the reflection, satisfactory its verdict.
+    error: content holds a recoverable error (e.g. a reflection that could not be parsed); the turn goes on.
+    final: content holds the full response, with usage totals and status.
+    """
+    type: Literal["text", "tool_call_start", "tool_call_end", "tool_result", "reflection", "error", "final"]
+    content: Optional[str] = None
+    tool_name: Optional[str] = None
+    tool_call_id: Optional[str] = None
+    arguments: Optional[Any] = None
+    result: Optional[Any] = None
+    satisfactory: Optional[str] = None
+    usage: Optional[Dict[str, int]] = None
+    status: Optional[str] = None
+
+class BatchResult(BaseModel):
+    """
+    Outcome of one prompt from Agent.chat_many() / Agent.achat_many(), or of
+    one item of a map-mode loop task.
+
+    index is the prompt's position in the input. status is 'completed',
+    'timeout' or 'max_iter' as for chat(), or 'error' with the error message.
+    """
+    index: int
+    prompt: Any
+    output: Optional[str] = None
+    status: Literal["completed", "timeout", "max_iter", "error"] = "completed"
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+class ClientManager:
+    """
+    Process-wide pool of OpenAI clients keyed by (base_url, api_key).
+
+    Sync clients are shared by every caller; async clients are additionally keyed
+    by event loop because httpx connection pools cannot cross loops. All clients
+    use one tunable connection pool configuration with keep-alive, and HTTP/2
+    when the optional `h2` package is installed.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = True,
+        timeout: Optional[float] = None,
+        max_retries: int = 2
+    ):
+        self._lock = threading.Lock()
+        self._clients: Dict[tuple, OpenAI] = {}
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[tuple, AsyncOpenAI]]" = weakref.WeakKeyDictionary()
+        self.configure(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+            http2=http2,
+            timeout=timeout,
+            max_retries=max_retries
+        )
+
+    def configure(self, **settings) -> None:
+        """Update pool settings. Only clients created afterwards are affected."""
+        current = getattr(self, "settings", {})
+        current.update(settings)
+        # HTTP/2 needs the optional h2 package; fall back to HTTP/1.1 keep-alive without it
+        if current.get("http2") and importlib.util.find_spec("h2") is None:
+            current["http2"] = False
+        self.settings = current
+
+    def _key(self, base_url: Optional[str], api_key: Optional[str], max_retries: Optional[int] = None) -> tuple:
+        if max_retries is None:
+            max_retries = self.settings["max_retries"]
+        return (base_url or None, api_key or os.environ.get("OPENAI_API_KEY"), max_retries)
+
+    def _client_kwargs(self, key: tuple) -> Dict[str, Any]:
+        kwargs = {"api_key": key[1], "max_retries": key[2]}
+        if key[0]:
+            kwargs["base_url"] = key[0]
+        if self.settings["timeout"] is not None:
+            kwargs["timeout"] = self.settings["timeout"]
+        return kwargs
+
+    def _limits(self):
+        # Built from openai's own limits type, so no direct httpx import is needed
+        return type(DEFAULT_CONNECTION_LIMITS)(
+            max_connections=self.settings["max_connections"],
+            max_keepalive_connections=self.settings["max_keepalive_connections"],
+            keepalive_expiry=self.settings["keepalive_expiry"]
+        )
+
+    def get_client(self, base_url: Optional[str] = None, api_key: Optional[str] = None, max_retries: Optional[int] = None) -> OpenAI:
+        """
+        Borrow the shared sync client for an endpoint. Pass max_retries=0 when
+        the caller handles retries itself (e.g. through an active AdaptiveLimiter).
+        """
+        key = self._key(base_url, api_key, max_retries)
+        client_ = self._clients.get(key)
+        if client_ is None:
+            with self._lock:
+                client_ = self._clients.get(key)
+                if client_ is None:
+                    client_ = OpenAI(
+                        http_client=DefaultHttpxClient(limits=self._limits(), http2=self.settings["http2"]),
+                        **self._client_kwargs(key)
+                    )
+                    self._clients[key] = client_
+        return client_
+
+    def get_async_client(self, base_url: Optional[str] = None, api_key: Optional[str] = None, max_retries: Optional[int] = None) -> AsyncOpenAI:
+        """Borrow the shared async client for an endpoint on the running event loop."""
+        key = self._key(base_url, api_key, max_retries)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            loop_clients = self._async_clients.setdefault(loop, {})
+            client_ = loop_clients.get(key)
+            if client_ is None:
+                client_ = AsyncOpenAI(
+                    http_client=DefaultAsyncHttpxClient(limits=self._limits(), http2=self.settings["http2"]),
+                    **self._client_kwargs(key)
+                )
+                loop_clients[key] = client_
+        return client_
+
+    def close(self) -> None:
+        """Close all pooled sync clients; async clients are released with their loop."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            self._async_clients = weakref.WeakKeyDictionary()
+        for client_ in clients:
+            client_.close()
+
+client_manager = ClientManager()
+
+
+def __getattr__(name: str) -> Any:
+    # Default shared client, kept for backward compatibility. Created on first
+    # access rather than at import, so importing the package needs no API key.
+    if name == "client":
+        return client_manager.get_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 class TaskOutput(BaseModel):
     description: str
@@ -350,6 +602,7 @@ class TaskOutput(BaseModel):
     json_dict: Optional[Dict[str, Any]] = None
     agent: str
     output_format: Literal["RAW", "JSON", "Pydantic"] = "RAW"
+    status: Literal["completed", "timeout", "max_iter"] = "completed"
 
     def json(self) -> Optional[str]:
         if self.output_format == "JSON" and self.json_dict:
@@ -370,4 +623,20 @@ class TaskOutput(BaseModel):
         elif self.json_dict:
             return json.dumps(self.json_dict)
         else:
-            return self.raw 
\ No newline at end of file
+            return self.raw
+
+class TaskEvent(BaseModel):
+    """
+    Progress of one task from PraisonAIAgents.astream().
+
+    started: the task began running. completed / failed: it finished, with
+    its output (if any), elapsed seconds and the error for failures.
+    skipped: it never ran because a task it depends on failed.
+    """
+    type: Literal["started", "completed", "failed", "skipped"]
+    task_id: Any
+    task_name: Optional[str] = None
+    agent: Optional[str] = None
+    result: Optional[TaskOutput] = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
@@ -180,6 +180,17 @@ class Memory:
             self._log_verbose(f"Failed to initialize ChromaDB: {e}", logging.ERROR)
             self.use_rag = False
 
+    def _embed(self, text: str) -> List[float]:
+        """Embed text with the shared client, paced by the endpoint's adaptive limiter."""
+        from ..main import client_manager
+        from ..llm.concurrency import get_concurrency_limiter
+        limiter = get_concurrency_limiter()
+        client = client_manager.get_client(max_retries=limiter.client_retries)
+        response = limiter.call(
+            lambda: client.embeddings.create(input=text, model="text-embedding-3-small")
+        )
+        return response.data[0].embedding
+
     # -------------------------------------------------------------------------
     #                      Basic Quality Score Computation
     # -------------------------------------------------------------------------
@@ -274,14 +285,7 @@ class Memory:
             
         elif self.use_rag and hasattr(self, "chroma_col"):
             try:
-                from openai import OpenAI
-                client = OpenAI()
-                
-                response = client.embeddings.create(
-                    input=query,
-                    model="text-embedding-3-small"
-                )
-                query_embedding = response.data[0].embedding
+                query_embedding = self._embed(query)
                 
                 resp = self.chroma_col.query(
                     query_embeddings=[query_embedding],
@@ -398,17 +402,10 @@ class Memory:
         # Store in vector database if enabled
         if self.use_rag and hasattr(self, "chroma_col"):
             try:
-                from openai import OpenAI
-                client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))  # Ensure API key is correctly set
-                
                 logger.info("Getting embeddings from OpenAI...")
                 logger.debug(f"Embedding input text: {text}")  # Log the input text
                 
-                response = client.embeddings.create(
-                    input=text,
-                    model="text-embedding-3-small"
-                )
-                embedding = response.data[0].embedding
+                embedding = self._embed(text)
                 logger.info("Successfully got embeddings")
                 logger.debug(f"Received embedding of length: {len(embedding)}")  # Log embedding details
                 
@@ -456,15 +453,8 @@ class Memory:
 
         elif self.use_rag and hasattr(self, "chroma_col"):
             try:
-                from openai import OpenAI
-                client = OpenAI()
-                
                 # Get query embedding
-                response = client.embeddings.create(
-                    input=query,
-                    model="text-embedding-3-small"  # Using consistent model
-                )
-                query_embedding = response.data[0].embedding
+                query_embedding = self._embed(query)
                 
                 # Search ChromaDB with embedding
                 resp = self.chroma_col.query(
@@ -836,10 +826,13 @@ class Memory:
         """
 
         try:
-            # Use OpenAI client from main.py
-            from ..main import client
+            # Use the shared OpenAI client, paced by the endpoint's adaptive limiter
+            from ..main import client_manager
+            from ..llm.concurrency import get_concurrency_limiter
+            limiter = get_concurrency_limiter()
+            client = client_manager.get_client(max_retries=limiter.client_retries)
             
-            response = client.chat.completions.create(
+            response = limiter.call(lambda: client.chat.completions.create(
                 model=llm or "gpt-4o",
                 messages=[{
                     "role": "user", 
@@ -847,7 +840,7 @@ class Memory:
                 }],
                 response_format={"type": "json_object"},
                 temperature=0.3
-            )
+            ))
             
             metrics = json.loads(response.choices[0].message.content)
             
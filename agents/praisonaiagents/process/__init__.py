@@ -1,3 +1,5 @@
 from .process import Process
+from .scheduler import TaskScheduler
+from .loop_items import iter_loop_items, iter_loop_file
 
-__all__ = ['Process'] 
\ No newline at end of file
+__all__ = ['Process', 'TaskScheduler', 'iter_loop_items', 'iter_loop_file'] 
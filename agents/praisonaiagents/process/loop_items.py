@@ -0,0 +1,150 @@
+import os
+import re
+import csv
+import json
+from typing import Any, Callable, Iterator, List, Optional, TextIO
+
+# "- item", "* item", "• item", "+ item"
+_BULLET = re.compile(r"^\s*[-*•+]\s+(.+?)\s*$")
+# "1. item", "2) item"
+_NUMBERED = re.compile(r"^\s*\d+[.)]\s+(.+?)\s*$")
+_FENCE = re.compile(r"^```[\w-]*\s*\n(.*?)\n?```$", re.DOTALL)
+# Bytes of a CSV file looked at to detect a header row
+_SNIFF_BYTES = 64 * 1024
+
+
+def iter_loop_items(text: str) -> Optional[Iterator[Any]]:
+    """
+    Items for a loop task, read from a previous task's output without
+    asking an LLM, or None when the output isn't an explicit list.
+
+    Recognized:
+    - a JSON array, or a JSON object whose only value is an array (such
+      as {"items": [...]}), optionally inside a ``` fence;
+    - a bullet list or a numbered list of at least two items, every line
+      an item, after an optional heading ending in ':'.
+
+    Anything else (prose, CSV-like text, a file path) is left to the
+    Loop Manager; files are only read from a task's declared loop_input
+    (see iter_loop_file).
+    """
+    if not isinstance(text, str):
+        return None
+    text = text.strip()
+    fenced = _FENCE.match(text)
+    if fenced:
+        text = fenced.group(1).strip()
+    if not text:
+        return None
+
+    if text[0] in "[{":
+        try:
+            value = json.loads(text)
+        except ValueError:
+            value = None
+        items = _json_items(value)
+        if items is not None:
+            return iter(items)
+
+    lines = [line for line in text.splitlines() if line.strip()]
+    body = lines[1:] if lines[0].rstrip().endswith(":") else lines
+    if len(body) < 2:
+        return None
+    for pattern in (_BULLET, _NUMBERED):
+        matches = [pattern.match(line) for line in body]
+        if all(matches):
+            return iter([match.group(1) for match in matches])
+    return None
+
+
+def iter_loop_file(path: str, header: Optional[bool] = None) -> Iterator[Any]:
+    """
+    Items for a loop task from its declared input file, read one at a time.
+
+    .json holds an array (or an object whose only value is an array);
+    .jsonl/.ndjson one JSON value per line; .csv/.tsv one row per item,
+    as a dict keyed by the header row when header is True, or when header
+    is None and csv.Sniffer detects one, and as a list otherwise (a
+    single column gives the value itself); any other file one item per
+    non-empty line. The file is reopened for each item, so no handle is
+    held open between loop passes.
+    """
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"Loop input file not found: {path}")
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".json":
+        with open(path, encoding="utf-8") as f:
+            items = _json_items(json.load(f))
+        if items is None:
+            raise ValueError(f"Loop input {path} must hold a JSON array")
+        return iter(items)
+    if extension in (".csv", ".tsv"):
+        delimiter = "\t" if extension == ".tsv" else ","
+        if header is None:
+            header = _has_header(path)
+        return _iter_rows(path, delimiter, header)
+    if extension in (".jsonl", ".ndjson"):
+        return (_json_value(line) for line in _iter_records(path, _read_line))
+    return _iter_records(path, _read_line)
+
+
+def _json_items(value: Any) -> Optional[List[Any]]:
+    if isinstance(value, list):
+        return value
+    if isinstance(value, dict) and len(value) == 1:
+        only = next(iter(value.values()))
+        if isinstance(only, list):
+            return only
+    return None
+
+
+def _json_value(line: str) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError:
+        return line
+
+
+def _has_header(path: str) -> bool:
+    with open(path, newline="", encoding="utf-8") as f:
+        sample = f.read(_SNIFF_BYTES)
+    try:
+        return csv.Sniffer().has_header(sample)
+    except csv.Error:
+        return False
+
+
+def _iter_records(path: str, read: Callable[[TextIO], Any]) -> Iterator[Any]:
+    """Yield read(f) until it returns None, reopening the file at the saved offset for each record."""
+    offset = 0
+    while True:
+        with open(path, newline="", encoding="utf-8") as f:
+            f.seek(offset)
+            record = read(f)
+            offset = f.tell()
+        if record is None:
+            return
+        yield record
+
+
+def _read_line(f: TextIO) -> Optional[str]:
+    """The next non-empty line, stripped, or None at the end of the file."""
+    for line in iter(f.readline, ""):
+        if line.strip():
+            return line.strip()
+    return None
+
+
+def _iter_rows(path: str, delimiter: str, header: bool) -> Iterator[Any]:
+    def read(f):
+        # readline (not iteration) keeps f.tell() usable; quoted fields may span lines
+        for row in csv.reader(iter(f.readline, ""), delimiter=delimiter):
+            if row:
+                return row
+        return None
+
+    rows = _iter_records(path, read)
+    if header:
+        columns = next(rows, None)
+        return (dict(zip(columns, row)) for row in rows) if columns else iter(())
+    return (row[0] if len(row) == 1 else row for row in rows)
@@ -1,10 +1,13 @@
 import logging
 import asyncio
+from itertools import islice
 from typing import Dict, Optional, List, Any, AsyncGenerator
 from pydantic import BaseModel
 from ..agent.agent import Agent
 from ..task.task import Task
-from ..main import display_error, client
+from ..main import display_error, client_manager
+from ..llm.json_stream import parse_json_output
+from .loop_items import iter_loop_items, iter_loop_file
 
 class LoopItems(BaseModel):
     items: List[Any]
@@ -15,6 +18,33 @@ class Process:
         self.agents = agents
         self.manager_llm = manager_llm
         self.verbose = verbose
+        self._loop_manager_template = None
+
+    def _loop_manager(self) -> Agent:
+        """A fresh loop manager Agent, spawned from one template built on first use."""
+        if self._loop_manager_template is None:
+            self._loop_manager_template = Agent(
+                name="Loop Manager",
+                role="Loop data processor",
+                goal="Process loop data and convert it to list format",
+                backstory="Expert at handling loop data and converting it to proper format",
+                llm=self.manager_llm,
+                verbose=self.verbose,
+                markdown=True
+            )
+        return self._loop_manager_template.spawn()
+
+    @staticmethod
+    def _start_loop(task: Task, items) -> Dict[str, Any]:
+        """Loop state for a loop task's first visit, over an iterator of its items."""
+        loop_info = {"items": items, "description": task.description}
+        if task.loop_mode == "map":
+            # Each item runs as its own copy of the task
+            task.loop_items = items
+        else:
+            # Read one item per pass; the rest stay unread until needed
+            loop_info["next"] = list(islice(items, 1))
+        return loop_info
 
     async def aworkflow(self) -> AsyncGenerator[str, None]:
         """Async version of workflow method"""
@@ -46,57 +76,58 @@ class Process:
             logging.info(f"Executing workflow task: {current_task.name if current_task.name else task_id}")
             
             # Add context from previous tasks to description
-            if current_task.previous_tasks or current_task.context:
+            if current_task.previous_tasks or current_task.context or current_task.loop_input:
                 context = "\nInput data from previous tasks:"
+
+                # A declared input file lists the loop items itself
+                if current_task.task_type == "loop" and current_task.loop_input and f"loop_{current_task.name}" not in loop_data:
+                    loop_data[f"loop_{current_task.name}"] = self._start_loop(
+                        current_task, iter_loop_file(current_task.loop_input, current_task.loop_input_header)
+                    )
                 
                 # Add data from previous tasks in workflow
                 for prev_name in current_task.previous_tasks:
                     prev_task = next((t for t in self.tasks.values() if t.name == prev_name), None)
                     if prev_task and prev_task.result:
-                        # Handle loop data
-                        if current_task.task_type == "loop":
-                            # create a loop manager Agent
-                            loop_manager = Agent(
-                                name="Loop Manager",
-                                role="Loop data processor",
-                                goal="Process loop data and convert it to list format",
-                                backstory="Expert at handling loop data and converting it to proper format",
-                                llm=self.manager_llm,
-                                verbose=self.verbose,
-                                markdown=True
-                            )
-
-                            # get the loop data convert it to list using calling Agent class chat
-                            loop_prompt = f"""
+                        # Handle loop data, listing the items on the first visit only
+                        if current_task.task_type == "loop" and f"loop_{current_task.name}" not in loop_data:
+                            items = iter_loop_items(prev_task.result.raw)
+                            if items is None:
+                                # Not a list we can read directly: ask the Loop Manager to list the items
+                                loop_manager = self._loop_manager()
+
+                                loop_prompt = f"""
 Process this data into a list format:
 {prev_task.result.raw}
 
 Return a JSON object with an 'items' array containing the items to process.
 """
-                            if current_task.async_execution:
-                                loop_data_str = await loop_manager.achat(
-                                    prompt=loop_prompt,
-                                    output_json=LoopItems
-                                )
-                            else:
-                                loop_data_str = loop_manager.chat(
-                                    prompt=loop_prompt,
-                                    output_json=LoopItems
-                                )
-                            
-                            try:
-                                # The response will already be parsed into LoopItems model
-                                loop_data[f"loop_{current_task.name}"] = {
-                                    "items": loop_data_str.items,
-                                    "index": 0,
-                                    "remaining": len(loop_data_str.items)
-                                }
-                                context += f"\nCurrent loop item: {loop_data_str.items[0]}"
-                            except Exception as e:
-                                display_error(f"Failed to process loop data: {e}")
-                                context += f"\n{prev_name}: {prev_task.result.raw}"
-                        else:
+                                try:
+                                    if current_task.async_execution:
+                                        loop_data_str = await loop_manager.achat(
+                                            prompt=loop_prompt,
+                                            output_json=LoopItems
+                                        )
+                                    else:
+                                        loop_data_str = loop_manager.chat(
+                                            prompt=loop_prompt,
+                                            output_json=LoopItems
+                                        )
+                                    # chat() returns the JSON text of the LoopItems model
+                                    if isinstance(loop_data_str, str):
+                                        loop_data_str = LoopItems(**parse_json_output(loop_data_str))
+                                    items = iter(loop_data_str.items)
+                                except Exception as e:
+                                    display_error(f"Failed to process loop data: {e}")
+                                    context += f"\n{prev_name}: {prev_task.result.raw}"
+                            if items is not None:
+                                loop_data[f"loop_{current_task.name}"] = self._start_loop(current_task, items)
+                        elif current_task.task_type != "loop":
                             context += f"\n{prev_name}: {prev_task.result.raw}"
+
+                loop_info = loop_data.get(f"loop_{current_task.name}") if current_task.task_type == "loop" else None
+                if loop_info and current_task.loop_mode != "map" and loop_info["next"]:
+                    context += f"\nCurrent loop item: {loop_info['next'][0]}"
                 
                 # Add data from context tasks
                 if current_task.context:
@@ -104,8 +135,8 @@ Return a JSON object with an 'items' array containing the items to process.
                         if ctx_task.result and ctx_task.name != current_task.name:
                             context += f"\n{ctx_task.name}: {ctx_task.result.raw}"
                 
-                # Update task description with context
-                current_task.description = current_task.description + context
+                # Update task description with context, rebuilt from the original on each loop pass
+                current_task.description = (loop_info["description"] if loop_info else current_task.description) + context
             
             # Execute task using existing run_task method
             yield task_id
@@ -114,10 +145,15 @@ Return a JSON object with an 'items' array containing the items to process.
             # Handle loop progression
             if current_task.task_type == "loop":
                 loop_key = f"loop_{current_task.name}"
-                if loop_key in loop_data:
+                if current_task.loop_mode == "map":
+                    # Every item already ran; list them again if the loop is revisited
+                    loop_data.pop(loop_key, None)
+                elif loop_key in loop_data:
                     loop_info = loop_data[loop_key]
-                    loop_info["index"] += 1
-                    has_more = loop_info["remaining"] > 0
+                    loop_info["next"] = list(islice(loop_info["items"], 1))
+                    has_more = bool(loop_info["next"])
+                    if not has_more:
+                        del loop_data[loop_key]
                     
                     # Update result to trigger correct condition
                     if current_task.result:
@@ -135,19 +171,25 @@ Return a JSON object with an 'items' array containing the items to process.
                     result = current_task.result.raw.lower()
                     # Check conditions
                     for condition, tasks in current_task.condition.items():
-                        if condition.lower() in result:
-                            # Handle both list and direct string values
-                            task_value = tasks[0] if isinstance(tasks, list) else tasks
-                            if not task_value or task_value == "exit":  # If empty or explicit exit
-                                logging.info("Workflow exit condition met, ending workflow")
-                                current_task = None
-                                break
-                            next_task_name = task_value
-                            next_task = next((t for t in self.tasks.values() if t.name == next_task_name), None)
-                            # For loops, allow revisiting the same task
-                            if next_task and next_task.id == current_task.id:
-                                visited_tasks.discard(current_task.id)
+                        # Handle both list and direct string values
+                        task_value = (tasks[0] if tasks else None) if isinstance(tasks, list) else tasks
+                        if current_task.task_type == "loop" and current_task.loop_mode == "map":
+                            # Every item has run: take the branch that leaves the loop
+                            if task_value == current_task.name:
+                                continue
+                        elif condition.lower() not in result:
+                            continue
+                        if not task_value or task_value == "exit":  # If empty or explicit exit
+                            logging.info("Workflow exit condition met, ending workflow")
+                            current_task = None
                             break
+                        next_task_name = task_value
+                        next_task = next((t for t in self.tasks.values() if t.name == next_task_name), None)
+                        # For loops, allow revisiting the same task
+                        if next_task and next_task.id == current_task.id:
+                            visited_tasks.discard(current_task.id)
+                            current_task.status = "not started"
+                        break
             
             if not next_task and current_task and current_task.next_tasks:
                 next_task_name = current_task.next_tasks[0]
@@ -226,7 +268,7 @@ Provide a JSON with the structure:
             try:
                 logging.info("Requesting manager instructions...")
                 if manager_task.async_execution:
-                    manager_response = await client.beta.chat.completions.parse(
+                    manager_response = await client_manager.get_async_client().beta.chat.completions.parse(
                         model=self.manager_llm,
                         messages=[
                             {"role": "system", "content": manager_task.description},
@@ -236,7 +278,7 @@ Provide a JSON with the structure:
                         response_format=ManagerInstructions
                     )
                 else:
-                    manager_response = client.beta.chat.completions.parse(
+                    manager_response = client_manager.get_client().beta.chat.completions.parse(
                         model=self.manager_llm,
                         messages=[
                             {"role": "system", "content": manager_task.description},
@@ -319,51 +361,52 @@ Provide a JSON with the structure:
             logging.info(f"Executing workflow task: {current_task.name if current_task.name else task_id}")
             
             # Add context from previous tasks to description
-            if current_task.previous_tasks or current_task.context:
+            if current_task.previous_tasks or current_task.context or current_task.loop_input:
                 context = "\nInput data from previous tasks:"
+
+                # A declared input file lists the loop items itself
+                if current_task.task_type == "loop" and current_task.loop_input and f"loop_{current_task.name}" not in loop_data:
+                    loop_data[f"loop_{current_task.name}"] = self._start_loop(
+                        current_task, iter_loop_file(current_task.loop_input, current_task.loop_input_header)
+                    )
                 
                 # Add data from previous tasks in workflow
                 for prev_name in current_task.previous_tasks:
                     prev_task = next((t for t in self.tasks.values() if t.name == prev_name), None)
                     if prev_task and prev_task.result:
-                        # Handle loop data
-                        if current_task.task_type == "loop":
-                            # create a loop manager Agent
-                            loop_manager = Agent(
-                                name="Loop Manager",
-                                role="Loop data processor",
-                                goal="Process loop data and convert it to list format",
-                                backstory="Expert at handling loop data and converting it to proper format",
-                                llm=self.manager_llm,
-                                verbose=self.verbose,
-                                markdown=True
-                            )
-
-                            # get the loop data convert it to list using calling Agent class chat
-                            loop_prompt = f"""
+                        # Handle loop data, listing the items on the first visit only
+                        if current_task.task_type == "loop" and f"loop_{current_task.name}" not in loop_data:
+                            items = iter_loop_items(prev_task.result.raw)
+                            if items is None:
+                                # Not a list we can read directly: ask the Loop Manager to list the items
+                                loop_manager = self._loop_manager()
+
+                                loop_prompt = f"""
 Process this data into a list format:
 {prev_task.result.raw}
 
 Return a JSON object with an 'items' array containing the items to process.
 """
-                            loop_data_str = loop_manager.chat(
-                                prompt=loop_prompt,
-                                output_json=LoopItems
-                            )
-                            
-                            try:
-                                # The response will already be parsed into LoopItems model
-                                loop_data[f"loop_{current_task.name}"] = {
-                                    "items": loop_data_str.items,
-                                    "index": 0,
-                                    "remaining": len(loop_data_str.items)
-                                }
-                                context += f"\nCurrent loop item: {loop_data_str.items[0]}"
-                            except Exception as e:
-                                display_error(f"Failed to process loop data: {e}")
-                                context += f"\n{prev_name}: {prev_task.result.raw}"
-                        else:
+                                try:
+                                    loop_data_str = loop_manager.chat(
+                                        prompt=loop_prompt,
+                                        output_json=LoopItems
+                                    )
+                                    # chat() returns the JSON text of the LoopItems model
+                                    if isinstance(loop_data_str, str):
+                                        loop_data_str = LoopItems(**parse_json_output(loop_data_str))
+                                    items = iter(loop_data_str.items)
+                                except Exception as e:
+                                    display_error(f"Failed to process loop data: {e}")
+                                    context += f"\n{prev_name}: {prev_task.result.raw}"
+                            if items is not None:
+                                loop_data[f"loop_{current_task.name}"] = self._start_loop(current_task, items)
+                        elif current_task.task_type != "loop":
                             context += f"\n{prev_name}: {prev_task.result.raw}"
+
+                loop_info = loop_data.get(f"loop_{current_task.name}") if current_task.task_type == "loop" else None
+                if loop_info and current_task.loop_mode != "map" and loop_info["next"]:
+                    context += f"\nCurrent loop item: {loop_info['next'][0]}"
                 
                 # Add data from context tasks
                 if current_task.context:
@@ -371,8 +414,8 @@ Return a JSON object with an 'items' array containing the items to process.
                         if ctx_task.result and ctx_task.name != current_task.name:
                             context += f"\n{ctx_task.name}: {ctx_task.result.raw}"
                 
-                # Update task description with context
-                current_task.description = current_task.description + context
+                # Update task description with context, rebuilt from the original on each loop pass
+                current_task.description = (loop_info["description"] if loop_info else current_task.description) + context
             
             # Execute task using existing run_task method
             yield task_id
@@ -381,10 +424,15 @@ Return a JSON object with an 'items' array containing the items to process.
             # Handle loop progression
             if current_task.task_type == "loop":
                 loop_key = f"loop_{current_task.name}"
-                if loop_key in loop_data:
+                if current_task.loop_mode == "map":
+                    # Every item already ran; list them again if the loop is revisited
+                    loop_data.pop(loop_key, None)
+                elif loop_key in loop_data:
                     loop_info = loop_data[loop_key]
-                    loop_info["index"] += 1
-                    has_more = loop_info["remaining"] > 0
+                    loop_info["next"] = list(islice(loop_info["items"], 1))
+                    has_more = bool(loop_info["next"])
+                    if not has_more:
+                        del loop_data[loop_key]
                     
                     # Update result to trigger correct condition
                     if current_task.result:
@@ -402,19 +450,25 @@ Return a JSON object with an 'items' array containing the items to process.
                     result = current_task.result.raw.lower()
                     # Check conditions
                     for condition, tasks in current_task.condition.items():
-                        if condition.lower() in result:
-                            # Handle both list and direct string values
-                            task_value = tasks[0] if isinstance(tasks, list) else tasks
-                            if not task_value or task_value == "exit":  # If empty or explicit exit
-                                logging.info("Workflow exit condition met, ending workflow")
-                                current_task = None
-                                break
-                            next_task_name = task_value
-                            next_task = next((t for t in self.tasks.values() if t.name == next_task_name), None)
-                            # For loops, allow revisiting the same task
-                            if next_task and next_task.id == current_task.id:
-                                visited_tasks.discard(current_task.id)
+                        # Handle both list and direct string values
+                        task_value = (tasks[0] if tasks else None) if isinstance(tasks, list) else tasks
+                        if current_task.task_type == "loop" and current_task.loop_mode == "map":
+                            # Every item has run: take the branch that leaves the loop
+                            if task_value == current_task.name:
+                                continue
+                        elif condition.lower() not in result:
+                            continue
+                        if not task_value or task_value == "exit":  # If empty or explicit exit
+                            logging.info("Workflow exit condition met, ending workflow")
+                            current_task = None
                             break
+                        next_task_name = task_value
+                        next_task = next((t for t in self.tasks.values() if t.name == next_task_name), None)
+                        # For loops, allow revisiting the same task
+                        if next_task and next_task.id == current_task.id:
+                            visited_tasks.discard(current_task.id)
+                            current_task.status = "not started"
+                        break
             
             if not next_task and current_task and current_task.next_tasks:
                 next_task_name = current_task.next_tasks[0]
@@ -492,7 +546,7 @@ Provide a JSON with the structure:
 
             try:
                 logging.info("Requesting manager instructions...")
-                manager_response = client.beta.chat.completions.parse(
+                manager_response = client_manager.get_client().beta.chat.completions.parse(
                     model=self.manager_llm,
                     messages=[
                         {"role": "system", "content": manager_task.description},
@@ -0,0 +1,174 @@
+import time
+import heapq
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+
+from ..main import TaskEvent
+from ..task.task import Task
+
+
+class TaskScheduler:
+    """
+    Runs tasks as a dependency graph instead of one after another.
+
+    A task depends on every task in its context and on every task that
+    names it in next_tasks (those are added to its context, so their
+    output reaches its prompt). Each task starts as soon as all of its
+    dependencies completed, with at most max_concurrency running overall
+    and agent_concurrency per agent. Dependents of a failed task are
+    skipped. With critical_path=True, ready tasks on the longest remaining
+    chain start first, which shortens the run when concurrency is capped.
+    """
+
+    def __init__(
+        self,
+        tasks: Dict[Any, Task],
+        max_concurrency: Optional[int] = None,
+        agent_concurrency: Optional[int] = None,
+        critical_path: bool = False
+    ):
+        self.tasks = tasks
+        self.max_concurrency = max_concurrency
+        self.agent_concurrency = agent_concurrency
+        self.critical_path = critical_path
+        self.dependencies = self._build_graph()
+        self.dependents: Dict[Any, List[Any]] = {task_id: [] for task_id in tasks}
+        for task_id, upstream in self.dependencies.items():
+            for dependency in upstream:
+                self.dependents[dependency].append(task_id)
+        self.order = self._topological_order()
+        self.priority = self._chain_lengths() if critical_path else {}
+
+    def _build_graph(self) -> Dict[Any, Set[Any]]:
+        ids = {id(task): task_id for task_id, task in self.tasks.items()}
+        by_name = {task.name: task_id for task_id, task in self.tasks.items() if task.name}
+        dependencies: Dict[Any, Set[Any]] = {task_id: set() for task_id in self.tasks}
+        for task_id, task in self.tasks.items():
+            if task.task_type in ("decision", "loop") or task.condition:
+                raise ValueError(f"Task {task.name or task_id} is a {task.task_type} task; use process='workflow' for conditional and loop tasks")
+            for context_task in task.context:
+                if id(context_task) in ids:
+                    dependencies[task_id].add(ids[id(context_task)])
+            for name in task.next_tasks:
+                downstream_id = by_name.get(name)
+                if downstream_id is None:
+                    logging.warning(f"Task {task.name or task_id} names unknown next task '{name}'")
+                    continue
+                dependencies[downstream_id].add(task_id)
+                downstream = self.tasks[downstream_id]
+                if all(context_task is not task for context_task in downstream.context):
+                    downstream.context.append(task)
+        return dependencies
+
+    def _topological_order(self) -> List[Any]:
+        remaining = {task_id: len(upstream) for task_id, upstream in self.dependencies.items()}
+        order = [task_id for task_id, count in remaining.items() if count == 0]
+        for task_id in order:
+            for dependent in self.dependents[task_id]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    order.append(dependent)
+        if len(order) < len(self.tasks):
+            cycle = [self.tasks[task_id].name or str(task_id) for task_id, count in remaining.items() if count > 0]
+            raise ValueError(f"Task dependencies form a cycle among: {', '.join(cycle)}")
+        return order
+
+    def _chain_lengths(self) -> Dict[Any, float]:
+        """Length of the longest chain from each task to the end of the graph, weighting tasks by config['estimated_duration']."""
+        lengths: Dict[Any, float] = {}
+        for task_id in reversed(self.order):
+            weight = float(self.tasks[task_id].config.get("estimated_duration", 1))
+            lengths[task_id] = weight + max((lengths[d] for d in self.dependents[task_id]), default=0.0)
+        return lengths
+
+    async def run(self, run_task: Callable[[Any], Awaitable[Any]]) -> AsyncIterator[TaskEvent]:
+        """
+        Run every task with run_task(task_id), yielding a TaskEvent as each
+        starts and finishes. A task counts as failed unless its status is
+        'completed' afterwards. Tasks already completed are not run again.
+        """
+        position = {task_id: i for i, task_id in enumerate(self.order)}
+        waiting = {task_id: len(upstream) for task_id, upstream in self.dependencies.items()}
+        ready: List[tuple] = []
+        running: Dict[asyncio.Future, Any] = {}
+        started: Dict[Any, float] = {}
+        per_agent: Dict[int, int] = {}
+        blocked: Set[Any] = set()
+        events: List[TaskEvent] = []
+
+        def event(type_, task_id, **fields):
+            task = self.tasks[task_id]
+            return TaskEvent(type=type_, task_id=task_id, task_name=task.name, agent=task.agent.name if task.agent else None, **fields)
+
+        def push(task_id):
+            heapq.heappush(ready, (-self.priority.get(task_id, 0), position[task_id], task_id))
+
+        def release(task_id):
+            for dependent in self.dependents[task_id]:
+                waiting[dependent] -= 1
+                if waiting[dependent] == 0 and dependent not in blocked:
+                    push(dependent)
+
+        def skip(task_id):
+            for dependent in self.dependents[task_id]:
+                if dependent not in blocked:
+                    blocked.add(dependent)
+                    events.append(event("skipped", dependent, error=f"Dependency {self.tasks[task_id].name or task_id} failed"))
+                    skip(dependent)
+
+        for task_id in self.order:
+            if waiting[task_id] == 0:
+                push(task_id)
+
+        try:
+            while ready or running:
+                deferred = []
+                while ready and (not self.max_concurrency or len(running) < self.max_concurrency):
+                    item = heapq.heappop(ready)
+                    task_id = item[2]
+                    task = self.tasks[task_id]
+                    if task.status == "completed":
+                        events.append(event("completed", task_id, result=task.result))
+                        release(task_id)
+                        continue
+                    agent_key = id(task.agent)
+                    if self.agent_concurrency and per_agent.get(agent_key, 0) >= self.agent_concurrency:
+                        deferred.append(item)
+                        continue
+                    per_agent[agent_key] = per_agent.get(agent_key, 0) + 1
+                    started[task_id] = time.perf_counter()
+                    running[asyncio.ensure_future(run_task(task_id))] = task_id
+                    events.append(event("started", task_id))
+                for item in deferred:
+                    heapq.heappush(ready, item)
+
+                for item in events:
+                    yield item
+                events.clear()
+                if not running:
+                    continue
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    task_id = running.pop(future)
+                    task = self.tasks[task_id]
+                    per_agent[id(task.agent)] -= 1
+                    elapsed = time.perf_counter() - started[task_id]
+                    error = None if future.cancelled() else future.exception()
+                    if error is None and task.status == "completed":
+                        events.append(event("completed", task_id, result=task.result, elapsed=elapsed))
+                        release(task_id)
+                    else:
+                        if error is not None:
+                            logging.error(f"Task {task.name or task_id} raised: {error}")
+                        message = str(error) if error is not None else f"Task ended with status '{task.status}'"
+                        task.status = "failed"
+                        events.append(event("failed", task_id, result=task.result, error=message, elapsed=elapsed))
+                        skip(task_id)
+        finally:
+            # The consumer stopped early: don't leave tasks running unobserved
+            for future in running:
+                future.cancel()
+        for item in events:
+            yield item
@@ -37,7 +37,11 @@ class Task:
         is_start: bool = False,
         loop_state: Optional[Dict[str, Union[str, int]]] = None,
         memory=None,
-        quality_check=True
+        quality_check=True,
+        loop_mode: str = "sequential",
+        map_concurrency: int = 8,
+        loop_input: Optional[str] = None,
+        loop_input_header: Optional[bool] = None
     ):
         self.id = str(uuid.uuid4()) if id is None else str(id)
         self.name = name
@@ -63,6 +67,16 @@ class Task:
         self.loop_state = loop_state if loop_state else {}
         self.memory = memory
         self.quality_check = quality_check
+        if loop_mode not in ("sequential", "map"):
+            raise ValueError(f"loop_mode must be 'sequential' or 'map', got '{loop_mode}'")
+        self.loop_mode = loop_mode
+        self.map_concurrency = map_concurrency
+        # File a loop task reads its items from (.json, .jsonl, .csv/.tsv or one item per line);
+        # loop_input_header says whether a CSV has a header row, or None to detect it
+        self.loop_input = loop_input
+        self.loop_input_header = loop_input_header
+        # Items a map-mode loop task fans out over, set by the workflow process
+        self.loop_items = None
 
         # Set logger level based on config verbose level
         verbose = self.config.get("verbose", 0)
@@ -86,6 +100,26 @@ class Task:
     def __str__(self):
         return f"Task(name='{self.name if self.name else 'None'}', description='{self.description}', agent='{self.agent.name if self.agent else 'None'}', status='{self.status}')"
 
+    def for_item(self, index: int, item: Any) -> "Task":
+        """A copy of this task that processes one item of a map-mode loop."""
+        return Task(
+            description=f"{self.description}\nCurrent loop item: {item}",
+            expected_output=self.expected_output,
+            agent=self.agent,
+            name=f"{self.name or self.id} [{index + 1}]",
+            tools=self.tools,
+            context=list(self.context),
+            async_execution=self.async_execution,
+            config=self.config,
+            output_json=self.output_json,
+            output_pydantic=self.output_pydantic,
+            callback=self.callback,
+            create_directory=self.create_directory,
+            images=self.images,
+            memory=self.memory,
+            quality_check=self.quality_check
+        )
+
     def initialize_memory(self):
         """Initialize memory if config exists but memory doesn't"""
         if not self.memory and self.config.get('memory_config'):
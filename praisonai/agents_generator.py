@@ -241,6 +241,44 @@ class AgentsGenerator:
             
         return tools_list
 
+    def _load_config(self):
+        """Parse the playbook YAML, or return None when the agent file is missing."""
+        if self.agent_yaml:
+            return yaml.safe_load(self.agent_yaml)
+        if self.agent_file == '/app/api:app' or self.agent_file == 'api:app':
+            self.agent_file = 'agents.yaml'
+        try:
+            with open(self.agent_file, 'r') as f:
+                return yaml.safe_load(f)
+        except FileNotFoundError:
+            print(f"File not found: {self.agent_file}")
+            return None
+
+    def generate_batch(self, inputs, out="results.jsonl", concurrency=16, topic_column="topic"):
+        """
+        Run the playbook once per input and write one JSON line per input to out.
+
+        The playbook is compiled once; instances run concurrently on the shared
+        clients and rate limiters, and inputs already completed in out are skipped.
+        See praisonai.batch.read_inputs for the accepted input formats; rows and
+        JSON objects take their topic from topic_column.
+
+        Returns:
+            dict: Counts of completed, failed and resumed inputs, and the elapsed time.
+        """
+        from .batch import read_inputs, run_batch
+
+        config = self._load_config()
+        if config is None:
+            return None
+        framework = self.framework or config.get('framework') or "praisonai"
+        if framework != "praisonai":
+            raise ValueError("Batch mode requires the praisonai framework (set framework: praisonai or pass --framework praisonai)")
+        if not PRAISONAI_AVAILABLE:
+            raise ImportError("PraisonAI is not installed. Please install it with 'pip install praisonaiagents'")
+        build = self.compile_praisonai(config)
+        return run_batch(build, read_inputs(inputs, topic_column), out, concurrency)
+
     def generate_crew_and_kickoff(self):
         """
         Generates a crew of agents and initiates tasks based on the provided configuration.
@@ -258,17 +296,9 @@ class AgentsGenerator:
 
         This function first loads the agent configuration from the specified file. It then initializes the tools required for the agents based on the specified framework. If the specified framework is "autogen", it loads the LLM configuration dynamically and creates an AssistantAgent for each role in the configuration. It then adds tools to the agents if specified in the configuration. Finally, it prepares tasks for the agents based on the configuration and initiates the tasks using the crew of agents. If the specified framework is not "autogen", it creates a crew of agents and initiates tasks based on the configuration.
         """
-        if self.agent_yaml:
-            config = yaml.safe_load(self.agent_yaml)
-        else:
-            if self.agent_file == '/app/api:app' or self.agent_file == 'api:app':
-                self.agent_file = 'agents.yaml'
-            try:
-                with open(self.agent_file, 'r') as f:
-                    config = yaml.safe_load(f)
-            except FileNotFoundError:
-                print(f"File not found: {self.agent_file}")
-                return
+        config = self._load_config()
+        if config is None:
+            return
 
         topic = config['topic']
         tools_dict = {}
@@ -535,114 +565,163 @@ class AgentsGenerator:
         """
         Run agents using the PraisonAI framework.
         """
-        agents = {}
-        tasks = []
-        tasks_dict = {}
+        agents = self.compile_praisonai(config)(topic)
 
+        self.logger.debug("Final Configuration:")
+        self.logger.debug(f"Agents: {agents.agents}")
+        self.logger.debug(f"Tasks: {agents.tasks}")
+
+        response = agents.start()
+        self.logger.debug(f"Result: {response}")
+        result = ""
+        
+        if AGENTOPS_AVAILABLE:
+            agentops.end_session("Success")
+            
+        return result
+
+    def compile_praisonai(self, config):
+        """
+        Prepare a PraisonAI playbook once for any number of runs.
+
+        tools.py is loaded and one template agent per role is built; its tool
+        schemas are compiled on the first spawn and shared by every agent
+        spawned from it. The returned build(topic,
+        fields=None, quiet=False) spawns agents from the templates with the
+        role, goal, backstory and task texts filled in from topic and fields,
+        and returns a PraisonAIAgents ready to start. quiet=True turns off
+        console output and output files, for batch runs.
+        """
         # Load tools once at the beginning
         tools_list = self.load_tools_from_tools_py()
         self.logger.debug(f"Loaded tools: {tools_list}")
 
-        # Create agents from config
+        templates = {}
         for role, details in config['roles'].items():
-            role_filled = details['role'].format(topic=topic)
-            goal_filled = details['goal'].format(topic=topic)
-            backstory_filled = details['backstory'].format(topic=topic)
-            
             # Pass all loaded tools to the agent
             agent = PraisonAgent(
-                name=role_filled,
-                role=role_filled,
-                goal=goal_filled,
-                backstory=backstory_filled,
+                name=details['role'],
+                role=details['role'],
+                goal=details['goal'],
+                backstory=details['backstory'],
                 tools=tools_list,  # Pass the entire tools list to the agent
                 allow_delegation=details.get('allow_delegation', False),
                 llm=details.get('llm', {}).get("model", os.environ.get("MODEL_NAME", "gpt-4o")),
                 function_calling_llm=details.get('function_calling_llm', {}).get("model", os.environ.get("MODEL_NAME", "gpt-4o")),
                 max_iter=details.get('max_iter', 15),
                 max_rpm=details.get('max_rpm'),
+                max_tpm=details.get('max_tpm'),
                 max_execution_time=details.get('max_execution_time'),
                 verbose=details.get('verbose', True),
-                cache=details.get('cache', True),
+                cache=details.get('cache', False),
                 system_template=details.get('system_template'),
                 prompt_template=details.get('prompt_template'),
                 response_template=details.get('response_template'),
                 reflect_llm=details.get('reflect_llm', {}).get("model", os.environ.get("MODEL_NAME", "gpt-4o")),
                 min_reflect=details.get('min_reflect', 1),
                 max_reflect=details.get('max_reflect', 3),
+                parallel_tool_calls=details.get('parallel_tool_calls', False),
+                max_tool_concurrency=details.get('max_tool_concurrency', 4),
+                tool_concurrency=details.get('tool_concurrency'),
+                fallback_llms=details.get('fallback_llms'),
+                hedge_requests=details.get('hedge_requests', False),
+                hedge_percentile=details.get('hedge_percentile', 95.0),
+                hedge_delay=details.get('hedge_delay'),
             )
             
             if self.agent_callback:
                 agent.step_callback = self.agent_callback
+            templates[role] = agent
 
-            agents[role] = agent
-            self.logger.debug(f"Created agent {role_filled} with tools: {agent.tools}")
-
-            # Create tasks for the agent
-            for task_name, task_details in details.get('tasks', {}).items():
-                description_filled = task_details['description'].format(topic=topic)
-                expected_output_filled = task_details['expected_output'].format(topic=topic)
-
-                task = PraisonTask(
-                    description=description_filled,
-                    expected_output=expected_output_filled,
-                    agent=agent,
-                    tools=tools_list,  # Pass the same tools list to the task
-                    async_execution=task_details.get('async_execution', False),
-                    context=[],
-                    config=task_details.get('config', {}),
-                    output_json=task_details.get('output_json'),
-                    output_pydantic=task_details.get('output_pydantic'),
-                    output_file=task_details.get('output_file', ""),
-                    callback=task_details.get('callback'),
-                    create_directory=task_details.get('create_directory', False)
-                )
-
-                self.logger.debug(f"Created task {task_name} with tools: {task.tools}")
-                
-                if self.task_callback:
-                    task.callback = self.task_callback
-
-                tasks.append(task)
-                tasks_dict[task_name] = task
-
-        # Set up task contexts
-        for role, details in config['roles'].items():
-            for task_name, task_details in details.get('tasks', {}).items():
-                task = tasks_dict[task_name]
-                context_tasks = [tasks_dict[ctx] for ctx in task_details.get('context', []) 
-                            if ctx in tasks_dict]
-                task.context = context_tasks
-
-        # Create and run the PraisonAI agents
         memory = config.get('memory', False)
         self.logger.debug(f"Memory: {memory}")
-        if config.get('process') == 'hierarchical':
-            agents = PraisonAIAgents(
-                agents=list(agents.values()),
-                tasks=tasks,
-                verbose=True,
-                process="hierarchical",
-                manager_llm=config.get('manager_llm', 'gpt-4o'),
-                memory=memory
-            )
-        else:
-            agents = PraisonAIAgents(
-                agents=list(agents.values()),
-                tasks=tasks,
-                verbose=2,
-                memory=memory
-            )
 
-        self.logger.debug("Final Configuration:")
-        self.logger.debug(f"Agents: {agents.agents}")
-        self.logger.debug(f"Tasks: {agents.tasks}")
+        def build(topic, fields=None, quiet=False):
+            values = dict(fields or {}, topic=topic)
+            agents = {}
+            tasks = []
+            tasks_dict = {}
+
+            # Create agents from config
+            for role, details in config['roles'].items():
+                role_filled = details['role'].format(**values)
+                agent = templates[role].spawn(
+                    name=role_filled,
+                    role=role_filled,
+                    goal=details['goal'].format(**values),
+                    backstory=details['backstory'].format(**values),
+                    **({'verbose': False} if quiet else {})
+                )
+                agents[role] = agent
+                self.logger.debug(f"Created agent {role_filled} with tools: {agent.tools}")
+
+                # Create tasks for the agent
+                for task_name, task_details in details.get('tasks', {}).items():
+                    description_filled = task_details['description'].format(**values)
+                    expected_output_filled = task_details['expected_output'].format(**values)
+
+                    task = PraisonTask(
+                        description=description_filled,
+                        expected_output=expected_output_filled,
+                        agent=agent,
+                        tools=tools_list,  # Pass the same tools list to the task
+                        async_execution=task_details.get('async_execution', False),
+                        context=[],
+                        config=task_details.get('config', {}),
+                        output_json=task_details.get('output_json'),
+                        output_pydantic=task_details.get('output_pydantic'),
+                        output_file="" if quiet else task_details.get('output_file', ""),
+                        callback=task_details.get('callback'),
+                        create_directory=task_details.get('create_directory', False)
+                    )
+
+                    self.logger.debug(f"Created task {task_name} with tools: {task.tools}")
+                    
+                    if self.task_callback:
+                        task.callback = self.task_callback
+
+                    tasks.append(task)
+                    tasks_dict[task_name] = task
+
+            # Set up task contexts
+            for role, details in config['roles'].items():
+                for task_name, task_details in details.get('tasks', {}).items():
+                    task = tasks_dict[task_name]
+                    context_tasks = [tasks_dict[ctx] for ctx in task_details.get('context', []) 
+                                if ctx in tasks_dict]
+                    task.context = context_tasks
+
+            # Create the PraisonAI agents
+            if config.get('process') == 'hierarchical':
+                agents = PraisonAIAgents(
+                    agents=list(agents.values()),
+                    tasks=tasks,
+                    verbose=0 if quiet else True,
+                    process="hierarchical",
+                    manager_llm=config.get('manager_llm', 'gpt-4o'),
+                    memory=memory,
+                    run_store=config.get('run_store')
+                )
+            elif config.get('process') == 'parallel':
+                agents = PraisonAIAgents(
+                    agents=list(agents.values()),
+                    tasks=tasks,
+                    verbose=0 if quiet else 2,
+                    process="parallel",
+                    memory=memory,
+                    run_store=config.get('run_store'),
+                    max_concurrency=config.get('max_concurrency'),
+                    agent_concurrency=config.get('agent_concurrency'),
+                    critical_path=config.get('critical_path', False)
+                )
+            else:
+                agents = PraisonAIAgents(
+                    agents=list(agents.values()),
+                    tasks=tasks,
+                    verbose=0 if quiet else 2,
+                    memory=memory,
+                    run_store=config.get('run_store')
+                )
+            return agents
 
-        response = agents.start()
-        self.logger.debug(f"Result: {response}")
-        result = ""
-        
-        if AGENTOPS_AVAILABLE:
-            agentops.end_session("Success")
-            
-        return result
\ No newline at end of file
+        return build
@@ -0,0 +1,135 @@
+import os
+import csv
+import json
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, Tuple
+
+from praisonaiagents import BatchResult
+from praisonaiagents.agent.batch import Checkpoint
+from praisonaiagents.llm.concurrency import get_concurrency_limiter
+
+logger = logging.getLogger(__name__)
+
+
+def read_inputs(path: str, topic_column: str = "topic") -> Iterator[Dict[str, Any]]:
+    """
+    Stream batch inputs from a file, one dict per input.
+
+    .jsonl: one JSON string (the topic) or object per line.
+    .csv / .tsv: one row per input, keyed by the header.
+    Anything else: one topic per non-empty line.
+
+    Every key of an input can be used as a {placeholder} in the playbook.
+    Objects and rows take their topic from topic_column; an input without
+    that column raises ValueError.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, newline="", encoding="utf-8") as f:
+        if extension in (".csv", ".tsv"):
+            for number, row in enumerate(csv.DictReader(f, delimiter="\t" if extension == ".tsv" else ","), 1):
+                yield _with_topic(row, topic_column, number)
+            return
+        number = 0
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            number += 1
+            if extension in (".jsonl", ".ndjson"):
+                value = json.loads(line)
+                yield _with_topic(value, topic_column, number) if isinstance(value, dict) else {"topic": str(value)}
+            else:
+                yield {"topic": line}
+
+
+def _with_topic(row: Dict[str, Any], topic_column: str, number: int) -> Dict[str, Any]:
+    if topic_column not in row:
+        raise ValueError(
+            f"Input {number} has no '{topic_column}' column (columns: {', '.join(map(str, row))}); "
+            "add one or choose the topic column with --topic-column"
+        )
+    if topic_column != "topic":
+        row = dict(row, topic=row[topic_column])
+    return row
+
+
+async def _run_one(build: Callable, index: int, row: Dict[str, Any], concurrency: int, pool: ThreadPoolExecutor) -> BatchResult:
+    started = time.perf_counter()
+    try:
+        agents = build(row["topic"], row, quiet=True)
+        # Let each endpoint start at the batch's concurrency instead of the limiter's default
+        for agent in agents.agents:
+            get_concurrency_limiter(agent.base_url).expect(concurrency)
+        if all(task.async_execution for task in agents.tasks.values()):
+            await agents.astart()
+        else:
+            # Sync tasks would block the event loop the other inputs run on,
+            # so this instance gets a loop of its own on a worker thread
+            await asyncio.get_running_loop().run_in_executor(pool, asyncio.run, agents.astart())
+    except Exception as e:
+        logger.error(f"Input {index} failed: {e}")
+        return BatchResult(index=index, prompt=row, status="error", error=str(e), elapsed=time.perf_counter() - started)
+
+    tasks = list(agents.tasks.values())
+    final = next((task.result for task in reversed(tasks) if task.result), None)
+    unfinished = [task.name or str(task.id) for task in tasks if task.status != "completed"]
+    return BatchResult(
+        index=index,
+        prompt=row,
+        output=final.raw if final else None,
+        status="error" if unfinished else (final.status if final else "completed"),
+        error=f"Tasks not completed: {', '.join(unfinished)}" if unfinished else None,
+        elapsed=time.perf_counter() - started
+    )
+
+
+async def arun_batch(build: Callable, inputs: Iterable[Dict[str, Any]], out: str, concurrency: int = 16) -> Dict[str, Any]:
+    """
+    Run build(topic, row, quiet=True).astart() for every input, at most
+    `concurrency` at once, appending a BatchResult line to out as each
+    finishes. Inputs already completed in out (same position and content)
+    are skipped, so an interrupted batch resumes where it stopped; failed
+    inputs are retried.
+    """
+    checkpoint = Checkpoint(out)
+    summary = {"completed": 0, "failed": 0, "resumed": 0}
+    started = time.perf_counter()
+    rows: Iterator[Tuple[int, Dict[str, Any]]] = enumerate(inputs)
+    running = set()
+    exhausted = False
+    pool = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="praison-batch")
+    try:
+        while True:
+            while not exhausted and len(running) < max(1, concurrency):
+                try:
+                    index, row = next(rows)
+                except StopIteration:
+                    exhausted = True
+                    break
+                if checkpoint.get(index, row):
+                    summary["resumed"] += 1
+                    continue
+                running.add(asyncio.ensure_future(_run_one(build, index, row, concurrency, pool)))
+            if not running:
+                break
+            done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                checkpoint.record(result)
+                summary["failed" if result.status == "error" else "completed"] += 1
+                logger.info(f"Input {result.index} {result.status} in {result.elapsed:.1f}s")
+    finally:
+        for task in running:
+            task.cancel()
+        pool.shutdown(wait=False)
+        checkpoint.close()
+    summary["elapsed"] = time.perf_counter() - started
+    return summary
+
+
+def run_batch(build: Callable, inputs: Iterable[Dict[str, Any]], out: str, concurrency: int = 16) -> Dict[str, Any]:
+    """Synchronous version of arun_batch."""
+    return asyncio.run(arun_batch(build, inputs, out, concurrency))
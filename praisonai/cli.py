@@ -252,6 +252,18 @@ class PraisonAI:
             print(f"File {self.agent_file} created successfully")
             return f"File {self.agent_file} created successfully"
 
+        if args.inputs:
+            agents_generator = AgentsGenerator(
+                self.agent_file,
+                self.framework,
+                self.config_list,
+                agent_yaml=self.agent_yaml,
+                tools=self.tools
+            )
+            result = agents_generator.generate_batch(args.inputs, args.out, args.concurrency, args.topic_column)
+            print(result)
+            return result
+
         if args.ui:
             if args.ui == "gradio":
                 self.create_gradio_interface()
@@ -299,6 +311,10 @@ class PraisonAI:
         parser.add_argument("--realtime", action="store_true", help="Start the realtime voice interaction interface")
         parser.add_argument("--call", action="store_true", help="Start the PraisonAI Call server")
         parser.add_argument("--public", action="store_true", help="Use ngrok to expose the server publicly (only with --call)")
+        parser.add_argument("--inputs", type=str, help="Run the playbook once per input from a .jsonl, .csv, .tsv or text file (batch mode)")
+        parser.add_argument("--concurrency", type=int, default=16, help="Playbook instances to run at once in batch mode")
+        parser.add_argument("--out", type=str, default="results.jsonl", help="JSONL file for batch results; a rerun resumes from it")
+        parser.add_argument("--topic-column", type=str, default="topic", help="Column (or JSON key) holding each batch input's topic")
         args, unknown_args = parser.parse_known_args()
 
         if unknown_args and unknown_args[0] == '-b' and unknown_args[1] == 'api:app':
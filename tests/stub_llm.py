@@ -0,0 +1,137 @@
+"""In-process stand-in for the OpenAI chat completions API, for unit tests."""
+import json
+import time
+import asyncio
+from contextlib import contextmanager
+from unittest import mock
+
+from openai.types.chat import ChatCompletion, ChatCompletionChunk, ParsedChatCompletion
+
+from praisonaiagents.main import client_manager
+
+
+def _completion(model, content, tool_calls):
+    message = {"role": "assistant", "content": content}
+    if tool_calls:
+        message["tool_calls"] = [
+            {"id": f"call_{i}", "type": "function", "function": {"name": name, "arguments": json.dumps(args)}}
+            for i, (name, args) in enumerate(tool_calls)
+        ]
+    return ChatCompletion.construct(
+        id="stub", object="chat.completion", created=1, model=model,
+        choices=[{"index": 0, "finish_reason": "tool_calls" if tool_calls else "stop", "message": message}],
+        usage={"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+    )
+
+
+def _parsed(model, content, response_format):
+    message = {"role": "assistant", "content": content, "parsed": response_format.model_validate_json(content)}
+    return ParsedChatCompletion.construct(
+        id="stub", object="chat.completion", created=1, model=model,
+        choices=[{"index": 0, "finish_reason": "stop", "message": message}],
+        usage={"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+    )
+
+
+def _chunks(model, content, tool_calls):
+    def chunk(delta, finish_reason=None):
+        return ChatCompletionChunk.construct(
+            id="stub", object="chat.completion.chunk", created=1, model=model,
+            choices=[{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+        )
+    for i in range(0, len(content or ""), 4):
+        yield chunk({"content": content[i:i + 4]})
+    for i, (name, args) in enumerate(tool_calls):
+        # Names and arguments arrive in fragments, as some providers send them
+        arguments = json.dumps(args)
+        yield chunk({"tool_calls": [{"index": i, "id": f"call_{i}", "type": "function", "function": {"name": name[:2]}}]})
+        yield chunk({"tool_calls": [{"index": i, "function": {"name": name[2:], "arguments": arguments[:3]}}]})
+        yield chunk({"tool_calls": [{"index": i, "function": {"arguments": arguments[3:]}}]})
+    yield chunk({}, "tool_calls" if tool_calls else "stop")
+
+
+class StubLLM:
+    """
+    Answers every request with reply(request) -> dict, where the dict has
+    'content', optional 'tool_calls' [(name, args)], and optional 'delay'
+    seconds (slept on the sync path, awaited on the async path).
+    beta.chat.completions.parse requests are answered the same way, with
+    the content parsed into their response_format. Requests are recorded
+    in .requests.
+    """
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.requests = []
+        self.beta = self
+        self.chat = self
+        self.completions = self
+
+    def _answer(self, kwargs):
+        # Snapshot the messages: callers keep appending to the same list
+        kwargs = dict(kwargs, messages=list(kwargs.get("messages", [])))
+        self.requests.append(kwargs)
+        return self.reply(kwargs)
+
+    def create(self, **kwargs):
+        answer = self._answer(kwargs)
+        if answer.get("delay"):
+            time.sleep(answer["delay"])
+        return self._build(kwargs, answer)
+
+    def parse(self, **kwargs):
+        answer = self._answer(kwargs)
+        return _parsed(kwargs["model"], answer.get("content"), kwargs["response_format"])
+
+    def _build(self, kwargs, answer):
+        content, tool_calls = answer.get("content"), answer.get("tool_calls") or []
+        if kwargs.get("stream"):
+            return _chunks(kwargs["model"], content, tool_calls)
+        return _completion(kwargs["model"], content, tool_calls)
+
+
+class AsyncStubLLM:
+    def __init__(self, stub):
+        self.stub = stub
+        self.beta = self
+        self.chat = self
+        self.completions = self
+
+    async def parse(self, **kwargs):
+        return self.stub.parse(**kwargs)
+
+    async def create(self, **kwargs):
+        answer = self.stub._answer(kwargs)
+        if answer.get("delay"):
+            await asyncio.sleep(answer["delay"])
+        result = self.stub._build(kwargs, answer)
+        if kwargs.get("stream"):
+            return _AsyncChunks(result)
+        return result
+
+
+class _AsyncChunks:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self.chunks)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def close(self):
+        pass
+
+
+@contextmanager
+def stub_llm(reply):
+    """Route every pooled client to a StubLLM answering with reply(request)."""
+    stub = StubLLM(reply)
+    async_stub = AsyncStubLLM(stub)
+    with mock.patch.object(client_manager, "get_client", lambda *a, **k: stub), \
+            mock.patch.object(client_manager, "get_async_client", lambda *a, **k: async_stub):
+        yield stub
@@ -0,0 +1,124 @@
+import json
+import unittest
+
+from praisonaiagents import Agent
+
+from .stub_llm import stub_llm
+
+
+def get_weather(city: str) -> str:
+    """Weather for a city."""
+    return f"sunny in {city}"
+
+
+def has_tool_result(request):
+    return any(message.get("role") == "tool" for message in request["messages"])
+
+
+class TestAgentStream(unittest.TestCase):
+    def test_one_start_event_per_tool_call(self):
+        def reply(request):
+            if has_tool_result(request):
+                return {"content": "It is sunny."}
+            return {"tool_calls": [("get_weather", {"city": "Paris"}), ("get_weather", {"city": "Rome"})]}
+
+        agent = Agent(name="A", role="r", goal="g", backstory="b", tools=[get_weather], verbose=False)
+        with stub_llm(reply):
+            events = list(agent.stream("weather?"))
+        starts = [event for event in events if event.type == "tool_call_start"]
+        self.assertEqual([event.tool_name for event in starts], ["get_weather", "get_weather"])
+        self.assertEqual([event.tool_call_id for event in starts], ["call_0", "call_1"])
+        results = [event.result for event in events if event.type == "tool_result"]
+        self.assertEqual(results, ["sunny in Paris", "sunny in Rome"])
+        self.assertEqual(events[-1].type, "final")
+        self.assertEqual(events[-1].content, "It is sunny.")
+
+    def test_routed_tool_calls_keep_the_response_text(self):
+        def reply(request):
+            if request["model"] == "router":
+                if has_tool_result(request):
+                    return {"content": "Paris is sunny."}
+                return {"content": "Checking the weather.", "tool_calls": [("get_weather", {"city": "Paris"})]}
+            return {"content": ""}
+
+        agent = Agent(name="A", role="r", goal="g", backstory="b", tools=[get_weather], llm="main", function_calling_llm="router", verbose=False)
+        with stub_llm(reply) as llm:
+            events = list(agent.stream("weather?"))
+        self.assertEqual(sum(event.type == "tool_call_start" for event in events), 1)
+        self.assertEqual(events[-1].content, "Paris is sunny.")
+        self.assertEqual(agent.chat_history[-1], {"role": "assistant", "content": "Paris is sunny."})
+        tool_round = llm.requests[1]["messages"]
+        assistant = next(message for message in tool_round if message.get("tool_calls"))
+        self.assertEqual(assistant["content"], "Checking the weather.")
+
+    def test_unparseable_reflection_is_retried_like_chat(self):
+        def replies():
+            reflections = iter(["not json", '{"reflection": "fine", "satisfactory": "yes"}'])
+
+            def reply(request):
+                if "response_format" in request:
+                    return {"content": next(reflections)}
+                return {"content": "answer"}
+            return reply
+
+        def make_agent():
+            return Agent(name="A", role="r", goal="g", backstory="b", verbose=False, self_reflect=True, min_reflect=1, max_reflect=3)
+
+        with stub_llm(replies()):
+            events = list(make_agent().stream("question"))
+        with stub_llm(replies()):
+            chat_answer = make_agent().chat("question")
+        errors = [event for event in events if event.type == "error"]
+        self.assertEqual(len(errors), 1)
+        self.assertIn("self-reflection", errors[0].content)
+        self.assertEqual([event.satisfactory for event in events if event.type == "reflection"], ["yes"])
+        self.assertEqual((events[-1].type, events[-1].content, events[-1].status), ("final", "answer", "completed"))
+        self.assertEqual(chat_answer, "answer")
+
+    def test_reflection_gives_up_after_max_reflect_failures(self):
+        def reply(request):
+            return {"content": "not json" if "response_format" in request else "answer"}
+
+        agent = Agent(name="A", role="r", goal="g", backstory="b", verbose=False, self_reflect=True, max_reflect=2)
+        with stub_llm(reply):
+            events = list(agent.stream("question"))
+        self.assertEqual([event.type for event in events].count("error"), 2)
+        self.assertEqual(events[-1].content, "answer")
+
+
+class TestCollectStream(unittest.TestCase):
+    def make_agent(self):
+        return Agent(name="A", role="r", goal="g", backstory="b", tools=[get_weather], verbose=False, self_reflect=False, headless=True)
+
+    def test_completion_is_rebuilt_from_fragmented_deltas(self):
+        reply = {"content": "Let me check the weather.", "tool_calls": [("get_weather", {"city": "Paris"}), ("get_weather", {"city": "Rome"})]}
+        agent = self.make_agent()
+        with stub_llm(lambda request: reply) as llm:
+            response = agent._create_completion(messages=[{"role": "user", "content": "weather?"}], tools=agent.tools, stream=True)
+        self.assertEqual(len(llm.requests), 1)
+        self.assertTrue(llm.requests[0]["stream"])
+        choice = response.choices[0]
+        self.assertEqual(choice.finish_reason, "tool_calls")
+        self.assertEqual(choice.message.content, "Let me check the weather.")
+        self.assertEqual(
+            [(call.id, call.function.name, json.loads(call.function.arguments)) for call in choice.message.tool_calls],
+            [("call_0", "get_weather", {"city": "Paris"}), ("call_1", "get_weather", {"city": "Rome"})]
+        )
+
+    def test_streamed_chat_makes_no_second_request(self):
+        def reply(request):
+            if has_tool_result(request):
+                return {"content": "It is sunny in Paris."}
+            return {"tool_calls": [("get_weather", {"city": "Paris"})]}
+
+        agent = self.make_agent()
+        with stub_llm(reply) as llm:
+            self.assertEqual(agent.chat("weather?"), "It is sunny in Paris.")
+        # One streamed request for the tool round and one for the answer
+        self.assertEqual([request.get("stream") for request in llm.requests], [True, True])
+        tool_message = llm.requests[1]["messages"][-1]
+        self.assertEqual((tool_message["tool_call_id"], json.loads(tool_message["content"])), ("call_0", "sunny in Paris"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import json
+import asyncio
+import tempfile
+import threading
+import unittest
+
+from praisonaiagents import Agent, PraisonAIAgents, Task
+
+from praisonai.batch import arun_batch, read_inputs
+
+from .stub_llm import stub_llm
+
+
+def write(directory, name, text):
+    path = os.path.join(directory, name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return path
+
+
+class TestReadInputs(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_formats(self):
+        jsonl = write(self.directory.name, "in.jsonl", '"plain"\n{"topic": "a", "n": 1}\n')
+        self.assertEqual(list(read_inputs(jsonl)), [{"topic": "plain"}, {"topic": "a", "n": 1}])
+        text = write(self.directory.name, "in.txt", "one\n\ntwo\n")
+        self.assertEqual(list(read_inputs(text)), [{"topic": "one"}, {"topic": "two"}])
+
+    def test_rows_need_the_topic_column(self):
+        path = write(self.directory.name, "in.csv", "name,city\nAnn,Paris\n")
+        with self.assertRaisesRegex(ValueError, "no 'topic' column"):
+            list(read_inputs(path))
+        self.assertEqual(list(read_inputs(path, topic_column="city")), [{"name": "Ann", "city": "Paris", "topic": "Paris"}])
+
+
+class TestRunBatch(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.out = os.path.join(self.directory.name, "out.jsonl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_tasks_keep_their_execution_mode(self):
+        threads = set()
+
+        def build(topic, row, quiet=False):
+            agent = Agent(name="A", role="r", goal="g", backstory="b", verbose=False, self_reflect=False)
+            task = Task(description=f"About {topic}", expected_output="x", agent=agent, async_execution=False)
+            return PraisonAIAgents(agents=[agent], tasks=[task], verbose=0)
+
+        def reply(request):
+            threads.add(threading.current_thread().name)
+            return {"content": "done", "delay": 0.05}
+
+        with stub_llm(reply) as llm:
+            summary = asyncio.run(arun_batch(build, [{"topic": "a"}, {"topic": "b"}], self.out, concurrency=2))
+        self.assertEqual(summary["completed"], 2)
+        # Sync tasks ran on worker threads rather than blocking the batch's loop
+        self.assertEqual(len(llm.requests), 2)
+        self.assertTrue(all(name.startswith("praison-batch") for name in threads))
+        with open(self.out, encoding="utf-8") as f:
+            self.assertEqual(sorted(json.loads(line)["status"] for line in f), ["completed", "completed"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import time
+import asyncio
+import threading
+import unittest
+
+from praisonaiagents import Agent
+from praisonaiagents.agent.budget import ExecutionBudget, BudgetExceeded, map_with_deadline
+
+from .stub_llm import stub_llm
+
+# Set by each test's cleanup so abandoned tool threads can exit
+release = threading.Event()
+
+
+def hung_tool(query: str) -> str:
+    """A tool that does not return until the test releases it."""
+    release.wait(10)
+    return "too late"
+
+
+def quick_tool(query: str) -> str:
+    """A tool that answers at once."""
+    return f"found {query}"
+
+
+def tool_threads():
+    # map_with_deadline names its threads <prefix>-<n>
+    return [thread for thread in threading.enumerate() if "-tool-" in thread.name and thread.is_alive()]
+
+
+def release_hung_tools():
+    release.set()
+    for thread in tool_threads():
+        thread.join(1)
+
+
+class TestExecutionBudget(unittest.TestCase):
+    def test_iterations_beyond_max_iter_raise(self):
+        budget = ExecutionBudget(max_iter=2)
+        budget.next_iteration()
+        budget.next_iteration()
+        with self.assertRaises(BudgetExceeded) as caught:
+            budget.next_iteration()
+        self.assertEqual((caught.exception.reason, budget.status()), ("max_iter", "max_iter"))
+
+    def test_deadline_expires(self):
+        budget = ExecutionBudget(max_execution_time=0.05)
+        self.assertEqual(budget.status(), "completed")
+        time.sleep(0.06)
+        self.assertEqual((budget.remaining(), budget.status()), (0.0, "timeout"))
+        with self.assertRaises(BudgetExceeded):
+            budget.check()
+
+
+class TestMapWithDeadline(unittest.TestCase):
+    def setUp(self):
+        release.clear()
+        self.addCleanup(release_hung_tools)
+
+    def test_unfinished_items_time_out_and_their_threads_are_abandoned(self):
+        started = time.perf_counter()
+        results = map_with_deadline(lambda item: hung_tool(item) if item == "hang" else item.upper(), ["a", "hang", "b"], workers=3, timeout=0.2, thread_name_prefix="t-tool")
+        elapsed = time.perf_counter() - started
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual([results[0], results[2]], ["A", "B"])
+        self.assertIsInstance(results[1], TimeoutError)
+        hung = tool_threads()
+        self.assertEqual(len(hung), 1)
+        self.assertTrue(hung[0].daemon)
+
+    def test_errors_are_raised_in_the_caller(self):
+        def fail(item):
+            raise ValueError(item)
+        with self.assertRaisesRegex(ValueError, "x"):
+            map_with_deadline(fail, ["x", "y"], workers=2, timeout=1)
+
+
+class TestAgentBudget(unittest.TestCase):
+    def setUp(self):
+        release.clear()
+        self.addCleanup(release_hung_tools)
+
+    def make_agent(self, **kwargs):
+        kwargs.setdefault("self_reflect", False)
+        return Agent(name="A", role="r", goal="g", backstory="b", verbose=False, headless=True, **kwargs)
+
+    def test_max_iter_returns_the_response_before_reflection(self):
+        agent = self.make_agent(self_reflect=True, max_iter=1)
+        with stub_llm(lambda request: {"content": "draft answer"}) as llm:
+            self.assertEqual(agent.chat("question"), "draft answer")
+        self.assertEqual(len(llm.requests), 1)
+        self.assertEqual(agent.last_run_status, "max_iter")
+        self.assertEqual([message["content"] for message in agent.chat_history], ["question", "draft answer"])
+
+    def test_max_execution_time_abandons_a_hung_tool(self):
+        agent = self.make_agent(tools=[hung_tool], max_execution_time=0.3)
+
+        def reply(request):
+            return {"tool_calls": [("hung_tool", {"query": "q"})]}
+
+        with stub_llm(reply) as llm:
+            started = time.perf_counter()
+            agent.chat("look it up")
+            elapsed = time.perf_counter() - started
+        self.assertLess(elapsed, 2.0)
+        self.assertEqual(agent.last_run_status, "timeout")
+        # The tool round ran out of time before the follow-up request was sent
+        self.assertEqual(len(llm.requests), 1)
+        self.assertEqual(len(tool_threads()), 1)
+
+    def test_achat_returns_the_finished_tool_results_on_timeout(self):
+        agent = self.make_agent(max_execution_time=0.3)
+
+        def reply(request):
+            return {"tool_calls": [("quick_tool", {"query": "q"}), ("hung_tool", {"query": "q"})]}
+
+        with stub_llm(reply) as llm:
+            started = time.perf_counter()
+            result = asyncio.run(agent.achat("look it up", tools=[quick_tool, hung_tool]))
+            elapsed = time.perf_counter() - started
+        self.assertLess(elapsed, 2.0)
+        self.assertEqual(result, "found q")
+        self.assertEqual(agent.last_run_status, "timeout")
+        self.assertEqual(len(llm.requests), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+import os
+import json
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from praisonaiagents import Agent
+from praisonaiagents.agent.batch import Checkpoint, _parse_batch_line
+from praisonaiagents.main import BatchResult, client_manager
+
+from .stub_llm import stub_llm
+
+
+def make_agent():
+    return Agent(name="A", role="r", goal="g", backstory="b", verbose=False, self_reflect=False)
+
+
+def prompt_of(request):
+    return request["messages"][-1]["content"]
+
+
+class TestChatMany(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "run.jsonl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_ordered_results_keep_input_order(self):
+        delays = {"p0": 0.06, "p1": 0.03, "p2": 0.0}
+
+        def reply(request):
+            return {"content": f"re {prompt_of(request)}", "delay": delays[prompt_of(request)]}
+
+        with stub_llm(reply):
+            unordered = [result.index for result in make_agent().chat_many(list(delays))]
+            ordered = list(make_agent().chat_many(list(delays), ordered=True))
+        self.assertEqual(unordered, [2, 1, 0])
+        self.assertEqual([result.index for result in ordered], [0, 1, 2])
+        self.assertEqual([result.output for result in ordered], ["re p0", "re p1", "re p2"])
+
+    def test_checkpoint_resumes_and_retries_failures(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"index": 0, "prompt": "a", "output": "old a", "status": "completed"}) + "\n")
+            f.write(json.dumps({"index": 1, "prompt": "b", "status": "error", "error": "boom"}) + "\n")
+            # Crash mid-write
+            f.write('{"index": 2, "prompt": "c", "outp')
+
+        with stub_llm(lambda request: {"content": f"new {prompt_of(request)}"}) as llm:
+            results = list(make_agent().chat_many(["a", "b", "c"], ordered=True, checkpoint=self.path))
+        self.assertEqual(sorted(prompt_of(request) for request in llm.requests), ["b", "c"])
+        self.assertEqual([result.output for result in results], ["old a", "new b", "new c"])
+
+        with stub_llm(lambda request: {"content": "again"}) as llm:
+            rerun = list(make_agent().chat_many(["a", "b", "c"], ordered=True, checkpoint=self.path))
+        self.assertEqual(llm.requests, [])
+        self.assertEqual([result.output for result in rerun], ["old a", "new b", "new c"])
+
+    def test_failed_prompts_are_recorded_as_errors_and_retried(self):
+        def failing(request):
+            if prompt_of(request) == "b":
+                raise ValueError("bad request")
+            return {"content": "ok"}
+
+        with stub_llm(failing):
+            results = list(make_agent().chat_many(["a", "b"], ordered=True, checkpoint=self.path))
+        self.assertEqual([result.status for result in results], ["completed", "error"])
+        self.assertIn("bad request", results[1].error)
+
+        with stub_llm(lambda request: {"content": "fixed"}) as llm:
+            results = list(make_agent().chat_many(["a", "b"], ordered=True, checkpoint=self.path))
+        self.assertEqual([prompt_of(request) for request in llm.requests], ["b"])
+        self.assertEqual([result.output for result in results], ["ok", "fixed"])
+
+    def test_changed_prompt_is_not_restored(self):
+        checkpoint = Checkpoint(self.path)
+        checkpoint._write({"index": 0, "prompt": "a", "output": "old", "status": "completed"})
+        checkpoint.close()
+        checkpoint = Checkpoint(self.path)
+        self.assertIsNone(checkpoint.get(0, "other"))
+        self.assertEqual(checkpoint.get(0, "a").output, "old")
+
+
+class FakeBatchClient:
+    """The files and batches endpoints of the async OpenAI client, finishing after one poll."""
+
+    def __init__(self, output_lines, error_lines=()):
+        self.files = SimpleNamespace(create=self.create_file, content=self.file_content)
+        self.batches = SimpleNamespace(create=self.create_batch, retrieve=self.retrieve)
+        self.contents = {"out": "\n".join(output_lines), "err": "\n".join(error_lines)}
+        self.uploaded = None
+        self.created = 0
+        self.polls = 0
+
+    async def create_file(self, file, purpose):
+        self.uploaded = [json.loads(line) for line in file[1].decode("utf-8").splitlines()]
+        return SimpleNamespace(id="file-in")
+
+    async def create_batch(self, input_file_id, endpoint, completion_window):
+        self.created += 1
+        return SimpleNamespace(id="batch-1")
+
+    async def retrieve(self, batch_id):
+        self.polls += 1
+        status = "completed" if self.polls > 1 else "in_progress"
+        return SimpleNamespace(id=batch_id, status=status, output_file_id="out", error_file_id="err" if self.contents["err"] else None)
+
+    async def file_content(self, file_id):
+        return SimpleNamespace(text=self.contents[file_id])
+
+
+def succeeded(index, content):
+    return json.dumps({"custom_id": f"request-{index}", "response": {"status_code": 200, "body": {"choices": [{"message": {"content": content}}]}}})
+
+
+def rejected(index):
+    return json.dumps({"custom_id": f"request-{index}", "response": {"status_code": 400, "body": {"error": {"message": "invalid prompt"}}}})
+
+
+def failed(index):
+    return json.dumps({"custom_id": f"request-{index}", "response": None, "error": {"code": "server_error", "message": "server error"}})
+
+
+class TestBatchAPI(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "run.jsonl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_batch(self, client, prompts, **kwargs):
+        with mock.patch.object(client_manager, "get_async_client", lambda *a, **k: client):
+            return list(make_agent().chat_many(prompts, batch_api=True, poll_interval=0, ordered=True, **kwargs))
+
+    def test_parse_batch_line(self):
+        self.assertEqual(_parse_batch_line(succeeded(0, "hi")), ("request-0", "hi", None))
+        self.assertEqual(_parse_batch_line(rejected(1)), ("request-1", None, "invalid prompt"))
+        self.assertEqual(_parse_batch_line(failed(2)), ("request-2", None, "server error"))
+
+    def test_results_come_from_output_and_error_files(self):
+        client = FakeBatchClient([succeeded(0, "hi"), rejected(1)], [failed(2)])
+        results = self.run_batch(client, ["a", "b", "c", "d"])
+        self.assertEqual([request["custom_id"] for request in client.uploaded], ["request-0", "request-1", "request-2", "request-3"])
+        self.assertEqual(client.polls, 2)
+        self.assertEqual([result.output for result in results], ["hi", None, None, None])
+        self.assertEqual([result.status for result in results], ["completed", "error", "error", "error"])
+        self.assertEqual([result.error for result in results[1:3]], ["invalid prompt", "server error"])
+        self.assertIn("completed", results[3].error)
+
+    def test_recorded_batch_is_resumed_not_resubmitted(self):
+        checkpoint = Checkpoint(self.path)
+        checkpoint.record(BatchResult(index=0, prompt="a", output="done"))
+        checkpoint.record_batch("batch-1", [1])
+        checkpoint.close()
+
+        client = FakeBatchClient([succeeded(1, "resumed")])
+        results = self.run_batch(client, ["a", "b"], checkpoint=self.path)
+        self.assertEqual(client.created, 0)
+        self.assertIsNone(client.uploaded)
+        self.assertEqual([result.output for result in results], ["done", "resumed"])
+        self.assertIsNone(Checkpoint(self.path).batch_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
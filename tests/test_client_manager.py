@@ -0,0 +1,43 @@
+import os
+import asyncio
+import unittest
+from unittest import mock
+
+from praisonaiagents import main
+from praisonaiagents.main import ClientManager
+
+
+class TestClientManager(unittest.TestCase):
+    def test_clients_are_shared_per_endpoint(self):
+        manager = ClientManager()
+        with mock.patch.dict(os.environ, {"OPENAI_API_KEY": "test"}):
+            first = manager.get_client()
+            self.assertIs(first, manager.get_client())
+            other = manager.get_client("http://localhost:11434/v1", "other")
+        self.assertIsNot(first, other)
+        self.assertEqual(str(other.base_url), "http://localhost:11434/v1/")
+        manager.close()
+
+    def test_async_clients_are_kept_per_event_loop(self):
+        manager = ClientManager()
+
+        async def borrow():
+            return manager.get_async_client(api_key="test"), manager.get_async_client(api_key="test")
+
+        first, again = asyncio.run(borrow())
+        self.assertIs(first, again)
+        self.assertIsNot(first, asyncio.run(borrow())[0])
+
+    def test_pool_limits_follow_settings(self):
+        manager = ClientManager(max_connections=7, max_keepalive_connections=3)
+        limits = manager._limits()
+        self.assertEqual(limits.max_connections, 7)
+        self.assertEqual(limits.max_keepalive_connections, 3)
+
+    def test_default_client_is_created_on_first_access(self):
+        with mock.patch.dict(os.environ, {"OPENAI_API_KEY": "test"}):
+            self.assertIs(main.client, main.client_manager.get_client())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import threading
+import unittest
+from unittest import mock
+
+import openai
+
+from praisonaiagents import Agent
+from praisonaiagents.llm.concurrency import AdaptiveLimiter, get_concurrency_limiter
+
+from .stub_llm import stub_llm
+
+
+def rate_limited(retry_after_ms="10"):
+    response = mock.Mock(status_code=429, headers={"retry-after-ms": retry_after_ms})
+    return openai.RateLimitError("slow down", response=response, body=None)
+
+
+class TestAdaptiveLimiter(unittest.TestCase):
+    def test_success_grows_and_overload_halves_once(self):
+        limiter = AdaptiveLimiter(initial_limit=4)
+        for _ in range(4):
+            limiter.acquire()
+            limiter.release("success")
+        self.assertAlmostEqual(limiter.limit, 5.0, delta=0.1)
+        for _ in range(3):
+            limiter.acquire()
+        for _ in range(3):
+            limiter.release("overload", retry_after=0.01)
+        self.assertAlmostEqual(limiter.limit, 2.5, delta=0.1)
+        self.assertEqual(limiter.stats()["throttled"], 3)
+
+    def test_requests_over_the_limit_queue_until_a_release(self):
+        limiter = AdaptiveLimiter(initial_limit=1)
+        limiter.acquire()
+        acquired = threading.Event()
+        waiter = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()))
+        waiter.start()
+        self.assertFalse(acquired.wait(0.05))
+        self.assertEqual(limiter.queue_depth(), 1)
+        limiter.release("success")
+        self.assertTrue(acquired.wait(1))
+        waiter.join()
+        self.assertEqual(limiter.stats()["in_flight"], 1)
+
+    def test_acquire_times_out_and_leaves_the_queue(self):
+        limiter = AdaptiveLimiter(initial_limit=1)
+        limiter.acquire()
+        with self.assertRaises(TimeoutError):
+            limiter.acquire(timeout=0.01)
+        self.assertEqual(limiter.queue_depth(), 0)
+
+    def test_call_retries_overload_and_counts_retries(self):
+        limiter = AdaptiveLimiter(base_backoff=0.001)
+        attempts = []
+
+        def request():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise rate_limited()
+            return "ok"
+
+        self.assertEqual(limiter.call(request), "ok")
+        self.assertEqual(limiter.stats()["retries"], 2)
+        self.assertEqual(limiter.stats()["in_flight"], 0)
+
+    def test_other_errors_are_not_retried(self):
+        limiter = AdaptiveLimiter()
+        with self.assertRaises(ValueError):
+            limiter.call(mock.Mock(side_effect=ValueError("bad")))
+        self.assertEqual(limiter.stats()["retries"], 0)
+
+    def test_expect_raises_the_limit_until_throttled(self):
+        limiter = AdaptiveLimiter(initial_limit=8, max_limit=32)
+        limiter.expect(16)
+        self.assertEqual(limiter.stats()["limit"], 16)
+        limiter.expect(64)
+        self.assertEqual(limiter.stats()["limit"], 32)
+        limiter.acquire()
+        limiter.release("overload", retry_after=0.01)
+        limiter.expect(64)
+        self.assertEqual(limiter.stats()["limit"], 16)
+
+
+class TestSharedLimiter(unittest.TestCase):
+    def test_unconfigured_endpoints_are_not_capped(self):
+        limiter = get_concurrency_limiter("http://uncapped.test/v1")
+        running, peak, lock = [0], [0], threading.Lock()
+        release = threading.Event()
+
+        def request():
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            release.wait(1)
+            with lock:
+                running[0] -= 1
+
+        threads = [threading.Thread(target=limiter.call, args=(request,)) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        while peak[0] < 16 and any(thread.is_alive() for thread in threads):
+            threading.Event().wait(0.005)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(peak[0], 16)
+        self.assertIsNone(limiter.stats()["limit"])
+
+    def test_clients_keep_their_own_retries_until_a_limit_is_configured(self):
+        base_url = "http://retries.test/v1"
+        retries = []
+
+        def get_client(base_url=None, api_key=None, max_retries=None):
+            retries.append(max_retries)
+            return stub
+
+        agent = Agent(name="A", role="r", goal="g", backstory="b", verbose=False, self_reflect=False, base_url=base_url)
+        with stub_llm(lambda request: {"content": "ok"}) as stub, \
+                mock.patch("praisonaiagents.main.client_manager.get_client", get_client):
+            agent.chat("hi")
+            get_concurrency_limiter(base_url).configure(initial_limit=4)
+            agent.chat("hi")
+        self.assertEqual(retries, [None, 0])
+        self.assertEqual(get_concurrency_limiter(base_url).stats()["limit"], 4)
+
+
+class TestRequestedConcurrency(unittest.TestCase):
+    def test_chat_many_is_not_capped_by_the_initial_limit(self):
+        base_url = "http://chat-many.test/v1"
+        get_concurrency_limiter(base_url).configure(initial_limit=8)
+        agent = Agent(name="A", role="r", goal="g", backstory="b", verbose=False, base_url=base_url)
+        with stub_llm(lambda request: {"content": "ok", "delay": 0.05}):
+            results = list(agent.chat_many([f"p{i}" for i in range(16)], concurrency=16))
+        self.assertEqual(len(results), 16)
+        self.assertGreaterEqual(get_concurrency_limiter(base_url).stats()["limit"], 16)
+
+
+if __name__ == "__main__":
+    unittest.main()
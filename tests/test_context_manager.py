@@ -0,0 +1,80 @@
+import unittest
+
+from praisonaiagents import Agent
+from praisonaiagents.llm.context import ContextManager, count_message_tokens
+
+
+def conversation(turns, words=200):
+    messages = [{"role": "system", "content": "You are helpful."}]
+    for i in range(turns):
+        messages.append({"role": "user", "content": f"question {i} " + "word " * words})
+        messages.append({"role": "assistant", "content": f"answer {i} " + "word " * words})
+    messages.append({"role": "user", "content": "latest question"})
+    return messages
+
+
+class RecordingSummarizer:
+    def __init__(self):
+        self.inputs = []
+
+    def __call__(self, text):
+        self.inputs.append(text)
+        return f"summary {len(self.inputs)}"
+
+
+class TestContextManager(unittest.TestCase):
+    def test_messages_within_budget_are_untouched(self):
+        manager = ContextManager("gpt-4o", max_context_tokens=100000, reserve_tokens=0)
+        messages = conversation(3)
+        self.assertIs(manager.fit(messages), messages)
+
+    def test_over_budget_history_is_summarized_once(self):
+        summarizer = RecordingSummarizer()
+        manager = ContextManager("gpt-4o", max_context_tokens=3000, reserve_tokens=0, pin_turns=2, summarizer=summarizer)
+        fitted = manager.fit(conversation(20))
+        self.assertEqual(len(summarizer.inputs), 1)
+        self.assertLessEqual(count_message_tokens(fitted, "gpt-4o"), manager.budget())
+        self.assertEqual(fitted[0]["content"], "You are helpful.")
+        self.assertIn("summary 1", fitted[1]["content"])
+        self.assertEqual(fitted[-1]["content"], "latest question")
+
+    def test_summarizer_input_is_capped(self):
+        summarizer = RecordingSummarizer()
+        manager = ContextManager("gpt-4o", max_context_tokens=3000, reserve_tokens=0, summarizer=summarizer, summary_input_tokens=500)
+        manager.fit(conversation(200))
+        self.assertLessEqual(len(summarizer.inputs[0]) // 4, 600)
+        self.assertIn("older messages omitted", summarizer.inputs[0])
+
+    def test_summary_output_is_capped(self):
+        manager = ContextManager("gpt-4o", max_context_tokens=3000, reserve_tokens=0, summarizer=lambda text: "long " * 5000, summary_tokens=50)
+        fitted = manager.fit(conversation(20))
+        self.assertLessEqual(count_message_tokens(fitted, "gpt-4o"), manager.budget())
+
+    def test_later_requests_extend_the_cached_summary(self):
+        summarizer = RecordingSummarizer()
+        manager = ContextManager("gpt-4o", max_context_tokens=3000, reserve_tokens=0, pin_turns=2, summarizer=summarizer)
+        messages = conversation(20)
+        manager.fit(messages)
+        manager.fit(messages)
+        self.assertEqual(len(summarizer.inputs), 1)
+        longer = messages[:-1] + [{"role": "user", "content": "q " + "word " * 200}, {"role": "assistant", "content": "a " + "word " * 200}, messages[-1]]
+        manager.fit(longer)
+        self.assertEqual(len(summarizer.inputs), 2)
+        self.assertIn("Summary so far:\nsummary 1", summarizer.inputs[1])
+
+    def test_without_summarizer_oldest_turns_are_dropped(self):
+        manager = ContextManager("gpt-4o", max_context_tokens=3000, reserve_tokens=0, pin_turns=2)
+        messages = conversation(20)
+        fitted = manager.fit(messages)
+        self.assertLessEqual(count_message_tokens(fitted, "gpt-4o"), manager.budget())
+        self.assertEqual(fitted[-3:], messages[-3:])
+        self.assertGreater(manager.turns_dropped, 0)
+
+    def test_agents_summarize_only_when_asked(self):
+        self.assertIsNone(Agent(name="A", role="r", goal="g", backstory="b", verbose=False).context_manager.summarizer)
+        agent = Agent(name="A", role="r", goal="g", backstory="b", verbose=False, summarize_history=True)
+        self.assertIsNotNone(agent.context_manager.summarizer)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+from typing import List
+
+from pydantic import BaseModel
+
+from praisonaiagents import Agent
+from praisonaiagents.llm.json_stream import StreamingJSONParser, StructuredOutputError, parse_json_output
+
+from .stub_llm import stub_llm
+
+
+class Person(BaseModel):
+    name: str
+    age: int
+
+
+class Team(BaseModel):
+    name: str
+    members: List[Person]
+
+
+class TestParseJsonOutput(unittest.TestCase):
+    def test_top_level_array_is_returned_whole(self):
+        text = '[{"name": "Ann", "age": 30}, {"name": "Bo", "age": 4}]'
+        self.assertEqual(parse_json_output(text), [{"name": "Ann", "age": 30}, {"name": "Bo", "age": 4}])
+        self.assertEqual(len(parse_json_output(text, Person)), 2)
+
+    def test_array_items_are_validated(self):
+        with self.assertRaisesRegex(StructuredOutputError, "Item 1 does not match Person"):
+            parse_json_output('[{"name": "Ann", "age": 30}, {"name": "Bo", "age": "old"}]', Person)
+
+    def test_arrays_of_strings_and_empty_arrays(self):
+        self.assertEqual(parse_json_output('["a", "b"]'), ["a", "b"])
+        self.assertEqual(parse_json_output("[]"), [])
+
+    def test_nested_objects(self):
+        text = '{"name": "core", "members": [{"name": "Ann", "age": 30}], "meta": {"tags": ["x", {"y": 1}]}}'
+        value = parse_json_output(text, Team)
+        self.assertEqual(value["members"][0]["name"], "Ann")
+        self.assertEqual(value["meta"], {"tags": ["x", {"y": 1}]})
+
+    def test_prose_and_fences_are_skipped(self):
+        self.assertEqual(parse_json_output('Here you go:\n```json\n{"name": "Ann", "age": 30}\n```\nDone.'), {"name": "Ann", "age": 30})
+        # A citation before the object is not mistaken for an array
+        self.assertEqual(parse_json_output('As noted [1], the answer is {"name": "Ann", "age": 30}'), {"name": "Ann", "age": 30})
+
+    def test_truncated_input(self):
+        with self.assertRaisesRegex(StructuredOutputError, "before its JSON value is complete"):
+            parse_json_output('{"name": "Ann", "age": 3')
+        with self.assertRaisesRegex(StructuredOutputError, "before its JSON value is complete"):
+            parse_json_output('[{"name": "Ann", "age": 30},')
+        with self.assertRaisesRegex(StructuredOutputError, "does not contain"):
+            parse_json_output("no JSON here")
+
+    def test_schema_mismatch_names_the_model(self):
+        with self.assertRaisesRegex(StructuredOutputError, "Person"):
+            parse_json_output('{"name": "Ann"}', Person)
+
+
+class TestStreamingJSONParser(unittest.TestCase):
+    def test_fields_are_checked_as_they_close(self):
+        parser = StreamingJSONParser(Person)
+        self.assertFalse(parser.feed('{"name": "Ann", '))
+        self.assertEqual(parser.fields, {"name": "Ann"})
+        with self.assertRaisesRegex(StructuredOutputError, "Field 'age'"):
+            parser.feed('"age": "old",')
+
+    def test_completes_at_the_closing_brace(self):
+        parser = StreamingJSONParser()
+        for fragment in ['Sure: {"a": {"b"', ': [1, "}"]}', '} trailing', " text"]:
+            if parser.feed(fragment):
+                break
+        self.assertTrue(parser.complete)
+        self.assertEqual(parser.value, {"a": {"b": [1, "}"]}})
+        self.assertEqual(parser.text, '{"a": {"b": [1, "}"]}}')
+
+    def test_array_items_stream_one_at_a_time(self):
+        parser = StreamingJSONParser(Person)
+        self.assertFalse(parser.feed("["))
+        self.assertFalse(parser.feed('{"name": "Ann", "age": 30}, {"name"'))
+        self.assertEqual(parser.items, [{"name": "Ann", "age": 30}])
+        self.assertTrue(parser.feed(': "Bo", "age": 4}]'))
+        self.assertEqual(len(parser.value), 2)
+
+
+class TestAgentStructuredOutput(unittest.TestCase):
+    def test_chat_raises_on_schema_mismatch(self):
+        agent = Agent(name="A", role="r", goal="g", backstory="b", verbose=False)
+        with stub_llm(lambda request: {"content": '{"name": "Ann"}'}):
+            with self.assertRaises(StructuredOutputError):
+                agent.chat("who?", output_pydantic=Person)
+
+    def test_chat_returns_matching_json(self):
+        agent = Agent(name="A", role="r", goal="g", backstory="b", verbose=False)
+        with stub_llm(lambda request: {"content": '{"name": "Ann", "age": 30}'}):
+            self.assertEqual(parse_json_output(agent.chat("who?", output_json=Person)), {"name": "Ann", "age": 30})
+
+
+if __name__ == "__main__":
+    unittest.main()
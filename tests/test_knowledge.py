@@ -0,0 +1,135 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from praisonaiagents.knowledge import Knowledge, TextChunker
+from praisonaiagents.knowledge.chunking import MARKDOWN_SEPARATORS
+from praisonaiagents.main import client_manager
+
+FRUITS = ("apple", "banana", "cherry")
+
+
+class StubEmbedder:
+    """embeddings.create answering with one dimension per fruit named in the text."""
+
+    def __init__(self):
+        self.embeddings = self
+        self.inputs = []
+
+    def create(self, input, model, **kwargs):
+        self.inputs.extend(input)
+        data = [
+            SimpleNamespace(index=i, embedding=[text.count(fruit) + 0.01 for fruit in FRUITS])
+            for i, text in enumerate(input)
+        ]
+        return SimpleNamespace(data=data)
+
+
+def word_chunker(chunk_size, chunk_overlap):
+    chunker = TextChunker(chunk_size, chunk_overlap)
+    # Count words so sizes don't depend on whether tiktoken is installed
+    chunker._count = lambda text: len(text.split())
+    return chunker
+
+
+class TestTextChunker(unittest.TestCase):
+    def test_consecutive_chunks_overlap_at_sentence_boundaries(self):
+        text = " ".join(f"Sentence {i} has five words." for i in range(6))
+        chunks = word_chunker(12, 5).split(text)
+        self.assertEqual(chunks[0], "Sentence 0 has five words. Sentence 1 has five words.")
+        for before, after in zip(chunks, chunks[1:]):
+            self.assertEqual(before.split(". ")[-1], after.split(". ")[0] + ".")
+        self.assertTrue(chunks[-1].endswith("Sentence 5 has five words."))
+        self.assertTrue(all(len(chunk.split()) <= 12 for chunk in chunks))
+
+    def test_words_are_split_when_no_coarser_separator_fits(self):
+        self.assertEqual(word_chunker(4, 1).split("a b c d e f g h i j"), ["a b c d", "d e f g", "g h i j"])
+
+    def test_markdown_breaks_at_headings(self):
+        text = "# Intro\n\nalpha beta gamma delta.\n\n# Usage\n\nepsilon zeta eta theta iota kappa.\n\n## Detail\n\nlambda mu nu xi."
+        chunks = word_chunker(8, 2).split(text, MARKDOWN_SEPARATORS)
+        self.assertEqual([chunk.split("\n")[0] for chunk in chunks], ["# Intro", "# Usage", "## Detail"])
+
+    def test_overlap_must_be_smaller_than_chunk_size(self):
+        with self.assertRaises(ValueError):
+            TextChunker(10, 10)
+
+
+class TestKnowledge(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.docs = os.path.join(self.directory.name, "docs")
+        os.makedirs(self.docs)
+        self.write("a.txt", "apple pie recipe")
+        self.write("b.md", "banana bread recipe")
+        self.embedder = StubEmbedder()
+        patcher = mock.patch.object(client_manager, "get_client", lambda *a, **k: self.embedder)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, content):
+        with open(os.path.join(self.docs, name), "w", encoding="utf-8") as f:
+            f.write(content)
+
+    def knowledge(self, **kwargs):
+        # A fresh instance each time, so only the SQLite file carries state over
+        return Knowledge([self.docs], path=os.path.join(self.directory.name, "index.db"), **kwargs)
+
+    def test_unchanged_files_are_not_embedded_again(self):
+        first = self.knowledge().ingest()
+        self.assertEqual((first.ingested, first.unchanged), (2, 0))
+        self.assertEqual(sorted(self.embedder.inputs), ["apple pie recipe", "banana bread recipe"])
+
+        self.embedder.inputs.clear()
+        second = self.knowledge().ingest()
+        self.assertEqual((second.ingested, second.unchanged), (0, 2))
+        self.assertEqual(self.embedder.inputs, [])
+
+    def test_changed_file_is_the_only_one_reindexed(self):
+        self.knowledge().ingest()
+        self.embedder.inputs.clear()
+        self.write("b.md", "cherry tart recipe")
+        knowledge = self.knowledge()
+        report = knowledge.ingest()
+        self.assertEqual((report.ingested, report.unchanged), (1, 1))
+        self.assertEqual(self.embedder.inputs, ["cherry tart recipe"])
+        self.assertEqual(knowledge.stats()["chunks"], 2)
+        self.assertEqual(knowledge.search("cherry", top_k=1)[0]["content"], "cherry tart recipe")
+
+    def test_deleted_sources_are_pruned(self):
+        self.knowledge().ingest()
+        os.remove(os.path.join(self.docs, "a.txt"))
+        knowledge = self.knowledge()
+        report = knowledge.ingest()
+        self.assertEqual(report.removed, 1)
+        self.assertEqual([hit["content"] for hit in knowledge.search("apple")], ["banana bread recipe"])
+
+    def test_ingesting_extra_sources_does_not_prune(self):
+        knowledge = self.knowledge()
+        knowledge.ingest()
+        other = os.path.join(self.directory.name, "c.txt")
+        with open(other, "w", encoding="utf-8") as f:
+            f.write("cherry jam")
+        report = knowledge.ingest([other])
+        self.assertEqual((report.ingested, report.removed), (1, 0))
+        self.assertEqual(knowledge.stats()["sources"], 3)
+
+    def test_search_ranks_by_similarity_within_max_tokens(self):
+        knowledge = self.knowledge()
+        hits = knowledge.search("banana")
+        self.assertEqual([hit["content"] for hit in hits], ["banana bread recipe", "apple pie recipe"])
+
+        budget = hits[0]["tokens"]
+        limited = knowledge.search("banana", max_tokens=budget)
+        self.assertEqual([hit["content"] for hit in limited], ["banana bread recipe"])
+        self.assertEqual(knowledge.search("banana", max_tokens=0), [])
+        self.assertEqual(len(knowledge.search("banana", top_k=1)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
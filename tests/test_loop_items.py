@@ -0,0 +1,153 @@
+import os
+import json
+import tempfile
+import unittest
+from unittest import mock
+
+from praisonaiagents import Agent, PraisonAIAgents, Task
+from praisonaiagents.process import iter_loop_items, iter_loop_file
+from praisonaiagents.process import loop_items
+
+from .stub_llm import stub_llm
+
+
+class TestIterLoopItems(unittest.TestCase):
+    def items(self, text):
+        found = iter_loop_items(text)
+        return None if found is None else list(found)
+
+    def test_json_arrays(self):
+        self.assertEqual(self.items('["a", "b"]'), ["a", "b"])
+        self.assertEqual(self.items('```json\n[{"city": "Paris"}]\n```'), [{"city": "Paris"}])
+        self.assertEqual(self.items('{"items": [1, 2]}'), [1, 2])
+
+    def test_bullet_and_numbered_lists(self):
+        self.assertEqual(self.items("Cities:\n- Paris\n- Rome"), ["Paris", "Rome"])
+        self.assertEqual(self.items("1. Paris\n2) Rome\n3. Oslo"), ["Paris", "Rome", "Oslo"])
+
+    def test_anything_else_is_left_to_the_loop_manager(self):
+        for text in (
+            "Paris is lovely in spring.\nRome is better in autumn.",
+            "city,country\nParis,France\nRome,Italy",
+            "Paris\nRome\nOslo",
+            "- Paris\nRome is next",
+            "- just one",
+            "/tmp/items.csv",
+            '{"a": [1], "b": [2]}',
+        ):
+            self.assertIsNone(self.items(text), text)
+
+
+class TestIterLoopFile(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def test_csv_with_a_detected_header_gives_dicts(self):
+        path = self.write("cities.csv", "city,population\nParis,2100000\nRome,2800000\n")
+        self.assertEqual(list(iter_loop_file(path)), [
+            {"city": "Paris", "population": "2100000"},
+            {"city": "Rome", "population": "2800000"},
+        ])
+
+    def test_csv_without_a_header_gives_rows(self):
+        path = self.write("cities.csv", "Paris,2100000\nRome,2800000\n")
+        self.assertEqual(list(iter_loop_file(path)), [["Paris", "2100000"], ["Rome", "2800000"]])
+        single = self.write("names.csv", "Paris\nRome\n\nOslo\n")
+        self.assertEqual(list(iter_loop_file(single)), ["Paris", "Rome", "Oslo"])
+
+    def test_configured_header_overrides_detection(self):
+        path = self.write("cities.csv", "city,country\nParis,France\n")
+        self.assertEqual(list(iter_loop_file(path, header=False)), [["city", "country"], ["Paris", "France"]])
+        path = self.write("cities.tsv", "Paris\t2100000\nRome\t2800000\n")
+        self.assertEqual(list(iter_loop_file(path, header=True)), [{"Paris": "Rome", "2100000": "2800000"}])
+
+    def test_quoted_fields_may_span_lines(self):
+        path = self.write("notes.csv", 'name,note\nParis,"two\nlines"\nRome,one\n')
+        self.assertEqual([row["note"] for row in iter_loop_file(path, header=True)], ["two\nlines", "one"])
+
+    def test_json_jsonl_and_text_files(self):
+        self.assertEqual(list(iter_loop_file(self.write("a.json", '{"items": ["x", "y"]}'))), ["x", "y"])
+        self.assertEqual(list(iter_loop_file(self.write("a.jsonl", '{"n": 1}\n\n{"n": 2}\n'))), [{"n": 1}, {"n": 2}])
+        self.assertEqual(list(iter_loop_file(self.write("a.txt", "x\n\ny\n"))), ["x", "y"])
+        with self.assertRaises(ValueError):
+            iter_loop_file(self.write("b.json", '{"n": 1}'))
+        with self.assertRaises(FileNotFoundError):
+            iter_loop_file(os.path.join(self.directory.name, "missing.txt"))
+
+    def test_no_handle_stays_open_between_items(self):
+        path = self.write("cities.csv", "city\nParis\nRome\n")
+        opened = []
+
+        def tracking_open(*args, **kwargs):
+            f = open(*args, **kwargs)
+            opened.append(f)
+            return f
+
+        with mock.patch.object(loop_items, "open", tracking_open, create=True):
+            items = iter_loop_file(path, header=True)
+            self.assertEqual(next(items), {"city": "Paris"})
+            self.assertTrue(opened and all(f.closed for f in opened))
+            self.assertEqual(list(items), [{"city": "Rome"}])
+            self.assertTrue(all(f.closed for f in opened))
+
+
+def make_agent():
+    return Agent(name="A", role="r", goal="g", backstory="b", verbose=False, self_reflect=False)
+
+
+def item_of(request):
+    prompt = request["messages"][-1]["content"]
+    marker = "Current loop item: "
+    return prompt.split(marker, 1)[1].split("\n", 1)[0].strip().rstrip(".") if marker in prompt else None
+
+
+def asks_loop_manager(request):
+    return any("Loop data processor" in str(message.get("content")) for message in request["messages"])
+
+
+class TestWorkflowLoopItems(unittest.TestCase):
+    def run_loop(self, first_output, **loop):
+        agent = make_agent()
+        collect = Task(name="collect", description="List cities", expected_output="list", agent=agent, is_start=True, next_tasks=["each"])
+        each = Task(name="each", description="Describe the city", expected_output="text", agent=agent, task_type="loop", loop_mode="map", **loop)
+        workflow = PraisonAIAgents(agents=[agent], tasks=[collect, each], process="workflow", verbose=0)
+
+        def reply(request):
+            if asks_loop_manager(request):
+                return {"content": json.dumps({"items": ["Lisbon"]})}
+            item = item_of(request)
+            return {"content": first_output if item is None else f"about {item}"}
+
+        with stub_llm(reply) as llm:
+            workflow.start()
+        return json.loads(each.result.raw), llm
+
+    def test_prose_goes_to_the_loop_manager(self):
+        results, llm = self.run_loop("Lisbon is the one city worth visiting.")
+        self.assertEqual(results, ["about Lisbon"])
+        self.assertEqual(sum(asks_loop_manager(request) for request in llm.requests), 1)
+
+    def test_paths_in_model_output_are_not_read(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cities.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("Paris\nRome\n")
+            results, _ = self.run_loop(path)
+            self.assertEqual(results, ["about Lisbon"])
+
+            results, llm = self.run_loop("ignored", loop_input=path)
+        self.assertEqual(results, ["about Paris", "about Rome"])
+        self.assertFalse(any(asks_loop_manager(request) for request in llm.requests))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import json
+import unittest
+
+from praisonaiagents import Agent, PraisonAIAgents, Task
+
+from .stub_llm import stub_llm
+
+
+def make_agent():
+    return Agent(name="A", role="r", goal="g", backstory="b", verbose=False, self_reflect=False)
+
+
+def item_of(request):
+    prompt = request["messages"][-1]["content"]
+    marker = "Current loop item: "
+    return prompt.split(marker, 1)[1].split("\n", 1)[0].strip().rstrip(".") if marker in prompt else None
+
+
+class TestMapLoop(unittest.TestCase):
+    def run_map(self, reply, concurrency=8, async_execution=False):
+        agent = make_agent()
+        collect = Task(name="collect", description="List cities", expected_output="list", agent=agent, is_start=True, next_tasks=["each"], async_execution=async_execution)
+        each = Task(name="each", description="Describe the city", expected_output="text", agent=agent, task_type="loop", loop_mode="map", map_concurrency=concurrency, async_execution=async_execution)
+        workflow = PraisonAIAgents(agents=[agent], tasks=[collect, each], process="workflow", verbose=0)
+        with stub_llm(reply) as llm:
+            workflow.start()
+        return workflow, each, llm
+
+    def test_results_keep_item_order_when_later_items_finish_first(self):
+        def reply(request):
+            item = item_of(request)
+            if item is None:
+                return {"content": "- Paris\n- Rome\n- Oslo"}
+            # Later items finish first
+            return {"content": f"about {item}", "delay": {"Paris": 0.06, "Rome": 0.03, "Oslo": 0.0}[item]}
+
+        workflow, each, llm = self.run_map(reply)
+        self.assertEqual(each.status, "completed")
+        self.assertEqual(json.loads(each.result.raw), ["about Paris", "about Rome", "about Oslo"])
+        self.assertEqual([item["status"] for item in each.result.json_dict["items"]], ["completed"] * 3)
+        self.assertEqual(len(llm.requests), 4)
+
+    def test_item_tasks_are_not_left_registered(self):
+        def reply(request):
+            return {"content": "- a\n- b" if item_of(request) is None else "ok"}
+
+        workflow, each, _ = self.run_map(reply)
+        self.assertEqual([task.name for task in workflow.tasks.values()], ["collect", "each"])
+
+    def test_async_workflow_maps_too(self):
+        def reply(request):
+            return {"content": "- a\n- b" if item_of(request) is None else "ok"}
+
+        workflow, each, _ = self.run_map(reply, async_execution=True)
+        self.assertEqual(json.loads(each.result.raw), ["ok", "ok"])
+
+
+class TestForItem(unittest.TestCase):
+    def test_item_copies_do_not_share_the_context_list(self):
+        agent = make_agent()
+        upstream = Task(description="up", agent=agent)
+        task = Task(description="each", agent=agent, context=[upstream])
+        copy = task.for_item(0, "x")
+        copy.context.append(Task(description="other", agent=agent))
+        self.assertEqual(task.context, [upstream])
+        self.assertIn("Current loop item: x", copy.description)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import time
+import json
+import asyncio
+import unittest
+
+from praisonaiagents import Agent
+
+from .stub_llm import stub_llm
+
+DELAYS = {"a": 0.2, "b": 0.15, "c": 0.1}
+
+
+def slow_lookup(key: str) -> str:
+    """Look a key up slowly."""
+    time.sleep(DELAYS[key])
+    return f"value {key}"
+
+
+async def aslow_lookup(key: str) -> str:
+    """Look a key up slowly, asynchronously."""
+    await asyncio.sleep(DELAYS[key])
+    return f"value {key}"
+
+
+def reply_for(tool_name):
+    def reply(request):
+        if any(message.get("role") == "tool" for message in request["messages"]):
+            return {"content": "done"}
+        return {"tool_calls": [(tool_name, {"key": key}) for key in DELAYS]}
+    return reply
+
+
+def tool_messages(request):
+    return [(message["tool_call_id"], json.loads(message["content"])) for message in request["messages"] if message.get("role") == "tool"]
+
+
+EXPECTED = [("call_0", "value a"), ("call_1", "value b"), ("call_2", "value c")]
+
+
+class TestParallelToolCalls(unittest.TestCase):
+    def make_agent(self, tool):
+        return Agent(name="A", role="r", goal="g", backstory="b", tools=[tool], verbose=False, self_reflect=False, headless=True, parallel_tool_calls=True)
+
+    def test_sync_tools_overlap_and_keep_call_order(self):
+        agent = self.make_agent(slow_lookup)
+        with stub_llm(reply_for("slow_lookup")) as llm:
+            started = time.perf_counter()
+            self.assertEqual(agent.chat("look up a, b and c"), "done")
+            elapsed = time.perf_counter() - started
+        self.assertLess(elapsed, sum(DELAYS.values()) - 0.05)
+        self.assertEqual(tool_messages(llm.requests[-1]), EXPECTED)
+
+    def test_async_tools_overlap_and_keep_call_order(self):
+        agent = self.make_agent(aslow_lookup)
+        with stub_llm(reply_for("aslow_lookup")) as llm:
+            started = time.perf_counter()
+            self.assertEqual(asyncio.run(agent.achat("look up a, b and c", tools=[aslow_lookup])), "done")
+            elapsed = time.perf_counter() - started
+        self.assertLess(elapsed, sum(DELAYS.values()) - 0.05)
+        self.assertEqual(tool_messages(llm.requests[-1]), EXPECTED)
+
+    def test_tools_run_one_at_a_time_unless_enabled(self):
+        agent = Agent(name="A", role="r", goal="g", backstory="b", tools=[slow_lookup], verbose=False, self_reflect=False, headless=True)
+        with stub_llm(reply_for("slow_lookup")) as llm:
+            started = time.perf_counter()
+            agent.chat("look up a, b and c")
+            elapsed = time.perf_counter() - started
+        self.assertGreaterEqual(elapsed, sum(DELAYS.values()))
+        self.assertEqual(tool_messages(llm.requests[-1]), EXPECTED)
+
+
+if __name__ == "__main__":
+    unittest.main()
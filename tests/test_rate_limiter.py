@@ -0,0 +1,144 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from praisonaiagents import Agent
+from praisonaiagents.llm import rate_limiter
+from praisonaiagents.llm.rate_limiter import RateLimiter, get_rate_limiter
+
+from .stub_llm import stub_llm
+
+
+class FakeClock:
+    """A clock that only moves when told to, or when a caller sleeps on it."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    async def asleep(self, seconds):
+        self.sleep(seconds)
+
+
+class ClockTestCase(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(rate_limiter.time, "sleep", self.clock.sleep)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class TestRateLimiter(ClockTestCase):
+    def test_requests_wait_once_the_rpm_budget_is_spent(self):
+        limiter = RateLimiter(rpm=60, clock=self.clock)
+        for _ in range(60):
+            limiter.acquire()
+        self.assertEqual(self.clock.sleeps, [])
+        limiter.acquire()
+        limiter.acquire()
+        # One request per second refills, so each extra request waits a second
+        self.assertEqual(self.clock.sleeps, [1.0, 1.0])
+        self.assertEqual(limiter.stats()["waits"], 2)
+
+    def test_bucket_refills_with_time_up_to_capacity(self):
+        limiter = RateLimiter(rpm=60, clock=self.clock)
+        for _ in range(60):
+            limiter.acquire()
+        self.clock.advance(30)
+        for _ in range(30):
+            limiter.acquire()
+        self.assertEqual(self.clock.sleeps, [])
+        limiter.acquire()
+        self.assertEqual(self.clock.sleeps, [1.0])
+
+        self.clock.advance(3600)
+        for _ in range(60):
+            limiter.acquire()
+        self.assertEqual(self.clock.sleeps, [1.0])
+
+    def test_tokens_wait_against_tpm(self):
+        limiter = RateLimiter(tpm=600, clock=self.clock)
+        limiter.acquire(600)
+        limiter.acquire(100)
+        self.assertEqual(self.clock.sleeps, [10.0])
+
+    def test_the_longer_of_the_two_waits_applies(self):
+        limiter = RateLimiter(rpm=60, tpm=600, clock=self.clock)
+        limiter.acquire(600)
+        limiter.acquire(50)
+        self.assertEqual(self.clock.sleeps, [5.0])
+
+    def test_reconcile_returns_overestimated_tokens(self):
+        limiter = RateLimiter(tpm=600, clock=self.clock)
+        limiter.acquire(600)
+        limiter.reconcile(600, 300)
+        limiter.acquire(300)
+        self.assertEqual(self.clock.sleeps, [])
+        limiter.reconcile(300, 360)
+        limiter.acquire(0)
+        self.assertEqual(self.clock.sleeps, [6.0])
+
+    def test_async_acquire_waits_the_same_way(self):
+        limiter = RateLimiter(rpm=60, clock=self.clock)
+        with mock.patch.object(rate_limiter.asyncio, "sleep", self.clock.asleep):
+            async def main():
+                for _ in range(61):
+                    await limiter.aacquire()
+            asyncio.run(main())
+        self.assertEqual(self.clock.sleeps, [1.0])
+
+
+class TestSharedLimiter(ClockTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.dict(rate_limiter._limiters, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_agent(self, api_key, **kwargs):
+        return Agent(name="A", role="r", goal="g", backstory="b", llm="gpt-4o-mini", api_key=api_key, verbose=False, self_reflect=False, **kwargs)
+
+    def test_one_limiter_per_model_and_api_key(self):
+        self.assertIsNone(get_rate_limiter("m", "k"))
+        shared = get_rate_limiter("m", "k", rpm=10)
+        self.assertIs(get_rate_limiter("m", "k"), shared)
+        self.assertIsNot(get_rate_limiter("m", "other", rpm=10), shared)
+        self.assertIsNot(get_rate_limiter("n", "k", rpm=10), shared)
+
+    def test_tightest_budget_wins(self):
+        shared = get_rate_limiter("m", "k", rpm=10, tpm=1000)
+        get_rate_limiter("m", "k", rpm=5, tpm=2000)
+        self.assertEqual((shared.rpm, shared.tpm), (5, 1000))
+
+    def test_agents_with_the_same_key_share_a_budget(self):
+        first, second = self.make_agent("k1", max_rpm=2), self.make_agent("k1", max_rpm=2)
+        other = self.make_agent("k2", max_rpm=2)
+        self.assertIs(first._get_rate_limiter("gpt-4o-mini"), second._get_rate_limiter("gpt-4o-mini"))
+        self.assertIsNot(first._get_rate_limiter("gpt-4o-mini"), other._get_rate_limiter("gpt-4o-mini"))
+        self.assertIsNone(self.make_agent("k1")._get_rate_limiter("gpt-4o-mini"))
+
+    def test_agent_requests_wait_on_the_shared_budget(self):
+        rate_limiter._limiters[("gpt-4o-mini", "k1")] = RateLimiter(rpm=2, clock=self.clock)
+        first, second = self.make_agent("k1", max_rpm=2), self.make_agent("k1", max_rpm=2)
+        with stub_llm(lambda request: {"content": "ok"}) as llm:
+            first.chat("one")
+            second.chat("two")
+            self.assertEqual(self.clock.sleeps, [])
+            first.chat("three")
+        # Two requests a minute: the third waits for one to refill
+        self.assertEqual(self.clock.sleeps, [30.0])
+        self.assertEqual(len(llm.requests), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import time
+import asyncio
+import unittest
+from unittest import mock
+
+from praisonaiagents import Agent
+from praisonaiagents.main import client_manager
+from praisonaiagents.llm.policy import ModelRoute, RequestPolicy, latency_tracker
+
+from .stub_llm import StubLLM
+
+
+def samples(route):
+    return latency_tracker.percentile(route, 50, min_samples=1)
+
+
+class TestModelRoute(unittest.TestCase):
+    def test_plain_names_bind_to_the_primary_endpoint(self):
+        primary = ModelRoute("main", "http://local/v1", "local-key")
+        policy = RequestPolicy(["backup", {"model": "other", "base_url": "http://other/v1"}, "groq/llama"])
+        backup, other, groq = policy.routes(primary)[1:]
+        self.assertEqual((backup.model, backup.base_url, backup.api_key), ("backup", "http://local/v1", "local-key"))
+        self.assertEqual((other.base_url, other.api_key), ("http://other/v1", None))
+        self.assertEqual((groq.model, groq.base_url), ("llama", "https://api.groq.com/openai/v1"))
+
+    def test_a_fallback_equal_to_the_primary_is_dropped(self):
+        primary = ModelRoute("main", "http://local/v1")
+        self.assertEqual(len(RequestPolicy(["main"]).routes(primary)), 1)
+
+
+class TestRequestPolicy(unittest.TestCase):
+    def test_falls_back_when_the_primary_fails(self):
+        def start(route):
+            if route.model == "main":
+                raise RuntimeError("down")
+            return route.model
+
+        policy = RequestPolicy(["backup"])
+        self.assertEqual(policy.execute(ModelRoute("main"), start), "backup")
+        self.assertEqual(policy.stats()["fallbacks_used"], 1)
+
+    def test_slow_primary_is_hedged(self):
+        def start(route):
+            time.sleep(0.5 if route.model == "hedge-slow" else 0.01)
+            return route.model
+
+        policy = RequestPolicy(["hedge-fast"], hedge=True, hedge_delay=0.05)
+        self.assertEqual(policy.execute(ModelRoute("hedge-slow"), start), "hedge-fast")
+        self.assertEqual(policy.stats()["hedges_won"], 1)
+
+    def test_async_hedge_cancels_the_loser(self):
+        cancelled = []
+
+        async def start(route):
+            try:
+                await asyncio.sleep(0.5 if route.model == "ahedge-slow" else 0.01)
+            except asyncio.CancelledError:
+                cancelled.append(route.model)
+                raise
+            return route.model
+
+        policy = RequestPolicy(["ahedge-fast"], hedge=True, hedge_delay=0.05)
+        self.assertEqual(asyncio.run(policy.aexecute(ModelRoute("ahedge-slow"), start)), "ahedge-fast")
+        self.assertEqual(cancelled, ["ahedge-slow"])
+
+    def test_only_streamed_first_chunks_are_timed(self):
+        policy = RequestPolicy()
+        whole, streamed = ModelRoute("ttft-whole"), ModelRoute("ttft-streamed")
+        policy.execute(whole, lambda route: "completion")
+        policy.execute(streamed, lambda route: "first chunk", stream=True)
+        self.assertIsNone(samples(whole))
+        self.assertIsNotNone(samples(streamed))
+
+    def test_non_streamed_requests_hedge_after_the_initial_delay(self):
+        policy = RequestPolicy(hedge=True, initial_hedge_delay=7.0, min_samples=1)
+        route = ModelRoute("delay-route")
+        latency_tracker.record(route, 0.2)
+        self.assertEqual(policy.delay_for(route, stream=True), 0.2)
+        self.assertEqual(policy.delay_for(route, stream=False), 7.0)
+
+
+class TestAgentFallback(unittest.TestCase):
+    def test_plain_fallback_uses_the_agent_endpoint(self):
+        def reply(request):
+            if request["model"] == "main":
+                raise RuntimeError("down")
+            return {"content": "from backup"}
+
+        stub, endpoints = StubLLM(reply), []
+
+        def get_client(base_url=None, api_key=None, **kwargs):
+            endpoints.append((base_url, api_key))
+            return stub
+
+        agent = Agent(name="A", role="r", goal="g", backstory="b", verbose=False, llm="main", base_url="http://local/v1", api_key="local-key", fallback_llms=["backup"])
+        with mock.patch.object(client_manager, "get_client", get_client):
+            self.assertEqual(agent.chat("hi"), "from backup")
+        self.assertEqual([request["model"] for request in stub.requests], ["main", "backup"])
+        self.assertEqual(set(endpoints), {("http://local/v1", "local-key")})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from praisonaiagents import Agent
+from praisonaiagents.llm.cache import ResponseCache, response_cache
+
+from .stub_llm import stub_llm
+
+
+class TestResponseCache(unittest.TestCase):
+    def test_memory_only_by_default(self):
+        cache = ResponseCache()
+        self.assertIsNone(cache.path)
+        cache.set("k", {"v": 1})
+        self.assertEqual(cache.get("k"), {"v": 1})
+
+    def test_disk_tier_persists_when_configured(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cache.db")
+            ResponseCache(path=path).set("k", {"v": 1})
+            fresh = ResponseCache(path=path)
+            self.assertEqual(fresh.get("k"), {"v": 1})
+            self.assertEqual(fresh.stats()["disk_hits"], 1)
+
+    def test_expired_entries_are_misses(self):
+        cache = ResponseCache(ttl=10)
+        with mock.patch("time.time", return_value=1000):
+            cache.set("k", {"v": 1})
+        with mock.patch("time.time", return_value=1011):
+            self.assertIsNone(cache.get("k"))
+
+
+class TestAgentCache(unittest.TestCase):
+    def setUp(self):
+        response_cache.clear()
+
+    def test_agents_do_not_cache_unless_asked(self):
+        with stub_llm(lambda request: {"content": "hi"}) as llm:
+            Agent(name="A", role="r", goal="g", backstory="b", verbose=False).chat("hello")
+            Agent(name="A", role="r", goal="g", backstory="b", verbose=False).chat("hello")
+        self.assertEqual(len(llm.requests), 2)
+
+    def test_cache_opt_in_replays_identical_requests(self):
+        with stub_llm(lambda request: {"content": "hi"}) as llm:
+            for _ in range(2):
+                agent = Agent(name="A", role="r", goal="g", backstory="b", verbose=False, cache=True)
+                self.assertEqual(agent.chat("hello"), "hi")
+        self.assertEqual(len(llm.requests), 1)
+
+    def test_endpoints_do_not_share_entries(self):
+        with stub_llm(lambda request: {"content": "hi"}) as llm:
+            for base_url in ("http://one/v1", "http://two/v1"):
+                Agent(name="A", role="r", goal="g", backstory="b", verbose=False, cache=True, base_url=base_url).chat("hello")
+        self.assertEqual(len(llm.requests), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+
+from pydantic import BaseModel
+
+from praisonaiagents import Agent, PraisonAIAgents, Task
+from praisonaiagents.main import TaskOutput
+from praisonaiagents.agents.run_store import RunStore
+
+from .stub_llm import stub_llm
+
+
+class Summary(BaseModel):
+    title: str
+
+
+def first_tool(query: str) -> str:
+    """A tool."""
+    return query
+
+
+def second_tool(query: str) -> str:
+    """A tool."""
+    return query.upper()
+
+
+def make_agent(**kwargs):
+    return Agent(name="A", role="r", goal="g", backstory="b", verbose=False, self_reflect=False, **kwargs)
+
+
+def output(raw="done", status="completed", **kwargs):
+    return TaskOutput(description="d", raw=raw, agent="A", status=status, **kwargs)
+
+
+class TestRunStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = RunStore(os.path.join(self.directory.name, "runs.db"))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_key_follows_the_task_inputs(self):
+        agent = make_agent()
+        upstream = Task(description="up", agent=agent)
+        task = Task(description="write", agent=agent, context=[upstream])
+        key = self.store.key_for(task)
+        self.assertEqual(key, self.store.key_for(Task(description="write", agent=agent, context=[upstream])))
+        upstream.result = output("new notes")
+        self.assertNotEqual(key, self.store.key_for(task))
+        self.assertNotEqual(key, self.store.key_for(Task(description="rewrite", agent=agent, context=[upstream])))
+
+    def test_key_follows_tool_source(self):
+        first = Task(description="t", agent=make_agent(tools=[first_tool]))
+        second = Task(description="t", agent=make_agent(tools=[second_tool]))
+        self.assertNotEqual(self.store.key_for(first), self.store.key_for(second))
+
+    def test_round_trip_rebuilds_pydantic_output(self):
+        task = Task(description="t", agent=make_agent(), output_pydantic=Summary)
+        self.store.put(task, output('{"title": "x"}', pydantic=Summary(title="x"), output_format="Pydantic"))
+        stored = self.store.get(task)
+        self.assertEqual(stored.pydantic, Summary(title="x"))
+        self.assertEqual(self.store.stats()["hits"], 1)
+
+    def test_partial_outputs_are_not_reused(self):
+        task = Task(description="t", agent=make_agent())
+        self.store.put(task, output("half", status="timeout"))
+        self.assertIsNone(self.store.get(task))
+        self.assertEqual(self.store.stats()["misses"], 1)
+
+
+class TestWorkflowRunStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "runs.db")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_workflow(self, description="Research"):
+        agent = make_agent()
+        research = Task(name="research", description=description, expected_output="notes", agent=agent)
+        write = Task(name="write", description="Write", expected_output="text", agent=agent, context=[research])
+        with stub_llm(lambda request: {"content": "done"}) as llm:
+            PraisonAIAgents(agents=[agent], tasks=[research, write], run_store=self.path, verbose=0).start()
+        return len(llm.requests)
+
+    def test_rerun_reuses_outputs_and_reruns_edited_tasks(self):
+        self.assertEqual(self.run_workflow(), 2)
+        self.assertEqual(self.run_workflow(), 0)
+        # Editing the first task's prompt changes its output's key, not its text,
+        # so only the edited task runs again
+        self.assertEqual(self.run_workflow("Research more"), 1)
+
+    def test_partial_results_are_not_stored(self):
+        agent = make_agent()
+        task = Task(name="t", description="t", agent=agent)
+        agents = PraisonAIAgents(agents=[agent], tasks=[task], run_store=self.path, verbose=0)
+        key = agents.run_store.key_for(task)
+        agents._store_output(0, key, output("half", status="max_iter"))
+        self.assertIsNone(agents.run_store.get(task, key))
+        agents._store_output(0, key, output("whole"))
+        self.assertEqual(agents.run_store.get(task, key).raw, "whole")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+import asyncio
+import unittest
+
+from praisonaiagents import Agent, PraisonAIAgents, Task
+from praisonaiagents.process.scheduler import TaskScheduler
+
+from .stub_llm import stub_llm
+
+
+def make_agent(name="A", **kwargs):
+    kwargs.setdefault("self_reflect", False)
+    return Agent(name=name, role="r", goal="g", backstory="b", verbose=False, **kwargs)
+
+
+def make_tasks(*specs):
+    """specs: (name, [context names]) in order; returns {id: Task}."""
+    agent = make_agent()
+    by_name = {}
+    for name, context in specs:
+        by_name[name] = Task(name=name, description=name, agent=agent, context=[by_name[c] for c in context])
+    return {i: task for i, task in enumerate(by_name.values())}
+
+
+def run(scheduler, run_task):
+    async def collect():
+        return [event async for event in scheduler.run(run_task)]
+    return asyncio.run(collect())
+
+
+class TestTaskScheduler(unittest.TestCase):
+    def test_dependencies_come_from_context_and_next_tasks(self):
+        tasks = make_tasks(("a", []), ("b", ["a"]), ("c", []))
+        tasks[2].next_tasks = ["b"]
+        scheduler = TaskScheduler(tasks)
+        self.assertEqual(scheduler.dependencies, {0: set(), 1: {0, 2}, 2: set()})
+        self.assertIn(tasks[2], tasks[1].context)
+
+    def test_cycles_and_conditional_tasks_are_rejected(self):
+        tasks = make_tasks(("a", []), ("b", ["a"]))
+        tasks[0].context.append(tasks[1])
+        with self.assertRaisesRegex(ValueError, "cycle"):
+            TaskScheduler(tasks)
+        tasks = make_tasks(("a", []))
+        tasks[0].task_type = "loop"
+        with self.assertRaisesRegex(ValueError, "workflow"):
+            TaskScheduler(tasks)
+
+    def test_independent_tasks_overlap_and_dependents_wait(self):
+        tasks = make_tasks(("a", []), ("b", []), ("c", ["a", "b"]))
+        active, peak, order = set(), [0], []
+
+        async def run_task(task_id):
+            active.add(task_id)
+            peak[0] = max(peak[0], len(active))
+            await asyncio.sleep(0.02)
+            active.discard(task_id)
+            order.append(task_id)
+            tasks[task_id].status = "completed"
+
+        events = run(TaskScheduler(tasks), run_task)
+        self.assertEqual(peak[0], 2)
+        self.assertEqual(order[-1], 2)
+        self.assertEqual([e.type for e in events].count("completed"), 3)
+
+    def test_max_concurrency_caps_running_tasks(self):
+        tasks = make_tasks(("a", []), ("b", []), ("c", []))
+        active, peak = set(), [0]
+
+        async def run_task(task_id):
+            active.add(task_id)
+            peak[0] = max(peak[0], len(active))
+            await asyncio.sleep(0.01)
+            active.discard(task_id)
+            tasks[task_id].status = "completed"
+
+        run(TaskScheduler(tasks, max_concurrency=1), run_task)
+        self.assertEqual(peak[0], 1)
+
+    def test_dependents_of_a_failed_task_are_skipped(self):
+        tasks = make_tasks(("a", []), ("b", ["a"]), ("c", ["b"]), ("d", []))
+
+        async def run_task(task_id):
+            if task_id == 0:
+                raise RuntimeError("boom")
+            tasks[task_id].status = "completed"
+
+        events = {(e.task_name, e.type) for e in run(TaskScheduler(tasks), run_task)}
+        self.assertIn(("a", "failed"), events)
+        self.assertIn(("b", "skipped"), events)
+        self.assertIn(("c", "skipped"), events)
+        self.assertIn(("d", "completed"), events)
+
+    def test_critical_path_starts_the_longest_chain_first(self):
+        tasks = make_tasks(("short", []), ("long", []), ("after", ["long"]))
+        order = []
+
+        async def run_task(task_id):
+            order.append(tasks[task_id].name)
+            tasks[task_id].status = "completed"
+
+        run(TaskScheduler(tasks, max_concurrency=1, critical_path=True), run_task)
+        self.assertEqual(order[0], "long")
+
+
+class TestParallelProcess(unittest.TestCase):
+    def test_tasks_run_with_their_context(self):
+        def reply(request):
+            prompt = request["messages"][-1]["content"]
+            return {"content": "merged" if "research" in prompt and "outline" in prompt else "done"}
+
+        agent = make_agent()
+        research = Task(name="research", description="Research", expected_output="notes", agent=agent)
+        outline = Task(name="outline", description="Outline", expected_output="notes", agent=agent)
+        write = Task(name="write", description="Write", expected_output="text", agent=agent, context=[research, outline])
+        with stub_llm(reply):
+            result = PraisonAIAgents(agents=[agent], tasks=[research, outline, write], process="parallel", verbose=0).start()
+        self.assertEqual(set(result["task_status"].values()), {"completed"})
+        self.assertEqual(write.result.raw, "merged")
+
+    def test_status_is_taken_from_each_call(self):
+        agent = make_agent(max_iter=1)
+        agent.last_run_status = "max_iter"
+        task = Task(name="t", description="Do it", expected_output="x", agent=agent)
+        with stub_llm(lambda request: {"content": "ok"}):
+            PraisonAIAgents(agents=[agent], tasks=[task], process="parallel", verbose=0).start()
+        self.assertEqual(task.result.status, "completed")
+
+    def test_tool_results_and_reflection_match_chat(self):
+        def lookup(term: str) -> str:
+            """Look a term up."""
+            return f"{term} means x"
+
+        def reply(request):
+            if "response_format" in request:
+                return {"content": '{"reflection": "fine", "satisfactory": "yes"}'}
+            if any(message.get("role") == "tool" for message in request["messages"]):
+                return {"content": "answer"}
+            return {"tool_calls": [("lookup", {"term": "foo"})]}
+
+        agent = make_agent(self_reflect=True, tools=[lookup])
+        task = Task(name="t", description="Define foo", expected_output="x", agent=agent)
+        with stub_llm(reply) as llm:
+            PraisonAIAgents(agents=[agent], tasks=[task], process="parallel", verbose=0).start()
+        self.assertEqual(task.result.raw, "answer")
+        # The tool result returns to the same conversation, as with chat()
+        followup = llm.requests[1]["messages"]
+        self.assertIn("Define foo", followup[1]["content"])
+        self.assertEqual(followup[-1]["role"], "tool")
+        # and the answer is reflected on
+        self.assertIn("response_format", llm.requests[2])
+
+
+class TestAchat(unittest.TestCase):
+    def test_achat_offers_only_passed_tools_and_does_not_reflect(self):
+        def lookup(term: str) -> str:
+            """Look a term up."""
+            return f"{term} means x"
+
+        agent = make_agent(self_reflect=True, tools=[lookup])
+        with stub_llm(lambda request: {"content": "answer"}) as llm:
+            self.assertEqual(asyncio.run(agent.achat("Define foo")), "answer")
+        self.assertEqual(len(llm.requests), 1)
+        self.assertNotIn("tools", llm.requests[0])
+        self.assertNotIn("response_format", llm.requests[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
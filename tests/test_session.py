@@ -0,0 +1,69 @@
+import time
+import threading
+import unittest
+from unittest import mock
+
+from praisonaiagents import Agent
+from praisonaiagents.agent import agent as agent_module
+from praisonaiagents.agent.session import Session
+
+from .stub_llm import stub_llm
+
+
+def make_agent():
+    return Agent(name="A", role="r", goal="g", backstory="b", verbose=False, self_reflect=False)
+
+
+def echo(request):
+    return {"content": f"re {request['messages'][-1]['content']}", "delay": 0.01}
+
+
+def run_threads(count, target):
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+class TestConcurrentSessions(unittest.TestCase):
+    def test_sessions_keep_their_own_history(self):
+        agent = make_agent()
+        sessions = [agent.new_session(session_id=f"s{i}") for i in range(8)]
+
+        def converse(i):
+            for turn in range(3):
+                agent.chat(f"s{i} turn {turn}", session=sessions[i])
+
+        with stub_llm(echo) as llm:
+            run_threads(8, converse)
+        for i, session in enumerate(sessions):
+            prompts = [message["content"] for message in session.chat_history if message["role"] == "user"]
+            self.assertEqual(prompts, [f"s{i} turn {turn}" for turn in range(3)])
+        # Each request carries only its own session's earlier turns
+        for request in llm.requests:
+            owner = request["messages"][-1]["content"].split()[0]
+            self.assertTrue(all(message["content"].startswith((owner, f"re {owner}")) for message in request["messages"][1:]))
+        self.assertEqual(agent.chat_history, [])
+
+    def test_first_calls_from_many_threads_share_one_default_session(self):
+        class SlowSession(Session):
+            def __init__(self, *args, **kwargs):
+                # Widen the window in which a second thread could build its own
+                time.sleep(0.02)
+                super().__init__(*args, **kwargs)
+
+        agent = make_agent()
+        with stub_llm(echo), mock.patch.object(agent_module, "Session", SlowSession):
+            run_threads(8, lambda i: agent.chat(f"p{i}"))
+        self.assertEqual(len(agent.chat_history), 16)
+
+    def test_first_tool_lookups_share_one_registry(self):
+        agent = Agent(name="A", role="r", goal="g", backstory="b", verbose=False, tools=[len])
+        registries = []
+        run_threads(8, lambda i: registries.append(agent._tool_registry))
+        self.assertEqual(len({id(registry) for registry in registries}), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import unittest
+
+from praisonaiagents import Agent
+from praisonaiagents.agent.budget import BudgetExceeded
+from praisonaiagents.llm import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_waiters_share_the_leaders_result(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "answer"
+
+        async def main():
+            return await asyncio.gather(*(flight.ado("k", fetch) for _ in range(3)))
+
+        self.assertEqual(asyncio.run(main()), ["answer"] * 3)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flight.stats(), {"leaders": 1, "deduplicated": 2, "in_flight": 0})
+
+    def test_request_errors_reach_every_waiter(self):
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.05)
+            raise ValueError("bad request")
+
+        async def main():
+            return await asyncio.gather(flight.ado("k", fail), flight.ado("k", fail), return_exceptions=True)
+
+        self.assertEqual([type(e) for e in asyncio.run(main())], [ValueError, ValueError])
+
+    def test_cancelled_leader_hands_the_request_to_a_waiter(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "answer"
+
+        async def main():
+            leader = asyncio.ensure_future(flight.ado("k", fetch))
+            await asyncio.sleep(0.01)
+            waiter = asyncio.ensure_future(flight.ado("k", fetch))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            return await waiter, leader.cancelled()
+
+        self.assertEqual(asyncio.run(main()), ("answer", True))
+        self.assertEqual(len(calls), 2)
+
+    def test_leaders_own_budget_error_is_retried_by_waiters(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        results = []
+
+        def out_of_budget():
+            started.set()
+            threading.Event().wait(0.05)
+            raise BudgetExceeded("timeout", "Maximum execution time reached")
+
+        def leader():
+            try:
+                flight.do("k", out_of_budget, retry_on=(BudgetExceeded,))
+            except BudgetExceeded as e:
+                results.append(e.reason)
+
+        thread = threading.Thread(target=leader)
+        thread.start()
+        started.wait()
+        results.append(flight.do("k", lambda: "answer", retry_on=(BudgetExceeded,)))
+        thread.join()
+        self.assertEqual(sorted(results), ["answer", "timeout"])
+
+    def test_agents_do_not_coalesce_unless_asked(self):
+        self.assertFalse(Agent(name="A", role="r", goal="g", backstory="b", verbose=False).coalesce_requests)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+import asyncio
+import unittest
+
+from praisonaiagents import Agent
+from praisonaiagents.agent.tool_registry import ToolRegistry
+
+from .stub_llm import stub_llm
+
+
+def make_tool(result):
+    def lookup(query: str) -> str:
+        """Look something up."""
+        return f"{result}:{query}"
+    return lookup
+
+
+class TestToolRegistry(unittest.TestCase):
+    def test_register_tools_replaces_a_changed_tool(self):
+        registry = ToolRegistry(lambda name: None)
+        old, new = make_tool("old"), make_tool("new")
+        registry.register_tools([old])
+        registry.register_tools([new])
+        self.assertIs(registry.get_invoker("lookup").target, new)
+
+    def test_register_tools_keeps_an_unchanged_invoker(self):
+        registry = ToolRegistry(lambda name: None)
+        tool = make_tool("same")
+        registry.register_tools([tool])
+        invoker = registry.get_invoker("lookup")
+        registry.register_tools([tool])
+        self.assertIs(registry.get_invoker("lookup"), invoker)
+
+    def test_agent_calls_the_current_tool_after_reassignment(self):
+        agent = Agent(name="A", role="r", goal="g", backstory="b", tools=[make_tool("old")], verbose=False)
+        self.assertEqual(agent.execute_tool("lookup", {"query": "q"}), "old:q")
+        agent.tools = [make_tool("new")]
+        self.assertEqual(agent.execute_tool("lookup", {"query": "q"}), "new:q")
+
+    def test_formatted_definitions_are_cached_per_tool_list(self):
+        agent = Agent(name="A", role="r", goal="g", backstory="b", tools=[make_tool("x")], verbose=False)
+        tools = agent.tools
+        first = agent._tool_registry.formatted(tools)
+        self.assertIs(first, agent._tool_registry.formatted(tools))
+        self.assertEqual(first[0]["function"]["name"], "lookup")
+
+
+class Counter:
+    """A stateful class tool: run() reports how often this instance was called."""
+    instances = 0
+
+    def __init__(self):
+        Counter.instances += 1
+        self.count = 0
+
+    def run(self, step: int = 1):
+        self.count += step
+        return self.count
+
+
+class TestSpawn(unittest.TestCase):
+    def test_class_tools_get_a_fresh_instance_per_call(self):
+        Counter.instances = 0
+        agent = Agent(name="A", role="r", goal="g", backstory="b", tools=[Counter], verbose=False)
+        clone = agent.spawn()
+        self.assertEqual([agent.execute_tool("Counter", {}), clone.execute_tool("Counter", {}), agent.execute_tool("Counter", {})], [1, 1, 1])
+        self.assertEqual(Counter.instances, 3)
+
+    def test_spawn_copies_configuration_but_not_conversation_state(self):
+        agent = Agent(name="A", role="r", goal="g", backstory="b", llm="gpt-4o-mini", tools=[make_tool("x")], verbose=False, self_reflect=False)
+        with stub_llm(lambda request: {"content": "hi"}):
+            agent.chat("hello")
+            clone = agent.spawn(name="B")
+            self.assertEqual((clone.llm, clone.role, clone.name), ("gpt-4o-mini", "r", "B"))
+            self.assertEqual(clone.chat_history, [])
+            clone.chat("other")
+        self.assertEqual([message["content"] for message in agent.chat_history], ["hello", "hi"])
+        self.assertIsNot(clone.default_session, agent.default_session)
+        clone.tools.append(make_tool("y"))
+        self.assertEqual(len(agent.tools), 1)
+
+
+class TestDispatch(unittest.TestCase):
+    def make_agent(self, **kwargs):
+        return Agent(name="A", role="r", goal="g", backstory="b", verbose=False, self_reflect=False, headless=True, **kwargs)
+
+    def test_dispatches_to_function_and_class_tools(self):
+        agent = self.make_agent(tools=[make_tool("fn"), Counter])
+        self.assertEqual(agent.execute_tool("lookup", {"query": "q"}), "fn:q")
+        self.assertEqual(agent.execute_tool("Counter", {"step": 2}), 2)
+        self.assertEqual(set(agent.get_tool_stats()), {"lookup", "Counter"})
+
+    def test_missing_tool_returns_an_error(self):
+        agent = self.make_agent(tools=[make_tool("fn")])
+        self.assertEqual(agent.execute_tool("missing_tool", {}), {"error": "Tool 'missing_tool' is not callable"})
+
+    def test_tool_errors_are_returned_to_the_model(self):
+        def broken(query: str) -> str:
+            """Always fails."""
+            raise RuntimeError("boom")
+        agent = self.make_agent(tools=[broken])
+
+        def reply(request):
+            if any(message.get("role") == "tool" for message in request["messages"]):
+                return {"content": "done"}
+            return {"tool_calls": [("broken", {"query": "q"}), ("missing_tool", {})]}
+
+        with stub_llm(reply) as llm:
+            self.assertEqual(agent.chat("go"), "done")
+        tool_messages = [message["content"] for message in llm.requests[-1]["messages"] if message.get("role") == "tool"]
+        self.assertEqual(tool_messages, ['{"error": "boom"}', '{"error": "Tool \'missing_tool\' is not callable"}'])
+
+
+class TestRouting(unittest.TestCase):
+    def make_agent(self, **kwargs):
+        return Agent(name="A", role="r", goal="g", backstory="b", llm="main-model", function_calling_llm="fc-model", verbose=False, self_reflect=False, headless=True, **kwargs)
+
+    @staticmethod
+    def reply(request):
+        if request["model"] == "main-model":
+            return {"content": "answer from main"}
+        if any(message.get("role") == "tool" for message in request["messages"]):
+            return {"content": "answer from fc"}
+        if "look" in request["messages"][-1]["content"]:
+            return {"tool_calls": [("lookup", {"query": "q"})]}
+        return {"content": "draft from fc"}
+
+    def test_tool_selection_goes_to_function_calling_llm(self):
+        agent = self.make_agent(tools=[make_tool("fn")])
+        with stub_llm(self.reply) as llm:
+            self.assertEqual(agent.chat("look it up"), "answer from main")
+        self.assertEqual([request["model"] for request in llm.requests], ["fc-model", "main-model"])
+        self.assertIn("tools", llm.requests[0])
+        self.assertEqual(llm.requests[1]["messages"][-1]["content"], '"fn:q"')
+        self.assertEqual({role: stats["model"] for role, stats in agent.get_llm_stats().items()}, {"function_calling": "fc-model", "main": "main-model"})
+
+    def test_main_llm_answers_when_no_tool_is_called(self):
+        agent = self.make_agent(tools=[make_tool("fn")])
+        with stub_llm(self.reply) as llm:
+            self.assertEqual(agent.chat("hello"), "answer from main")
+        self.assertEqual([request["model"] for request in llm.requests], ["fc-model", "main-model"])
+
+    def test_without_tools_only_the_main_llm_is_used(self):
+        agent = self.make_agent()
+        with stub_llm(self.reply) as llm:
+            self.assertEqual(agent.chat("look it up"), "answer from main")
+        self.assertEqual([request["model"] for request in llm.requests], ["main-model"])
+
+    def test_achat_routes_the_same_way(self):
+        agent = self.make_agent()
+        with stub_llm(self.reply) as llm:
+            self.assertEqual(asyncio.run(agent.achat("look it up", tools=[make_tool("fn")])), "answer from main")
+        self.assertEqual([request["model"] for request in llm.requests], ["fc-model", "main-model"])
+
+
+if __name__ == "__main__":
+    unittest.main()